@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""Benchmark speed and quality of OmniVoice ONNX graphs and step counts.
+
+Choosing a quantization (``script/quantize_omnivoice.py``) and a default
+``--omnivoice-steps`` is a trade-off between speed, memory and audio quality.
+This harness measures all three for a set of candidate graphs:
+
+* **step ms** — mean latency of one MaskGIT step (one LM forward pass)
+* **RTF** — total synthesis time / audio duration (includes codec decoding)
+* **peak RSS** — peak resident memory of the process that loaded the graph
+* **MFCC dist** — MFCC distance to the fp32 reference after dynamic time
+  warping, averaged over the sentences (0 = identical, see ``tests/dtw.py``)
+
+Every graph is loaded in its own process (so peak RSS is per graph) and
+synthesizes the same sentences with the same seed at each step count. The
+reference is the ``--reference`` fp32 graph at ``--reference-steps``.
+
+Usage:
+    python script/bench_omnivoice.py \\
+        --reference omnivoice.onnx \\
+        --graph omnivoice.int4.onnx --graph omnivoice.int4-embed.onnx \\
+        --steps 8 16 32 --json results.json
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import queue
+import sys
+import time
+import wave
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+_REPO_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(_REPO_DIR))
+
+DEFAULT_SENTENCES = [
+    "Turning on the kitchen lights.",
+    "The front door has been unlocked, and the alarm system is now disarmed.",
+    "Good morning! Today will be mostly cloudy with a high of seventy two "
+    "degrees, and a thirty percent chance of rain in the late afternoon.",
+]
+
+
+def _graph_size(onnx_path: Path) -> int:
+    """Bytes of the graph and its external data."""
+    return sum(
+        p.stat().st_size
+        for p in onnx_path.parent.glob(onnx_path.name + "*")
+        if p.suffix in (".onnx", ".data", ".onnx_data")
+    )
+
+
+def _run_graph(
+    onnx_path: str,
+    steps_list: Sequence[int],
+    sentences: Sequence[str],
+    voice: Dict[str, Optional[str]],
+    seed: int,
+    local_files_only: bool,
+    results: "multiprocessing.Queue[Any]",
+) -> None:
+    """Load one graph and synthesize every sentence at every step count.
+
+    Runs in a child process; puts one result dict per step count on
+    ``results`` (audio included, for scoring in the parent).
+    """
+    import resource
+
+    import numpy as np
+    import torch
+
+    from wyoming_piper.omnivoice import OmniVoiceModel
+
+    start_time = time.perf_counter()
+    model = OmniVoiceModel(onnx_path, local_files_only=local_files_only)
+    load_seconds = time.perf_counter() - start_time
+
+    # Time every LM forward pass (one per MaskGIT step)
+    step_times: List[float] = []
+    forward = model._model.forward  # pylint: disable=protected-access
+
+    def timed_forward(*args, **kwargs):  # type: ignore[no-untyped-def]
+        step_start = time.perf_counter()
+        try:
+            return forward(*args, **kwargs)
+        finally:
+            step_times.append(time.perf_counter() - step_start)
+
+    model._model.forward = timed_forward  # pylint: disable=protected-access
+
+    def synthesize(text: str) -> np.ndarray:
+        torch.manual_seed(seed)
+        with io.BytesIO() as wav_io:
+            with wave.open(wav_io, "wb") as wav_writer:
+                model.synthesize_wav(text, wav_writer, **voice)
+
+            wav_io.seek(0)
+            with wave.open(wav_io, "rb") as wav_reader:
+                pcm = wav_reader.readframes(wav_reader.getnframes())
+
+        return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+    # Warm up (arena allocation, kernel selection)
+    synthesize(sentences[0])
+
+    for num_step in steps_list:
+        model.num_step = num_step
+        step_times.clear()
+
+        audio = []
+        seconds = 0.0
+        for text in sentences:
+            start_time = time.perf_counter()
+            audio.append(synthesize(text))
+            seconds += time.perf_counter() - start_time
+
+        audio_seconds = sum(len(a) for a in audio) / model.sampling_rate
+        results.put(
+            {
+                "graph": onnx_path,
+                "steps": num_step,
+                "load_seconds": load_seconds,
+                "step_ms": 1000 * sum(step_times) / max(1, len(step_times)),
+                "real_time_factor": seconds / max(audio_seconds, 1e-6),
+                # ru_maxrss is in KiB on Linux
+                "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                / 1024,
+                "sample_rate": model.sampling_rate,
+                "audio": audio,
+            }
+        )
+
+
+def _measure(
+    onnx_path: Path, steps_list: Sequence[int], args: argparse.Namespace
+) -> List[Dict[str, Any]]:
+    """Run :func:`_run_graph` in a fresh process and collect its results."""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    voice = {
+        "ref_audio": args.ref_audio,
+        "ref_text": args.ref_text,
+        "instruct": args.instruct,
+        "language": args.language,
+    }
+    proc = context.Process(
+        target=_run_graph,
+        args=(
+            str(onnx_path),
+            list(steps_list),
+            args.text or DEFAULT_SENTENCES,
+            voice,
+            args.seed,
+            args.local_files_only,
+            results,
+        ),
+    )
+    proc.start()
+
+    # Drain before join so a full queue can't block the child
+    rows: List[Dict[str, Any]] = []
+    while len(rows) < len(steps_list):
+        try:
+            rows.append(results.get(timeout=5))
+        except queue.Empty:
+            if not proc.is_alive():
+                break
+
+    proc.join()
+    if (proc.exitcode != 0) or (len(rows) < len(steps_list)):
+        raise RuntimeError(f"Benchmark of {onnx_path} failed ({proc.exitcode})")
+
+    for row in rows:
+        row["size_mb"] = _graph_size(onnx_path) / 1e6
+
+    return rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    ap.add_argument("--reference", required=True, help="fp32 .onnx graph")
+    ap.add_argument(
+        "--graph", action="append", default=[], help="Candidate .onnx (repeatable)"
+    )
+    ap.add_argument(
+        "--steps", type=int, nargs="+", default=[8, 16, 32], help="Step counts"
+    )
+    ap.add_argument(
+        "--reference-steps", type=int, default=32, help="Steps for the reference"
+    )
+    ap.add_argument("--text", action="append", help="Sentence (repeatable)")
+    ap.add_argument("--ref-audio", help="Reference WAV for voice cloning")
+    ap.add_argument("--ref-text", help="Transcript of --ref-audio")
+    ap.add_argument("--instruct", help="Voice design instruction")
+    ap.add_argument("--language", help="Language (default: English)")
+    ap.add_argument("--seed", type=int, default=0, help="torch seed per sentence")
+    ap.add_argument("--local-files-only", action="store_true")
+    ap.add_argument("--json", help="Also write results (without audio) here")
+    args = ap.parse_args()
+
+    reference_path = Path(args.reference)
+    print(f"Reference: {reference_path} @ {args.reference_steps} steps", flush=True)
+    rows = _measure(reference_path, [args.reference_steps], args)
+    reference = rows[0]
+
+    for graph in args.graph:
+        print(f"Candidate: {graph} @ {args.steps} steps", flush=True)
+        rows.extend(_measure(Path(graph), args.steps, args))
+
+    from tests.dtw import mfcc_distance
+
+    reference_audio = reference["audio"]
+    for row in rows:
+        row["mfcc_distance"] = sum(
+            mfcc_distance(r, a, row["sample_rate"])
+            for r, a in zip(reference_audio, row.pop("audio"))
+        ) / len(reference_audio)
+
+    print()
+    print(
+        f"{'graph':<32} {'steps':>5} {'size MB':>8} {'load s':>7} {'step ms':>8} "
+        f"{'RTF':>7} {'peak RSS MB':>11} {'MFCC dist':>10}"
+    )
+    for row in rows:
+        print(
+            f"{Path(row['graph']).name:<32} {row['steps']:>5} {row['size_mb']:8.0f} "
+            f"{row['load_seconds']:7.1f} {row['step_ms']:8.1f} "
+            f"{row['real_time_factor']:7.3f} {row['peak_rss_mb']:11.0f} "
+            f"{row['mfcc_distance']:10.4f}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as json_file:
+            json.dump(rows, json_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""Produce an int8 variant of a Piper voice for ``--prefer-quantized``.
+
+Piper voices are published as fp32 ONNX graphs. Post-training int8
+quantization makes them ~4x smaller and usually faster on CPU, at some
+quality cost that depends on the voice:
+
+* ``--mode dynamic`` (default) quantizes the weights of MatMul/Conv/Gather
+  ahead of time and the activations at run time. No calibration needed.
+* ``--mode static`` also quantizes activations (QDQ format, including
+  ConvTranspose in the decoder), calibrated by running the fp32 voice over a
+  few sentences (``--calibration-text``).
+
+The output is written next to the voice as ``<voice>.int8.onnx`` and reuses the
+voice's ``<voice>.onnx.json`` config. Start the server with
+``--prefer-quantized`` to serve it instead of the fp32 model.
+
+Afterwards the fp32 and int8 voices synthesize the same sentences
+(deterministically, with noise disabled) and a table compares their size,
+real-time factor, and quality: the MFCC distance between the two outputs after
+dynamic time warping (0 = identical), plus the difference in duration.
+
+Usage:
+    python script/quantize_piper.py /data/en_US-lessac-medium.onnx
+    python script/quantize_piper.py --mode static /data/en_US-lessac-medium.onnx
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+_REPO_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(_REPO_DIR))
+
+# pylint: disable=wrong-import-position
+from wyoming_piper.download import quantized_model_path  # noqa: E402
+
+DEFAULT_SENTENCES = [
+    "Turning on the kitchen lights.",
+    "The front door has been unlocked, and the alarm system is now disarmed.",
+    "Good morning! Today will be mostly cloudy with a high of seventy two "
+    "degrees, and a thirty percent chance of rain in the late afternoon.",
+    "Did you remember to water the plants on the balcony?",
+]
+
+
+def _preprocess(src: Path, tmp_dir: Path) -> Path:
+    """Shape inference + graph cleanup recommended before quantization."""
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    out = tmp_dir / "preprocessed.onnx"
+    try:
+        quant_pre_process(str(src), str(out), skip_symbolic_shape=True)
+        return out
+    except Exception as err:  # noqa: BLE001 - quantize the original instead
+        print(f"Pre-processing failed ({err}), using the model as-is", flush=True)
+
+    return src
+
+
+def _phoneme_ids(voice, sentences: Sequence[str]) -> List[List[int]]:
+    """Phoneme ids of every sentence, as the voice would synthesize them."""
+    ids = []
+    for text in sentences:
+        for phonemes in voice.phonemize(text):
+            ids.append(voice.phonemes_to_ids(phonemes))
+
+    return ids
+
+
+def _model_inputs(voice, phoneme_ids: List[int]) -> Dict[str, object]:
+    """Inputs for one sentence (mirrors PiperVoice.phoneme_ids_to_audio)."""
+    import numpy as np
+
+    inputs: Dict[str, object] = {
+        "input": np.array([phoneme_ids], dtype=np.int64),
+        "input_lengths": np.array([len(phoneme_ids)], dtype=np.int64),
+        "scales": np.array(
+            [
+                voice.config.noise_scale,
+                voice.config.length_scale,
+                voice.config.noise_w_scale,
+            ],
+            dtype=np.float32,
+        ),
+    }
+    if voice.config.num_speakers > 1:
+        inputs["sid"] = np.array([voice.config.default_speaker_id or 0], np.int64)
+
+    return inputs
+
+
+def _quantize_dynamic(src: Path, out: Path, per_channel: bool) -> None:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(
+        str(src),
+        str(out),
+        weight_type=QuantType.QInt8,
+        per_channel=per_channel,
+    )
+
+
+def _quantize_static(
+    src: Path, out: Path, voice, sentences: Sequence[str], per_channel: bool
+) -> None:
+    from onnxruntime.quantization import (
+        CalibrationDataReader,
+        QuantFormat,
+        QuantType,
+        quantize_static,
+    )
+
+    class PhonemeReader(CalibrationDataReader):
+        def __init__(self) -> None:
+            self._inputs = iter(
+                [_model_inputs(voice, ids) for ids in _phoneme_ids(voice, sentences)]
+            )
+
+        def get_next(self):  # type: ignore[no-untyped-def]
+            return next(self._inputs, None)
+
+    quantize_static(
+        str(src),
+        str(out),
+        PhonemeReader(),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=per_channel,
+    )
+
+
+def _synthesize(voice, sentences: Sequence[str], repeats: int):  # type: ignore[no-untyped-def]
+    """Audio per sentence (float32) and total synthesis seconds."""
+    import numpy as np
+    from piper import SynthesisConfig
+
+    syn_config = SynthesisConfig(noise_scale=0.0, noise_w_scale=0.0)
+
+    # Warm up
+    for _chunk in voice.synthesize(sentences[0], syn_config):
+        pass
+
+    audio: List = []
+    seconds = 0.0
+    for repeat in range(repeats):
+        for text in sentences:
+            start_time = time.perf_counter()
+            chunks = [c.audio_float_array for c in voice.synthesize(text, syn_config)]
+            seconds += time.perf_counter() - start_time
+            if repeat == 0:
+                audio.append(np.concatenate(chunks))
+
+    return audio, seconds
+
+
+def compare(
+    model_path: Path,
+    quantized_path: Path,
+    config_path: Path,
+    sentences: Sequence[str],
+    repeats: int,
+) -> None:
+    """Print size, RTF and quality of the quantized voice vs. fp32."""
+    from tests.dtw import mfcc_distance
+    from wyoming_piper.voice_loader import load_piper_voice
+
+    rows = []
+    reference = None
+    for label, path in (("fp32", model_path), ("int8", quantized_path)):
+        voice = load_piper_voice(path, config_path, use_cache=False)
+        sample_rate = voice.config.sample_rate
+        audio, seconds = _synthesize(voice, sentences, repeats)
+        audio_seconds = repeats * sum(len(a) for a in audio) / sample_rate
+        if reference is None:
+            reference = audio
+            distance = 0.0
+            duration_diff = 0.0
+        else:
+            distance = sum(
+                mfcc_distance(r, a, sample_rate) for r, a in zip(reference, audio)
+            ) / len(audio)
+            duration_diff = sum(
+                abs(len(a) - len(r)) / len(r) for r, a in zip(reference, audio)
+            ) / len(audio)
+
+        rows.append(
+            (
+                label,
+                path.stat().st_size / 1e6,
+                seconds / audio_seconds,
+                distance,
+                100 * duration_diff,
+            )
+        )
+
+    print()
+    print(f"{'model':<6} {'size MB':>8} {'RTF':>8} {'MFCC dist':>10} {'dur diff':>9}")
+    for label, size_mb, rtf, distance, duration_diff in rows:
+        print(
+            f"{label:<6} {size_mb:8.1f} {rtf:8.4f} {distance:10.6f} "
+            f"{duration_diff:8.1f}%"
+        )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("model", help="Piper voice .onnx (with .onnx.json next to it)")
+    ap.add_argument(
+        "--mode", choices=("dynamic", "static"), default="dynamic", help="int8 mode"
+    )
+    ap.add_argument("--out", help="Output path (default: <voice>.int8.onnx)")
+    ap.add_argument(
+        "--per-channel", action="store_true", help="Per-channel weight scales"
+    )
+    ap.add_argument(
+        "--calibration-text",
+        action="append",
+        help="Sentence for static calibration (repeatable)",
+    )
+    ap.add_argument(
+        "--no-compare", action="store_true", help="Skip the fp32 vs. int8 comparison"
+    )
+    ap.add_argument("--repeats", type=int, default=3, help="Timing repeats")
+    args = ap.parse_args()
+
+    model_path = Path(args.model)
+    config_path = model_path.with_name(model_path.name + ".json")
+    out = Path(args.out) if args.out else quantized_model_path(model_path)
+    sentences = args.calibration_text or DEFAULT_SENTENCES
+
+    t0 = time.time()
+    with tempfile.TemporaryDirectory() as tmp:
+        src = _preprocess(model_path, Path(tmp))
+        print(f"Quantizing {model_path} ({args.mode}) ...", flush=True)
+        if args.mode == "static":
+            from wyoming_piper.voice_loader import load_piper_voice
+
+            voice = load_piper_voice(model_path, config_path, use_cache=False)
+            _quantize_static(src, out, voice, sentences, args.per_channel)
+        else:
+            _quantize_dynamic(src, out, args.per_channel)
+
+    print(f"Done in {time.time() - t0:.0f}s — {out}", flush=True)
+
+    if not args.no_compare:
+        compare(model_path, out, config_path, sentences, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
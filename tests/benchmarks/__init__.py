@@ -0,0 +1,10 @@
+"""Micro-benchmarks for the server's hot paths.
+
+Not collected by pytest (modules are named ``bench_*``). Run with:
+
+    python -m tests.benchmarks [-k 'text.*'] [--check] [--save]
+
+``--check`` fails if any benchmark is more than ``--tolerance`` slower than
+``baseline.json``; ``--save`` records a new baseline. Baselines depend on the
+machine, so record one on the host you compare against.
+"""
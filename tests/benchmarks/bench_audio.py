@@ -0,0 +1,44 @@
+"""Audio chunking and event serialization."""
+
+import io
+
+from wyoming.audio import AudioChunk
+from wyoming.event import write_event
+
+from .common import make_handler
+from .runner import benchmark
+
+_RATE = 22050
+_WIDTH = 2
+_CHANNELS = 1
+
+# A few seconds of audio, like one synthesized sentence
+_AUDIO = bytes(_RATE * _WIDTH * _CHANNELS * 3)
+
+
+@benchmark("audio.write_chunks")
+def write_chunks():  # type: ignore[no-untyped-def]
+    handler = make_handler()
+
+    async def write() -> None:
+        await handler._write_audio_chunks(  # pylint: disable=protected-access
+            _AUDIO, _RATE, _WIDTH, _CHANNELS
+        )
+
+    return write
+
+
+@benchmark("audio.serialize_chunk")
+def serialize_chunk():  # type: ignore[no-untyped-def]
+    audio = _AUDIO[: 1024 * _WIDTH * _CHANNELS]
+
+    def serialize() -> None:
+        with io.BytesIO() as event_io:
+            write_event(
+                AudioChunk(
+                    audio=audio, rate=_RATE, width=_WIDTH, channels=_CHANNELS
+                ).event(),
+                event_io,
+            )
+
+    return serialize
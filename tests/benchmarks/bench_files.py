@@ -0,0 +1,74 @@
+"""Voice file checks done for every voice load."""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from wyoming_piper import catalog as catalog_module
+from wyoming_piper.catalog import load_catalog
+from wyoming_piper.download import ensure_voice_exists, find_voice
+
+from .common import EMBEDDED_VOICES, load_voices_info
+from .runner import benchmark
+
+_VOICE = "en_US-lessac-medium"
+
+
+def _data_dirs():  # type: ignore[no-untyped-def]
+    """Two data dirs; the voice is in the second (non-empty placeholder files)."""
+    temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+    first_dir = Path(temp_dir.name) / "first"
+    second_dir = Path(temp_dir.name) / "second"
+    first_dir.mkdir()
+    second_dir.mkdir()
+    for suffix in (".onnx", ".onnx.json"):
+        (second_dir / f"{_VOICE}{suffix}").write_bytes(b"\0")
+
+    # Unchanged for a while, like the data dirs of a running server
+    for data_dir in (first_dir, second_dir):
+        os.utime(data_dir, (time.time() - 60, time.time() - 60))
+
+    return temp_dir, [first_dir, second_dir]
+
+
+@benchmark("files.find_voice")
+def find_voice_files():  # type: ignore[no-untyped-def]
+    temp_dir, data_dirs = _data_dirs()
+
+    def find() -> None:
+        assert temp_dir  # keep the directory alive
+        find_voice(_VOICE, data_dirs)
+
+    return find
+
+
+@benchmark("files.ensure_voice_exists")
+def ensure_voice_files():  # type: ignore[no-untyped-def]
+    temp_dir, data_dirs = _data_dirs()
+    voices_info = load_voices_info()
+
+    def ensure() -> None:
+        ensure_voice_exists(_VOICE, data_dirs, temp_dir.name, voices_info)
+
+    return ensure
+
+
+@benchmark("files.load_voices_json")
+def load_voices_json():  # type: ignore[no-untyped-def]
+    return load_voices_info
+
+
+@benchmark("files.load_voice_catalog.cached")
+def load_cached_catalog():  # type: ignore[no-untyped-def]
+    """Start of a new process: catalog read from voices.cache."""
+    temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+    cache_dir = Path(temp_dir.name)
+    load_catalog([EMBEDDED_VOICES], cache_dir)
+
+    def load() -> None:
+        assert temp_dir  # keep the directory alive
+        catalog_module._LOADED.clear()  # pylint: disable=protected-access
+        load_catalog([EMBEDDED_VOICES], cache_dir)
+
+    return load
@@ -0,0 +1,61 @@
+"""Describe response with the full voice catalog."""
+
+from wyoming.info import Attribution, Describe, Info, TtsProgram, TtsVoice
+
+from wyoming_piper.describe import invalidate_info
+
+from .common import load_voices_info, make_handler
+from .runner import benchmark
+
+
+def _catalog_info() -> Info:
+    """Info listing every voice in voices.json, as the server builds it."""
+    attribution = Attribution(name="rhasspy", url="https://github.com/rhasspy/piper")
+    return Info(
+        tts=[
+            TtsProgram(
+                name="piper",
+                description="A fast, local, neural text to speech engine",
+                attribution=attribution,
+                installed=True,
+                version=None,
+                voices=[
+                    TtsVoice(
+                        name=voice.key,
+                        description=voice.description,
+                        attribution=attribution,
+                        installed=True,
+                        version=None,
+                        languages=[voice.language],
+                    )
+                    for voice in load_voices_info().voices.values()
+                ],
+            )
+        ]
+    )
+
+
+@benchmark("info.describe")
+def describe():  # type: ignore[no-untyped-def]
+    handler = make_handler()
+    handler.wyoming_info = _catalog_info()
+    event = Describe().event()
+
+    async def handle() -> None:
+        await handler.handle_event(event)
+
+    return handle
+
+
+@benchmark("info.describe.serialize")
+def describe_serialize():  # type: ignore[no-untyped-def]
+    """Describe after the voices changed."""
+    handler = make_handler()
+    handler.wyoming_info = _catalog_info()
+    event = Describe().event()
+
+    async def handle() -> None:
+        invalidate_info()
+        await handler.handle_event(event)
+
+    return handle
@@ -0,0 +1,189 @@
+"""OmniVoice LM step, voice-clone prompt cache and ONNX session pool.
+
+Needs the omnivoice extra and ``$WYOMING_PIPER_BENCH_OMNIVOICE`` (path to the
+ONNX graph). The prompt cache benchmarks also need
+``$WYOMING_PIPER_BENCH_OMNIVOICE_REF`` (a ``ref.wav`` with ``ref.txt`` next to
+it).
+
+The session pool benchmarks only need onnx and onnxruntime: concurrent
+requests run a stand-in graph (a stack of MatMuls) through pools of 1 and
+``_POOL_REQUESTS`` sessions. The pool only helps with spare cores.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Tuple
+
+from .runner import SkipBenchmark, benchmark
+
+# Text + reference + target tokens of a typical request
+_SEQUENCE_LENGTH = 200
+
+# Concurrent requests in the session pool benchmarks, and LM steps per request
+_POOL_REQUESTS = 2
+_POOL_STEPS = 4
+
+
+@lru_cache
+def _model() -> Any:
+    onnx_path = os.environ.get("WYOMING_PIPER_BENCH_OMNIVOICE")
+    if not onnx_path:
+        raise SkipBenchmark("WYOMING_PIPER_BENCH_OMNIVOICE not set")
+
+    try:
+        from wyoming_piper.omnivoice import OmniVoiceModel
+    except ImportError as err:
+        raise SkipBenchmark(str(err)) from err
+
+    return OmniVoiceModel(onnx_path, local_files_only=True)
+
+
+def _reference() -> Tuple[str, str]:
+    ref_audio = os.environ.get("WYOMING_PIPER_BENCH_OMNIVOICE_REF")
+    if not ref_audio:
+        raise SkipBenchmark("WYOMING_PIPER_BENCH_OMNIVOICE_REF not set")
+
+    ref_path = Path(ref_audio)
+    return str(ref_path), ref_path.with_suffix(".txt").read_text(encoding="utf-8")
+
+
+@benchmark("omnivoice.forward_step")
+def forward_step():  # type: ignore[no-untyped-def]
+    model = _model()
+    import torch
+
+    lm = model._model  # pylint: disable=protected-access
+
+    # Conditional + unconditional rows, all target tokens masked
+    input_ids = torch.full(
+        (2, lm.config.num_audio_codebook, _SEQUENCE_LENGTH),
+        lm.config.audio_mask_id,
+        dtype=torch.int64,
+    )
+    audio_mask = torch.ones((2, _SEQUENCE_LENGTH), dtype=torch.bool)
+
+    def step() -> None:
+        with torch.no_grad():
+            lm.forward(input_ids, audio_mask)
+
+    return step
+
+
+@benchmark("omnivoice.clone_prompt.hit")
+def clone_prompt_hit():  # type: ignore[no-untyped-def]
+    model = _model()
+    ref_audio, ref_text = _reference()
+    model._voice_clone_prompt(ref_audio, ref_text)  # pylint: disable=protected-access
+
+    return lambda: model._voice_clone_prompt(  # pylint: disable=protected-access
+        ref_audio, ref_text
+    )
+
+
+def _register_miss(name: str, keep_rvq: bool) -> None:
+    @benchmark(f"omnivoice.clone_prompt.{name}")
+    def clone_prompt_miss():  # type: ignore[no-untyped-def]
+        model = _model()
+        ref_audio, ref_text = _reference()
+
+        # Work on a copy so the real ref.rvq is left alone
+        temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        wav_path = Path(temp_dir.name) / "ref.wav"
+        shutil.copy(ref_audio, wav_path)
+        rvq_path = wav_path.with_suffix(".rvq")
+
+        def load() -> None:
+            model._prompt_cache.clear()  # pylint: disable=protected-access
+            if not keep_rvq:
+                rvq_path.unlink(missing_ok=True)
+
+            model._voice_clone_prompt(  # pylint: disable=protected-access
+                str(wav_path), ref_text
+            )
+
+        return load
+
+
+# In-memory miss, encoded codes loaded from ref.rvq
+_register_miss("miss_disk", keep_rvq=True)
+
+# Full miss, reference audio encoded again
+_register_miss("miss_encode", keep_rvq=False)
+
+
+@lru_cache
+def _pool_graph() -> str:
+    """Stand-in LM graph: MatMuls on a (sequence, hidden) input."""
+    try:
+        import numpy as np
+        import onnx
+        from onnx import TensorProto, helper, numpy_helper
+    except ImportError as err:
+        raise SkipBenchmark(str(err)) from err
+
+    hidden, num_layers = 512, 8
+    rng = np.random.default_rng(0)
+    nodes = []
+    weights = []
+    name = "x"
+    for layer in range(num_layers):
+        weight = f"w{layer}"
+        weights.append(
+            numpy_helper.from_array(
+                rng.standard_normal((hidden, hidden), dtype=np.float32) / hidden,
+                weight,
+            )
+        )
+        output = "logits" if layer == (num_layers - 1) else f"h{layer}"
+        nodes.append(helper.make_node("MatMul", [name, weight], [output]))
+        name = output
+
+    graph = helper.make_graph(
+        nodes,
+        "pool_bench",
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, [None, hidden])],
+        [helper.make_tensor_value_info("logits", TensorProto.FLOAT, [None, hidden])],
+        weights,
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+
+    temp_dir = tempfile.mkdtemp()
+    onnx_path = os.path.join(temp_dir, "pool_bench.onnx")
+    onnx.save(model, onnx_path)
+    return onnx_path
+
+
+def _register_pool(size: int) -> None:
+    @benchmark(f"omnivoice.session_pool.{size}")
+    def session_pool():  # type: ignore[no-untyped-def]
+        """_POOL_REQUESTS concurrent requests of _POOL_STEPS steps each."""
+        import numpy as np
+
+        from wyoming_piper.omnivoice import OnnxSessionPool
+
+        pool = OnnxSessionPool(_pool_graph(), size=size)
+        feeds = {"x": np.ones((_SEQUENCE_LENGTH, 512), dtype=np.float32)}
+
+        def request() -> None:
+            with pool.checkout() as session:
+                for _step in range(_POOL_STEPS):
+                    session.run(["logits"], feeds)
+
+        def requests() -> None:
+            threads = [threading.Thread(target=request) for _ in range(_POOL_REQUESTS)]
+            for thread in threads:
+                thread.start()
+
+            for thread in threads:
+                thread.join()
+
+        return requests
+
+
+_register_pool(1)
+_register_pool(_POOL_REQUESTS)
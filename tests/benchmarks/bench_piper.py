@@ -0,0 +1,54 @@
+"""Piper inference per sentence length.
+
+Uses the voice in ``$WYOMING_PIPER_BENCH_VOICE`` (a ``.onnx`` path) or the
+test voice in ``local/``.
+"""
+
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from piper import PiperVoice, SynthesisConfig
+
+from .common import LONG_TEXT, MEDIUM_TEXT, SHORT_TEXT
+from .runner import SkipBenchmark, benchmark
+
+_LOCAL_VOICE = Path(__file__).parent.parent.parent / "local" / "en_US-ryan-low.onnx"
+
+# Deterministic output so every run does the same work
+_SYN_CONFIG = SynthesisConfig(noise_scale=0.0, noise_w_scale=0.0)
+
+
+@lru_cache
+def _voice() -> PiperVoice:
+    model_path = Path(os.environ.get("WYOMING_PIPER_BENCH_VOICE", _LOCAL_VOICE))
+    if not model_path.is_file():
+        raise SkipBenchmark(f"no voice at {model_path}")
+
+    return PiperVoice.load(model_path)
+
+
+@benchmark("piper.phonemize")
+def phonemize():  # type: ignore[no-untyped-def]
+    voice = _voice()
+    return lambda: voice.phonemize(MEDIUM_TEXT)
+
+
+def _register_inference(name: str, text: str) -> None:
+    @benchmark(f"piper.infer.{name}")
+    def infer():  # type: ignore[no-untyped-def]
+        voice = _voice()
+        phoneme_ids = [
+            voice.phonemes_to_ids(phonemes) for phonemes in voice.phonemize(text)
+        ]
+
+        def run() -> None:
+            for sentence_ids in phoneme_ids:
+                voice.phoneme_ids_to_audio(sentence_ids, _SYN_CONFIG)
+
+        return run
+
+
+_register_inference("short", SHORT_TEXT)
+_register_inference("medium", MEDIUM_TEXT)
+_register_inference("long", LONG_TEXT)
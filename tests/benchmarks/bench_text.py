@@ -0,0 +1,61 @@
+"""Text preparation, voice resolution and sentence splitting."""
+
+from sentence_stream import SentenceBoundaryDetector
+from wyoming.tts import Synthesize, SynthesizeVoice
+
+from .common import MEDIUM_TEXT, PARAGRAPH, load_voices_info, make_handler
+from .runner import benchmark
+
+
+@benchmark("text.prepare")
+def prepare_text():  # type: ignore[no-untyped-def]
+    handler = make_handler()
+    raw_text = MEDIUM_TEXT.rstrip(".") + "\n"
+    return lambda: handler._prepare_text(raw_text)  # pylint: disable=protected-access
+
+
+@benchmark("text.resolve_voice.default")
+def resolve_default_voice():  # type: ignore[no-untyped-def]
+    handler = make_handler(load_voices_info())
+    synthesize = Synthesize(text=MEDIUM_TEXT)
+    return lambda: handler._resolve_voice(
+        synthesize
+    )  # pylint: disable=protected-access
+
+
+@benchmark("text.resolve_voice.alias")
+def resolve_voice_alias():  # type: ignore[no-untyped-def]
+    voices_info = load_voices_info()
+    alias = next(iter(voices_info.aliases))
+    handler = make_handler(voices_info)
+    synthesize = Synthesize(text=MEDIUM_TEXT, voice=SynthesizeVoice(name=alias))
+    return lambda: handler._resolve_voice(
+        synthesize
+    )  # pylint: disable=protected-access
+
+
+@benchmark("text.split_sentences.paragraph")
+def split_paragraph():  # type: ignore[no-untyped-def]
+    def split() -> None:
+        sbd = SentenceBoundaryDetector()
+        list(sbd.add_chunk(PARAGRAPH))
+        sbd.finish()
+
+    return split
+
+
+@benchmark("text.split_sentences.stream")
+def split_stream():  # type: ignore[no-untyped-def]
+    # Three words per chunk, like a streaming LLM response
+    words = PARAGRAPH.split(" ")
+    chunks = [" ".join(words[i : i + 3]) + " " for i in range(0, len(words), 3)]
+
+    def split() -> None:
+        sbd = SentenceBoundaryDetector()
+        for chunk in chunks:
+            for _sentence in sbd.add_chunk(chunk):
+                pass
+
+        sbd.finish()
+
+    return split
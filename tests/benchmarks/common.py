@@ -0,0 +1,75 @@
+"""Shared setup for the micro-benchmarks."""
+
+import argparse
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from wyoming.info import Info
+
+import wyoming_piper
+from wyoming_piper.catalog import VoiceCatalog, parse_voices_json
+from wyoming_piper.handler import PiperEventHandler
+
+SHORT_TEXT = "Turning on the kitchen lights."
+MEDIUM_TEXT = "The front door has been unlocked, and the alarm system is now disarmed."
+LONG_TEXT = (
+    "Good morning! Today will be mostly cloudy with a high of seventy two "
+    "degrees, a light breeze from the west, and a thirty percent chance of rain "
+    "in the late afternoon, so you may want to bring an umbrella when you leave."
+)
+EMBEDDED_VOICES = Path(wyoming_piper.__file__).parent / "voices.json"
+
+PARAGRAPH = " ".join((SHORT_TEXT, MEDIUM_TEXT, LONG_TEXT)) * 3
+
+
+class NullWriter:
+    """Stream writer that discards everything (counts bytes)."""
+
+    def __init__(self) -> None:
+        self.num_bytes = 0
+
+    def write(self, data: bytes) -> None:
+        self.num_bytes += len(data)
+
+    def writelines(self, data: Any) -> None:
+        for item in data:
+            self.num_bytes += len(item)
+
+    async def drain(self) -> None:
+        pass
+
+
+def load_voices_info() -> VoiceCatalog:
+    """Catalog of the embedded voices.json, parsed without the cache."""
+    return parse_voices_json([EMBEDDED_VOICES])
+
+
+def make_cli_args(**overrides: Any) -> argparse.Namespace:
+    """Server arguments with the defaults of ``wyoming_piper.__main__``."""
+    args: Dict[str, Any] = {
+        "backend": "piper",
+        "voice": "en_US-lessac-medium",
+        "speaker": None,
+        "data_dir": [],
+        "download_dir": None,
+        "auto_punctuation": ".?!。？！．؟",
+        "samples_per_chunk": 1024,
+        "no_streaming": False,
+        "sentence_silence": None,
+        "prefer_quantized": False,
+    }
+    args.update(overrides)
+    return argparse.Namespace(**args)
+
+
+def make_handler(
+    voices_info: Optional[VoiceCatalog] = None, **overrides: Any
+) -> PiperEventHandler:
+    """Handler writing to a :class:`NullWriter`."""
+    return PiperEventHandler(
+        Info(),
+        make_cli_args(**overrides),
+        voices_info or VoiceCatalog(),
+        None,
+        NullWriter(),
+    )
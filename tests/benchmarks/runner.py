@@ -0,0 +1,262 @@
+"""Runner for the micro-benchmarks.
+
+Benchmarks are registered with :func:`benchmark` on a *factory*: it does the
+setup and returns the function to time (sync or async, no arguments), or raises
+:class:`SkipBenchmark` if something it needs is missing (a voice, the omnivoice
+extra, ...).
+
+Each benchmark is calibrated so one repeat takes at least ``--min-time``
+seconds, then timed for ``--repeats`` repeats with garbage collection disabled.
+The median time per call is compared against the saved baseline.
+"""
+
+import argparse
+import asyncio
+import gc
+import importlib
+import inspect
+import json
+import pkgutil
+import platform
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+_DIR = Path(__file__).parent
+DEFAULT_BASELINE = _DIR / "baseline.json"
+
+# Registered factories, by benchmark name
+_FACTORIES: Dict[str, Callable[[], Callable[[], Any]]] = {}
+
+
+class SkipBenchmark(Exception):
+    """Raised by a factory when the benchmark can't run here."""
+
+
+def benchmark(
+    name: str,
+) -> Callable[[Callable[[], Callable[[], Any]]], Callable[[], Callable[[], Any]]]:
+    """Register a benchmark factory under ``name`` (``<group>.<case>``)."""
+
+    def register(
+        factory: Callable[[], Callable[[], Any]],
+    ) -> Callable[[], Callable[[], Any]]:
+        if name in _FACTORIES:
+            raise ValueError(f"Duplicate benchmark: {name}")
+
+        _FACTORIES[name] = factory
+        return factory
+
+    return register
+
+
+@dataclass
+class Timing:
+    """Seconds per call of one benchmark."""
+
+    name: str
+    loops: int
+    median: float
+    minimum: float
+    spread: float  # (max - min) / median over repeats
+
+
+def load_benchmarks() -> Dict[str, Callable[[], Callable[[], Any]]]:
+    """Import every ``bench_*`` module in this package."""
+    for module_info in pkgutil.iter_modules([str(_DIR)]):
+        if module_info.name.startswith("bench_"):
+            importlib.import_module(f"{__package__}.{module_info.name}")
+
+    return dict(sorted(_FACTORIES.items()))
+
+
+def _make_runner(func: Callable[[], Any]) -> Callable[[int], float]:
+    """Function that calls ``func`` N times and returns the elapsed seconds."""
+    if inspect.iscoroutinefunction(func):
+        loop = asyncio.new_event_loop()
+
+        async def call_n(loops: int) -> float:
+            start_time = time.perf_counter()
+            for _ in range(loops):
+                await func()
+
+            return time.perf_counter() - start_time
+
+        return lambda loops: loop.run_until_complete(call_n(loops))
+
+    def run_n(loops: int) -> float:
+        start_time = time.perf_counter()
+        for _ in range(loops):
+            func()
+
+        return time.perf_counter() - start_time
+
+    return run_n
+
+
+def time_benchmark(
+    name: str, func: Callable[[], Any], repeats: int = 7, min_time: float = 0.1
+) -> Timing:
+    """Calibrate and time ``func``."""
+    run_n = _make_runner(func)
+
+    # Warm up and find the number of loops for min_time per repeat
+    loops = 1
+    while True:
+        elapsed = run_n(loops)
+        if elapsed >= min_time:
+            break
+
+        loops *= 2 if elapsed <= 0 else max(2, int(min_time / elapsed) + 1)
+
+    per_call: List[float] = []
+    gc_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            per_call.append(run_n(loops) / loops)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    median = statistics.median(per_call)
+    return Timing(
+        name=name,
+        loops=loops,
+        median=median,
+        minimum=min(per_call),
+        spread=(max(per_call) - min(per_call)) / median if median > 0 else 0.0,
+    )
+
+
+def _format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def _machine() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m tests.benchmarks", description="Run the micro-benchmarks"
+    )
+    parser.add_argument(
+        "-k", "--filter", default="*", help="Only run benchmarks matching this glob"
+    )
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument(
+        "--min-time", type=float, default=0.1, help="Minimum seconds per repeat"
+    )
+    parser.add_argument(
+        "--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON file"
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="Save the results as the new baseline"
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit with an error if a benchmark regressed",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown vs. the baseline median (default: 0.25 = 25%%)",
+    )
+    parser.add_argument("--list", action="store_true", help="List benchmarks")
+    args = parser.parse_args()
+
+    factories = {
+        name: factory
+        for name, factory in load_benchmarks().items()
+        if fnmatch(name, args.filter)
+    }
+    if args.list:
+        print("\n".join(factories))
+        return
+
+    baseline_path = Path(args.baseline)
+    baseline: Dict[str, Any] = {}
+    if baseline_path.is_file():
+        with open(baseline_path, "r", encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+
+        if baseline.get("machine") != _machine():
+            print(
+                f"Note: baseline was recorded on {baseline.get('machine')}",
+                file=sys.stderr,
+            )
+
+    baseline_timings = baseline.get("benchmarks", {})
+    timings: Dict[str, Timing] = {}
+    regressions: List[str] = []
+
+    print(f"{'benchmark':<44} {'median':>12} {'spread':>7} {'vs. baseline':>13}")
+    for name, factory in factories.items():
+        try:
+            func = factory()
+        except SkipBenchmark as err:
+            print(f"{name:<44} {'skipped':>12}  ({err})")
+            continue
+
+        timing = time_benchmark(name, func, args.repeats, args.min_time)
+        timings[name] = timing
+
+        change = ""
+        baseline_median: Optional[float] = baseline_timings.get(name, {}).get("median")
+        if baseline_median:
+            ratio = timing.median / baseline_median
+            change = f"{(ratio - 1) * 100:+.1f}%"
+            if ratio > 1 + args.tolerance:
+                change += " !"
+                regressions.append(name)
+
+        print(
+            f"{name:<44} {_format_seconds(timing.median):>12} "
+            f"{timing.spread * 100:6.1f}% {change:>13}"
+        )
+
+    if args.save:
+        saved = dict(baseline_timings) if args.filter != "*" else {}
+        saved.update(
+            {
+                name: {
+                    key: value for key, value in asdict(timing).items() if key != "name"
+                }
+                for name, timing in timings.items()
+            }
+        )
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as baseline_file:
+            json.dump(
+                {"machine": _machine(), "benchmarks": dict(sorted(saved.items()))},
+                baseline_file,
+                indent=2,
+            )
+            baseline_file.write("\n")
+
+        print(f"Saved baseline: {baseline_path}")
+
+    if regressions:
+        print(
+            f"{len(regressions)} regression(s) over {args.tolerance:.0%}: "
+            + ", ".join(regressions),
+            file=sys.stderr,
+        )
+        if args.check:
+            sys.exit(1)
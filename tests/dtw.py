@@ -1,11 +1,30 @@
+"""Dynamic time warping (DTW) distance for comparing audio.
+
+The cost matrix is filled one anti-diagonal at a time: every cell on diagonal
+``i + j`` depends only on the two previous diagonals, so each diagonal is a
+single vectorized numpy step and the Python loop runs ``m + n`` times instead
+of ``m * n``. An optional Sakoe-Chiba band skips cells far from the (scaled)
+diagonal, for long inputs that are known to be roughly aligned.
+"""
+
 import math
+from typing import Optional
 
 import numpy as np
 import scipy
 
 
-def compute_optimal_path(x: np.ndarray, y: np.ndarray) -> float:
-    """Computes optimal path between x and y."""
+def compute_optimal_path(
+    x: np.ndarray,
+    y: np.ndarray,
+    band: Optional[int] = None,
+    metric: str = "cosine",
+) -> float:
+    """Computes optimal path between x and y.
+
+    With ``band``, only cells within ``band`` rows of the diagonal (scaled for
+    unequal lengths) are considered; inf if no path fits in the band.
+    """
     m = len(x)
     n = len(y)
 
@@ -16,28 +35,68 @@ def compute_optimal_path(x: np.ndarray, y: np.ndarray) -> float:
     if len(y.shape) == 1:
         y = y.reshape(-1, 1)
 
-    distance_matrix = scipy.spatial.distance.cdist(x, y, metric="cosine")
+    distance_matrix = scipy.spatial.distance.cdist(x, y, metric=metric).ravel()
 
-    cost_matrix = np.full(shape=(m, n), fill_value=math.inf, dtype=float)
-    cost_matrix[0][0] = distance_matrix[0][0]
+    # Flattened (m + 1) x (n + 1) matrix with an inf border, so every cell has
+    # three predecessors: cell (row, col) is the cost of aligning x[:row] with
+    # y[:col]. Cells on one anti-diagonal are n apart in memory (n - 1 in the
+    # distance matrix), so each diagonal is a strided slice.
+    width = n + 1
+    cost_matrix = np.full((m + 1) * width, fill_value=math.inf, dtype=float)
+    cost_matrix[0] = 0.0
+    distance_step = max(1, n - 1)
+    slope = m / n
 
-    for row in range(1, m):
-        cost = distance_matrix[row, 0]
-        cost_matrix[row][0] = cost + cost_matrix[row - 1][0]
+    for diagonal in range(2, m + n + 1):
+        # Rows of cells (row, diagonal - row) with 1 <= row <= m, 1 <= col <= n
+        first_row = max(1, diagonal - n)
+        last_row = min(m, diagonal - 1)
+        if band is not None:
+            # |row - col * slope| <= band is a contiguous range of rows
+            first_row = max(
+                first_row, math.ceil((diagonal * slope - band) / (1 + slope))
+            )
+            last_row = min(
+                last_row, math.floor((diagonal * slope + band) / (1 + slope))
+            )
+            if first_row > last_row:
+                continue
 
-    for col in range(1, n):
-        cost = distance_matrix[0, col]
-        cost_matrix[0][col] = cost + cost_matrix[0][col - 1]
+        start = (first_row * width) + (diagonal - first_row)
+        stop = (last_row * width) + (diagonal - last_row) + 1
+        cost = np.minimum(
+            cost_matrix[start - width : stop - width : n],  # insertion
+            cost_matrix[start - 1 : stop - 1 : n],  # deletion
+        )
+        np.minimum(
+            cost, cost_matrix[start - width - 1 : stop - width - 1 : n], out=cost
+        )  # match
 
-    for row in range(1, m):
-        for col in range(1, n):
-            cost = distance_matrix[row, col]
-            cost_matrix[row][col] = cost + min(
-                cost_matrix[row - 1][col],  # insertion
-                cost_matrix[row][col - 1],  # deletion
-                cost_matrix[row - 1][col - 1],  # match
-            )
+        distance_start = ((first_row - 1) * n) + (diagonal - first_row - 1)
+        distance_stop = ((last_row - 1) * n) + (diagonal - last_row - 1) + 1
+        cost += distance_matrix[distance_start:distance_stop:distance_step]
+        cost_matrix[start:stop:n] = cost
+
+    distance = cost_matrix[-1]
+
+    return float(distance)
+
+
+def mfcc_distance(
+    reference: np.ndarray,
+    candidate: np.ndarray,
+    sample_rate: int,
+    band: Optional[int] = None,
+) -> float:
+    """DTW distance between MFCCs of two audio clips, per frame.
+
+    0 means identical; used to score synthesized audio against a reference.
+    """
+    import python_speech_features
 
-    distance = cost_matrix[m - 1][n - 1]
+    ref_mfcc = python_speech_features.mfcc(reference, samplerate=sample_rate)
+    cand_mfcc = python_speech_features.mfcc(candidate, samplerate=sample_rate)
 
-    return distance
+    return compute_optimal_path(ref_mfcc, cand_mfcc, band=band) / (
+        len(ref_mfcc) + len(cand_mfcc)
+    )
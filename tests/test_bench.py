@@ -0,0 +1,37 @@
+"""Tests for the load testing statistics"""
+
+import math
+
+from wyoming_piper.bench import RequestResult, _text_chunks, percentile, summarize
+
+
+def test_percentile() -> None:
+    assert percentile([], 50) is None
+    assert percentile([3.0], 99) == 3.0
+    assert percentile([4.0, 1.0, 3.0, 2.0], 50) == 2.5
+    assert math.isclose(percentile(list(range(101)), 95) or 0, 95)
+
+
+def test_summarize() -> None:
+    results = [
+        RequestResult("a", None, "synthesize", 0, start=10.0, end=11.0),
+        RequestResult("b", None, "stream", 1, start=10.5, end=12.0),
+        RequestResult("c", None, "synthesize", 0, start=11.0, end=11.5, error="x"),
+    ]
+    results[0].ttfa, results[0].ttla, results[0].audio_seconds = 0.1, 0.5, 2.0
+    results[1].ttfa, results[1].ttla, results[1].audio_seconds = 0.3, 1.0, 2.0
+
+    summary = summarize(results)
+    assert summary["requests"] == 3
+    assert summary["errors"] == 1
+    assert summary["wall_seconds"] == 2.0
+    assert summary["audio_seconds_per_second"] == 2.0
+    assert math.isclose(summary["ttfa"]["p50"], 0.2)
+    assert math.isclose(summary["rtf"]["mean"], 0.375)
+
+
+def test_text_chunks() -> None:
+    text = "one two three four five"
+    chunks = _text_chunks(text, 2)
+    assert chunks == ["one two ", "three four ", "five"]
+    assert "".join(chunks) == text
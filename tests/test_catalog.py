@@ -0,0 +1,129 @@
+"""Tests for the voice catalog"""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from wyoming_piper import catalog
+from wyoming_piper.catalog import CACHE_FILE, VoiceCatalog, load_catalog
+from wyoming_piper.download import get_voice_catalog, get_voices
+
+
+def _voice(key: str, aliases=(), speakers=None) -> dict:
+    family = key.split("_")[0]
+    return {
+        "key": key,
+        "name": key.split("-")[1],
+        "language": {"code": key.split("-")[0], "family": family},
+        "quality": key.split("-")[2],
+        "speaker_id_map": speakers or {},
+        "files": {f"{family}/{key}.onnx": {}, f"{family}/{key}.onnx.json": {}},
+        "aliases": list(aliases),
+    }
+
+
+def _write_voices(path: Path, *voices: dict) -> None:
+    path.write_text(json.dumps({voice["key"]: voice for voice in voices}))
+
+
+@pytest.fixture(autouse=True)
+def _clear_loaded():
+    catalog._LOADED.clear()  # pylint: disable=protected-access
+    yield
+    catalog._LOADED.clear()  # pylint: disable=protected-access
+
+
+def test_indexes() -> None:
+    voices = VoiceCatalog(
+        catalog.VoiceRecord.from_json(key, voice)
+        for key, voice in get_voices("/nonexistent").items()
+    )
+
+    assert "en_US-lessac-medium" in voices
+    assert voices.resolve("en-us-lessac-medium") == "en_US-lessac-medium"
+    assert voices.get("en-us-lessac-medium") is voices.voices["en_US-lessac-medium"]
+    assert voices.resolve("not-a-voice") == "not-a-voice"
+    assert "en-us-lessac-medium" in voices
+    assert "en-us-lessac-medium" not in list(voices)
+
+    assert {voice.language for voice in voices.languages("de")} == {"de_DE"}
+    assert all(voice.language == "en_GB" for voice in voices.languages("en_GB"))
+    assert len(voices.languages("en")) == len(voices.languages("en_US", "en_GB"))
+
+    voices.remove("en_US-lessac-medium")
+    assert "en-us-lessac-medium" not in voices
+    assert "en_US-lessac-medium" not in voices.by_language["en_US"]
+
+
+def test_downloaded_overrides_embedded(tmp_path: Path) -> None:
+    embedded = tmp_path / "embedded.json"
+    _write_voices(embedded, _voice("en_US-test-low"), _voice("de_DE-test-low"))
+    downloaded = tmp_path / "voices.json"
+    _write_voices(downloaded, _voice("en_US-test-low", aliases=["en-us-test-low"]))
+
+    voices = load_catalog([embedded, downloaded], tmp_path)
+    assert sorted(voices) == ["de_DE-test-low", "en_US-test-low"]
+    assert voices.aliases == {"en-us-test-low": "en_US-test-low"}
+    assert voices.voices["en_US-test-low"].files == (
+        "en/en_US-test-low.onnx",
+        "en/en_US-test-low.onnx.json",
+    )
+
+
+def test_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    source = tmp_path / "embedded.json"
+    _write_voices(source, _voice("en_US-test-low", speakers={"a": 0, "b": 1}))
+
+    voices = load_catalog([source], tmp_path)
+    assert (tmp_path / CACHE_FILE).exists()
+    assert voices.voices["en_US-test-low"].speakers == ("a", "b")
+
+    # Same catalog while the source doesn't change
+    assert load_catalog([source], tmp_path) is voices
+
+    # New process: read from the cache
+    catalog._LOADED.clear()  # pylint: disable=protected-access
+    parsed = []
+    parse_voices_json = catalog.parse_voices_json
+    monkeypatch.setattr(
+        catalog,
+        "parse_voices_json",
+        lambda sources: parsed.append(sources) or parse_voices_json(sources),
+    )
+    cached = load_catalog([source], tmp_path)
+    assert cached is not voices
+    assert cached.voices == voices.voices
+    assert cached.by_language == voices.by_language
+    assert not parsed
+
+    # Plain JSON, not pickled objects
+    files = list(voices.voices["en_US-test-low"].files)
+    assert json.loads((tmp_path / CACHE_FILE).read_text())["voices"] == [
+        ["en_US-test-low", "test", "low", "en_US", ["a", "b"], files, []]
+    ]
+
+    # Touched, same contents
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    catalog._LOADED.clear()  # pylint: disable=protected-access
+    load_catalog([source], tmp_path)
+    assert not parsed
+
+    # Changed contents
+    _write_voices(source, _voice("en_US-test-low"), _voice("fr_FR-test-low"))
+    voices = load_catalog([source], tmp_path)
+    assert len(parsed) == 1
+    assert sorted(voices) == ["en_US-test-low", "fr_FR-test-low"]
+
+
+def test_unreadable_cache(tmp_path: Path) -> None:
+    (tmp_path / CACHE_FILE).write_bytes(b"\x80not json")
+    voices = get_voice_catalog(tmp_path)
+    assert len(voices) == len(get_voices(tmp_path))
+
+    # Rewritten
+    catalog._LOADED.clear()  # pylint: disable=protected-access
+    assert len(get_voice_catalog(tmp_path)) == len(voices)
+    assert (tmp_path / CACHE_FILE).read_bytes() != b"\x80not json"
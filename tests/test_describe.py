@@ -0,0 +1,118 @@
+"""Tests for the pre-serialized Describe response"""
+
+import asyncio
+import io
+
+from wyoming.audio import AudioChunk
+from wyoming.event import async_read_event, write_event
+from wyoming.info import Attribution, Describe, Info, TtsProgram, TtsVoice
+
+from wyoming_piper.describe import (
+    filter_voices,
+    info_event_bytes,
+    invalidate_info,
+    serialize_event,
+)
+
+from .benchmarks.common import make_handler
+
+_ATTRIBUTION = Attribution(name="", url="")
+
+
+def _voice(name: str, *languages: str) -> TtsVoice:
+    return TtsVoice(
+        name=name,
+        description=name,
+        attribution=_ATTRIBUTION,
+        installed=True,
+        version=None,
+        languages=list(languages),
+    )
+
+
+def _info(*voices: TtsVoice) -> Info:
+    return Info(
+        tts=[
+            TtsProgram(
+                name="piper",
+                description="piper",
+                attribution=_ATTRIBUTION,
+                installed=True,
+                version=None,
+                voices=list(voices),
+            )
+        ]
+    )
+
+
+def test_serialize_event() -> None:
+    for event in (
+        _info(_voice("en_US-test-low", "en_US")).event(),
+        AudioChunk(rate=22050, width=2, channels=1, audio=b"\x01\x02").event(),
+        Describe().event(),
+    ):
+        with io.BytesIO() as event_io:
+            write_event(event, event_io)
+            assert serialize_event(event) == event_io.getvalue()
+
+
+def test_info_cached() -> None:
+    info = _info(_voice("en_US-test-low", "en_US"))
+    info_bytes = info_event_bytes(info)
+    assert info_event_bytes(info) is info_bytes
+
+    # Voices changed in place
+    info.tts[0].voices.append(_voice("de_DE-test-low", "de_DE"))
+    assert info_event_bytes(info) is info_bytes
+    invalidate_info()
+    assert b"de_DE-test-low" in info_event_bytes(info)
+
+    # Another Info
+    assert info_event_bytes(_info()) != info_event_bytes(info)
+
+
+async def test_handler_describe() -> None:
+    info = _info(_voice("en_US-test-low", "en_US"))
+    handler = make_handler()
+    handler.wyoming_info = info
+
+    writer = handler.writer
+    written = bytearray()
+    writer.write = written.extend  # type: ignore[method-assign]
+    assert await handler.handle_event(Describe().event())
+
+    reader = asyncio.StreamReader()
+    reader.feed_data(bytes(written))
+    reader.feed_eof()
+    event = await async_read_event(reader)
+    assert event is not None
+    assert Info.from_event(event) == info
+
+
+def test_filter_voices() -> None:
+    voices = [
+        _voice("en_US-test-low", "en_US"),
+        _voice("en_GB-test-low", "en_GB"),
+        _voice("de_DE-test-low", "de_DE"),
+        _voice("default", "de", "en", "fr"),
+    ]
+
+    assert [voice.name for voice in filter_voices(voices, ["en"])] == [
+        "en_US-test-low",
+        "en_GB-test-low",
+        "default",
+    ]
+    assert [voice.name for voice in filter_voices(voices, ["en-us", "de"])] == [
+        "en_US-test-low",
+        "de_DE-test-low",
+        "default",
+    ]
+
+    # Only the matching languages are listed
+    assert filter_voices(voices, ["fr"])[0].languages == ["fr"]
+    assert voices[3].languages == ["de", "en", "fr"]
+
+    # Kept without a matching language
+    assert [
+        voice.name for voice in filter_voices(voices, ["fr"], keep={"de_DE-test-low"})
+    ] == ["de_DE-test-low", "default"]
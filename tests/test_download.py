@@ -0,0 +1,31 @@
+"""Tests for finding voice files"""
+
+from pathlib import Path
+
+import pytest
+
+from wyoming_piper.download import VoiceNotFoundError, find_voice
+
+
+def test_find_voice_prefers_quantized(tmp_path: Path) -> None:
+    (tmp_path / "en_US-test-low.onnx").write_bytes(b"")
+    (tmp_path / "en_US-test-low.onnx.json").write_text("{}")
+
+    # No quantized variant yet
+    assert find_voice("en_US-test-low", [tmp_path], prefer_quantized=True) == (
+        tmp_path / "en_US-test-low.onnx",
+        tmp_path / "en_US-test-low.onnx.json",
+    )
+
+    (tmp_path / "en_US-test-low.int8.onnx").write_bytes(b"")
+    assert find_voice("en_US-test-low", [tmp_path], prefer_quantized=True) == (
+        tmp_path / "en_US-test-low.int8.onnx",
+        tmp_path / "en_US-test-low.onnx.json",
+    )
+    assert find_voice("en_US-test-low", [tmp_path])[0] == (
+        tmp_path / "en_US-test-low.onnx"
+    )
+
+    # Not a voice of its own
+    with pytest.raises(VoiceNotFoundError):
+        find_voice("en_US-test-low.int8", [tmp_path])
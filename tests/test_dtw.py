@@ -0,0 +1,55 @@
+"""Tests for the vectorized DTW distance"""
+
+import math
+
+import numpy as np
+import scipy
+
+from .dtw import compute_optimal_path
+
+
+def _loop_optimal_path(x: np.ndarray, y: np.ndarray) -> float:
+    """Straightforward DTW, cell by cell."""
+    distance_matrix = scipy.spatial.distance.cdist(x, y, metric="cosine")
+    m, n = distance_matrix.shape
+    cost_matrix = np.full(shape=(m, n), fill_value=math.inf, dtype=float)
+    cost_matrix[0][0] = distance_matrix[0][0]
+
+    for row in range(1, m):
+        cost_matrix[row][0] = distance_matrix[row, 0] + cost_matrix[row - 1][0]
+
+    for col in range(1, n):
+        cost_matrix[0][col] = distance_matrix[0, col] + cost_matrix[0][col - 1]
+
+    for row in range(1, m):
+        for col in range(1, n):
+            cost_matrix[row][col] = distance_matrix[row, col] + min(
+                cost_matrix[row - 1][col],
+                cost_matrix[row][col - 1],
+                cost_matrix[row - 1][col - 1],
+            )
+
+    return cost_matrix[m - 1][n - 1]
+
+
+def test_matches_loop() -> None:
+    rng = np.random.default_rng(0)
+    for m, n in ((1, 1), (1, 7), (7, 1), (13, 13), (40, 25), (25, 40)):
+        x = rng.standard_normal((m, 13))
+        y = rng.standard_normal((n, 13))
+        assert math.isclose(
+            compute_optimal_path(x, y), _loop_optimal_path(x, y), rel_tol=1e-9
+        )
+
+
+def test_band() -> None:
+    rng = np.random.default_rng(1)
+    x = rng.standard_normal((60, 13))
+    y = x[::2] + 0.01 * rng.standard_normal((30, 13))
+
+    # A band only removes paths, so the distance can't get smaller
+    unbanded = compute_optimal_path(x, y)
+    banded = compute_optimal_path(x, y, band=4)
+    assert banded >= unbanded
+    assert math.isclose(unbanded, compute_optimal_path(x, y, band=60))
+    assert math.isinf(compute_optimal_path(x, x[:10], band=0))
@@ -0,0 +1,72 @@
+"""Tests for startup import time"""
+
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from wyoming_piper import omnivoice
+
+# Total import time of the server at startup (microseconds)
+IMPORT_BUDGET_US = 500_000
+
+# Backend and optional dependencies, imported only when they are used
+DEFERRED_MODULES = ("piper", "onnxruntime", "numpy", "torch", "transformers", "flask")
+
+
+def _import_times(*args: str, top_level: bool = True) -> Dict[str, int]:
+    """Cumulative import time of each (top-level) import in microseconds."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        _self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not cumulative_us.strip().isdigit():
+            # Header
+            continue
+
+        if (not top_level) or (not name[1:].startswith(" ")):
+            times[name.strip()] = int(cumulative_us)
+
+    return times
+
+
+def test_startup_imports() -> None:
+    times = _import_times("-m", "wyoming_piper", "--version")
+    assert sum(times.values()) < IMPORT_BUDGET_US, times
+
+    all_times = _import_times("-m", "wyoming_piper", "--version", top_level=False)
+    for module in DEFERRED_MODULES:
+        assert module not in all_times, f"{module} imported at startup"
+
+
+def test_lang_map_without_package(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    package_dir = tmp_path / "omnivoice"
+    (package_dir / "utils").mkdir(parents=True)
+    (package_dir / "__init__.py").write_text(
+        "raise ImportError('package import needs torch')\n", encoding="utf-8"
+    )
+    (package_dir / "utils" / "__init__.py").write_text("", encoding="utf-8")
+    (package_dir / "utils" / "lang_map.py").write_text(
+        "LANG_IDS = {'en': 0, 'de': 1}\nLANG_NAME_TO_ID = {'english': 'en'}\n",
+        encoding="utf-8",
+    )
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    omnivoice.load_lang_map.cache_clear()
+    try:
+        assert omnivoice.get_supported_languages() == ["de", "en"]
+        assert "omnivoice" not in sys.modules
+    finally:
+        omnivoice.load_lang_map.cache_clear()
@@ -0,0 +1,228 @@
+"""Tests for background model loading at startup"""
+
+import argparse
+import asyncio
+import threading
+import time
+from functools import partial
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from wyoming_piper import handler
+from wyoming_piper.usage import UsageStats
+
+from .benchmarks.common import make_cli_args
+
+
+async def test_wait_until_ready(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(handler, "_MODELS_READY", None)
+    release = threading.Event()
+
+    def load() -> None:
+        handler.report_load_stage("loading test model")
+        release.wait(timeout=10)
+
+    # Nothing loading
+    await handler.wait_until_ready(timeout=0)
+
+    handler.start_model_loading(load, progress_interval=0.01)
+    with pytest.raises(TimeoutError, match="loading test model"):
+        await handler.wait_until_ready(timeout=0.05)
+
+    status = handler.get_load_status()
+    assert not status["ready"]
+    assert status["stage"] == "loading test model"
+
+    release.set()
+    await handler.wait_until_ready(timeout=10)
+    assert handler.get_load_status() == {"ready": True, "stage": None, "seconds": None}
+
+
+async def test_failed_load(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(handler, "_MODELS_READY", None)
+
+    def load() -> None:
+        raise OSError("download failed")
+
+    # Requests go ahead and load on demand
+    handler.start_model_loading(load)
+    await handler.wait_until_ready(timeout=10)
+    assert handler.get_load_status()["ready"]
+
+
+def test_match_voice_names() -> None:
+    voice_names = ["en_US-lessac-medium", "en_US-ryan-low", "de_DE-thorsten-low"]
+    assert handler.match_voice_names(
+        ["de_DE-thorsten-low", "en_US-*", "en_US-ryan-low", "custom"], voice_names
+    ) == ["de_DE-thorsten-low", "en_US-lessac-medium", "en_US-ryan-low", "custom"]
+    assert handler.match_voice_names(["fr_FR-*"], voice_names) == []
+
+
+async def test_preload_predicted_voices(monkeypatch: pytest.MonkeyPatch) -> None:
+    usage_stats = UsageStats()
+    now = time.time()
+    for voice_name, num_bytes in (("big", 300), ("small", 100), ("other", 100)):
+        usage_stats.record(voice_name, now)
+        usage_stats.set_size(voice_name, num_bytes)
+
+    loaded_voices: Dict[str, handler.LoadedVoice] = {
+        "other": handler.LoadedVoice(None, Path(), num_bytes=100)
+    }
+    monkeypatch.setattr(handler, "_VOICES", loaded_voices)
+
+    def load_voice(voice_name, cli_args, voices_info, predicted=False):
+        loaded_voices[voice_name] = handler.LoadedVoice(
+            None, Path(), predicted=predicted
+        )
+
+    monkeypatch.setattr(handler, "load_voice", load_voice)
+
+    # "big" doesn't fit
+    cli_args = argparse.Namespace(memory_soft_limit=None)
+    assert await handler.preload_predicted_voices(
+        usage_stats, cli_args, {}, budget_bytes=250
+    ) == ["small"]
+    assert loaded_voices["small"].predicted
+    assert loaded_voices["other"].predicted
+    assert "big" not in loaded_voices
+
+
+class FakeOmniVoiceModel:
+    supports_streaming = True
+
+    def __init__(self, onnx_path: str, **kwargs) -> None:
+        self.onnx_path = onnx_path
+        self.num_sessions = kwargs["num_sessions"]
+
+
+def _fake_omnivoice(monkeypatch: pytest.MonkeyPatch) -> argparse.Namespace:
+    from wyoming_piper import omnivoice
+
+    monkeypatch.setattr(omnivoice, "OmniVoiceModel", FakeOmniVoiceModel)
+    monkeypatch.setattr(
+        omnivoice, "ensure_omnivoice_downloaded", lambda **kwargs: "model.onnx"
+    )
+    monkeypatch.setattr(handler, "_OMNIVOICE", None)
+    monkeypatch.setattr(handler, "_OMNIVOICE_SLOTS", None)
+    return make_cli_args(
+        backend="omnivoice",
+        local_files_only=True,
+        omnivoice_onnx_repo=None,
+        omnivoice_steps=16,
+        omnivoice_language=None,
+        omnivoice_sessions=2,
+        omnivoice_decode_window=0,
+        mmap_models=False,
+    )
+
+
+def test_load_omnivoice_in_thread(monkeypatch: pytest.MonkeyPatch) -> None:
+    cli_args = _fake_omnivoice(monkeypatch)
+
+    monkeypatch.setattr(handler, "_MODELS_READY", None)
+
+    async def load_models() -> asyncio.Semaphore:
+        await handler.start_model_loading(partial(handler.load_omnivoice, cli_args))
+        return handler._omnivoice_slots(cli_args)  # pylint: disable=protected-access
+
+    # A new event loop, like the server's
+    slots = asyncio.run(load_models())
+    assert isinstance(
+        handler._OMNIVOICE, FakeOmniVoiceModel  # pylint: disable=protected-access
+    )
+    assert handler._OMNIVOICE_SLOTS is slots  # pylint: disable=protected-access
+
+    # One slot per session
+    assert slots._value == 2  # pylint: disable=protected-access
+
+
+def test_reload_omnivoice_keeps_slots(monkeypatch: pytest.MonkeyPatch) -> None:
+    cli_args = _fake_omnivoice(monkeypatch)
+    monkeypatch.setattr(handler, "_OMNIVOICE_LOAD_LOCK", None)
+    monkeypatch.setattr(handler, "_IDLE_UNLOADED", True)
+
+    loaded: List[FakeOmniVoiceModel] = []
+    load_omnivoice = handler.load_omnivoice
+
+    def load(args: argparse.Namespace) -> None:
+        time.sleep(0.05)
+        load_omnivoice(args)
+        loaded.append(handler._OMNIVOICE)  # pylint: disable=protected-access
+
+    monkeypatch.setattr(handler, "load_omnivoice", load)
+
+    async def reload_while_busy() -> asyncio.Semaphore:
+        # pylint: disable=protected-access
+        slots = handler._omnivoice_slots(cli_args)
+        await slots.acquire()
+
+        # Two requests after an idle unload: only one loads the model
+        await asyncio.gather(
+            handler.ensure_omnivoice_loaded(cli_args),
+            handler.ensure_omnivoice_loaded(cli_args),
+        )
+        assert handler._omnivoice_slots(cli_args) is slots
+
+        # The request from before the reload releases its slot
+        slots.release()
+        async with slots, slots:
+            pass
+
+        return slots
+
+    slots = asyncio.run(reload_while_busy())
+    assert len(loaded) == 1
+    assert not handler._IDLE_UNLOADED  # pylint: disable=protected-access
+    assert slots._value == 2  # pylint: disable=protected-access
+
+
+def test_voice_predictor(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(handler, "_MODELS_READY", None)
+    usage_stats = UsageStats()
+
+    async def run_predictor() -> int:
+        predictions: "asyncio.Queue[None]" = asyncio.Queue()
+
+        async def preload_predicted_voices(*args, **kwargs) -> List[str]:
+            await predictions.put(None)
+            return []
+
+        monkeypatch.setattr(
+            handler, "preload_predicted_voices", preload_predicted_voices
+        )
+
+        # Not running: ignored
+        handler._wake_voice_predictor()  # pylint: disable=protected-access
+
+        task = asyncio.create_task(
+            handler.voice_predictor(usage_stats, make_cli_args(), {}, 0, interval=60)
+        )
+        try:
+            # At startup, then after a request
+            await asyncio.wait_for(predictions.get(), 10)
+            handler._wake_voice_predictor()  # pylint: disable=protected-access
+            await asyncio.wait_for(predictions.get(), 10)
+        finally:
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        return predictions.qsize()
+
+    # A new event loop, like the server's
+    assert asyncio.run(run_predictor()) == 0
+    assert handler._PREDICTOR_WAKE is None  # pylint: disable=protected-access
+
+
+def test_load_omnivoice_without_streaming(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    cli_args = _fake_omnivoice(monkeypatch)
+    cli_args.omnivoice_decode_window = 50
+    monkeypatch.setattr(FakeOmniVoiceModel, "supports_streaming", False)
+
+    # Whole sentences are decoded instead
+    handler.load_omnivoice(cli_args)
+    assert "ignoring --omnivoice-decode-window" in caplog.text
@@ -0,0 +1,149 @@
+"""Tests for memory accounting"""
+
+import asyncio
+import mmap
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from wyoming_piper import handler
+from wyoming_piper.memory import mapped_file_usage, process_rss
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="needs /proc")
+def test_mapped_file_usage(tmp_path: Path) -> None:
+    weights_path = tmp_path / "voice.onnx.data"
+    weights_path.write_bytes(bytes(range(256)) * 4096)
+
+    with (
+        open(weights_path, "rb") as weights_file,
+        mmap.mmap(weights_file.fileno(), 0, access=mmap.ACCESS_READ) as weights,
+    ):
+        # Touch every page
+        assert sum(weights[::4096]) == 0
+
+        usage = mapped_file_usage()
+        assert str(weights_path) in usage
+
+        file_usage = usage[str(weights_path)]
+        assert file_usage.rss == 256 * 4096
+        assert file_usage.shared + file_usage.private == file_usage.rss
+
+        assert mapped_file_usage(paths=[tmp_path / "other.onnx"]) == {}
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="needs /proc")
+def test_process_rss() -> None:
+    rss = process_rss()
+    assert rss > 0
+
+    # Touching a buffer grows resident memory
+    buffer = bytearray(64 * 1024 * 1024)
+    buffer[::4096] = b"\x01" * len(buffer[::4096])
+    assert process_rss() > rss
+
+
+class FakeOmniVoice:
+    def __init__(self) -> None:
+        self.prompts = 2
+
+    def memory_usage(self) -> Dict[str, int]:
+        return {"torch": 100, "onnx": 200, "prompt_cache": self.prompts * 10}
+
+    def clear_prompt_cache(self) -> int:
+        num_prompts, self.prompts = self.prompts, 0
+        return num_prompts
+
+
+async def test_enforce_memory_limit(monkeypatch: pytest.MonkeyPatch) -> None:
+    omnivoice = FakeOmniVoice()
+    monkeypatch.setattr(handler, "_OMNIVOICE", omnivoice)
+    monkeypatch.setattr(
+        handler,
+        "_VOICES",
+        {"en_US-test-low": handler.LoadedVoice(None, Path(), num_bytes=300)},
+    )
+    monkeypatch.setattr(handler, "release_memory", lambda: None)
+
+    assert handler.get_memory_usage() == {
+        "piper:en_US-test-low": 300,
+        "omnivoice:torch": 100,
+        "omnivoice:onnx": 200,
+        "omnivoice:prompt_cache": 20,
+    }
+
+    # Under the limit: nothing is freed
+    monkeypatch.setattr(handler, "process_rss", lambda: 1000)
+    assert await handler.enforce_memory_limit(2000) == []
+    assert omnivoice.prompts == 2
+
+    # Over the limit: prompt cache first, then the piper voice
+    monkeypatch.setattr(handler, "process_rss", lambda: 1000)
+    assert await handler.enforce_memory_limit(500) == [
+        "omnivoice prompt cache",
+        "piper voice en_US-test-low",
+    ]
+    assert omnivoice.prompts == 0
+    assert not handler._VOICES
+    assert handler.get_memory_usage() == {
+        "omnivoice:torch": 100,
+        "omnivoice:onnx": 200,
+        "omnivoice:prompt_cache": 0,
+    }
+
+
+async def test_enforce_memory_limit_order(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(handler, "_OMNIVOICE", None)
+    loaded_voices = {
+        "pinned": handler.LoadedVoice(None, Path(), num_bytes=100, pinned=True),
+        "predicted": handler.LoadedVoice(None, Path(), num_bytes=100, predicted=True),
+        "recent": handler.LoadedVoice(None, Path(), num_bytes=100),
+    }
+    monkeypatch.setattr(handler, "_VOICES", loaded_voices)
+    monkeypatch.setattr(handler, "release_memory", lambda: None)
+    monkeypatch.setattr(
+        handler,
+        "process_rss",
+        lambda: 100 + sum(loaded.num_bytes for loaded in loaded_voices.values()),
+    )
+
+    # Freed by the most recently used voice
+    assert await handler.enforce_memory_limit(300) == ["piper voice recent"]
+    assert sorted(loaded_voices) == ["pinned", "predicted"]
+
+    # Still over the limit without the predicted voice
+    assert await handler.enforce_memory_limit(100) == [
+        "piper voice predicted",
+        "piper voice pinned",
+    ]
+    assert not loaded_voices
+
+
+async def test_idle_unload(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(handler, "_OMNIVOICE", FakeOmniVoice())
+    monkeypatch.setattr(
+        handler,
+        "_VOICES",
+        {"en_US-test-low": handler.LoadedVoice(None, Path(), pinned=True)},
+    )
+    monkeypatch.setattr(handler, "_IDLE_UNLOADED", False)
+    monkeypatch.setattr(handler, "release_memory", lambda: None)
+
+    # Not while a request is running
+    monkeypatch.setattr(handler, "_ACTIVE_REQUESTS", 1)
+    assert handler.unload_idle_models() == []
+    assert handler._VOICES
+
+    handler._request_finished()
+    monkeypatch.setattr(handler, "_LAST_ACTIVITY", time.monotonic() - 60)
+    unloader = asyncio.create_task(handler.idle_unloader(30))
+    await asyncio.sleep(0)
+    unloader.cancel()
+
+    assert not handler._VOICES
+    assert handler._OMNIVOICE is None
+    assert handler._IDLE_UNLOADED
+    assert handler.get_memory_usage() == {}
@@ -0,0 +1,120 @@
+"""Tests for the Prometheus metrics"""
+
+import asyncio
+
+from wyoming.info import Attribution, Info, TtsProgram, TtsVoice
+
+from wyoming_piper.catalog import VoiceCatalog, VoiceRecord
+from wyoming_piper.metrics import OTHER_VOICE, Counter, Gauge, Histogram, Registry
+from wyoming_piper.metrics import render as render_all
+from wyoming_piper.metrics import start_metrics_server
+
+from .benchmarks.common import make_handler
+
+
+def test_counter_and_gauge() -> None:
+    registry = Registry()
+    requests = Counter("requests_total", "Requests", ("voice",), registry=registry)
+    connections = Gauge("connections", "Connections", registry=registry)
+
+    requests.inc(voice="a")
+    requests.inc(2, voice='say "hi"')
+    connections.inc()
+    connections.inc()
+    connections.dec()
+
+    assert requests.value(voice="a") == 1
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests",
+        "# TYPE requests_total counter",
+        'requests_total{voice="a"} 1',
+        'requests_total{voice="say \\"hi\\""} 2',
+        "# HELP connections Connections",
+        "# TYPE connections gauge",
+        "connections 1",
+    ]
+
+
+def test_histogram() -> None:
+    registry = Registry()
+    latency = Histogram(
+        "latency_seconds", "Latency", ("backend",), buckets=(0.1, 1), registry=registry
+    )
+    for value in (0.05, 0.1, 0.5, 3):
+        latency.observe(value, backend="piper")
+
+    assert latency.count(backend="piper") == 4
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{backend="piper",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{backend="piper",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{backend="piper",le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum{backend="piper"} 3.65' in lines
+    assert 'latency_seconds_count{backend="piper"} 4' in lines
+
+
+async def test_metrics_server() -> None:
+    server = await start_metrics_server("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await writer.drain()
+        response = (await reader.read()).decode()
+        writer.close()
+    finally:
+        server.close()
+
+    headers, body = response.split("\r\n\r\n", 1)
+    assert headers.startswith("HTTP/1.1 200 OK")
+    assert body == render_all()
+    assert "# TYPE wyoming_piper_requests_total counter" in body
+
+
+def test_voice_label() -> None:
+    voices_info = VoiceCatalog(
+        [
+            VoiceRecord(
+                "en_US-lessac-medium",
+                "lessac",
+                "medium",
+                "en_US",
+                aliases=("en-us-lessac-medium",),
+            )
+        ]
+    )
+    handler = make_handler(voices_info, voice="en_US-default-low")
+    attribution = Attribution(name="", url="")
+    handler.wyoming_info = Info(
+        tts=[
+            TtsProgram(
+                name="piper",
+                description="piper",
+                attribution=attribution,
+                installed=True,
+                version=None,
+                voices=[
+                    TtsVoice(
+                        name="custom",
+                        description="custom",
+                        attribution=attribution,
+                        installed=True,
+                        version=None,
+                        languages=["en_US"],
+                    )
+                ],
+            )
+        ]
+    )
+
+    # pylint: disable=protected-access
+    for voice_name in (
+        "en_US-lessac-medium",
+        "en-us-lessac-medium",
+        "en_US-default-low",
+        "custom",
+        "default",
+    ):
+        assert handler._metric_voice_label(voice_name) == voice_name
+
+    # Made up by a client
+    assert handler._metric_voice_label("x" * 100) == OTHER_VOICE
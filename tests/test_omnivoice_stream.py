@@ -0,0 +1,155 @@
+"""Tests for streaming OmniVoice audio per codec decode window"""
+
+import contextlib
+import types
+from typing import Any, List, Tuple
+
+import numpy as np
+
+from wyoming_piper.omnivoice import OmniVoiceModel, missing_streaming_internals
+
+# Fake codec: 25 frames per second, 4 samples per frame
+_SAMPLE_RATE = 100
+_HOP = 4
+
+
+class _Tokens:
+    """Just enough of a torch tensor of (codebooks, frames) codes."""
+
+    def __init__(self, codes: np.ndarray) -> None:
+        self.codes = codes
+        self.shape = codes.shape
+
+    def __getitem__(self, key: Any) -> "_Tokens":
+        return _Tokens(self.codes[key])
+
+    def to(self, _device: Any) -> "_Tokens":
+        return self
+
+    def unsqueeze(self, _dim: int) -> "_Tokens":
+        return self
+
+
+class _Codec:
+    """Decodes each frame to its code value, with edge artifacts.
+
+    The first and last frame of every decode are off (like a real codec
+    without context), and each decode is offset by ``drift`` times the number
+    of earlier decodes (a codec whose output depends on the context).
+    """
+
+    def __init__(self, drift: float = 0.0) -> None:
+        self.config = types.SimpleNamespace(frame_rate=_SAMPLE_RATE // _HOP)
+        self.device = "cpu"
+        self.drift = drift
+        self.decoded: List[Tuple[int, ...]] = []
+
+    def decode(self, tokens: _Tokens) -> Any:
+        frames = tokens.codes[0]
+        audio = np.repeat(frames.astype(np.float32), _HOP)
+        audio[:_HOP] *= 0.5
+        audio[-_HOP:] *= 0.5
+        audio += self.drift * len(self.decoded)
+        self.decoded.append(tuple(frames))
+
+        audio_values = types.SimpleNamespace(
+            cpu=lambda: types.SimpleNamespace(numpy=lambda: audio)
+        )
+        return types.SimpleNamespace(audio_values=[audio_values])
+
+
+def _model(codec: _Codec) -> OmniVoiceModel:
+    model = OmniVoiceModel.__new__(OmniVoiceModel)
+    model._np = np  # pylint: disable=protected-access
+    model._torch = types.SimpleNamespace(  # pylint: disable=protected-access
+        no_grad=contextlib.nullcontext
+    )
+    model._model = types.SimpleNamespace(  # pylint: disable=protected-access
+        audio_tokenizer=codec
+    )
+    model.sampling_rate = _SAMPLE_RATE
+    return model
+
+
+def _tokens(levels: List[float], frames_per_level: int = 30) -> _Tokens:
+    return _Tokens(np.repeat(np.array(levels), frames_per_level)[np.newaxis, :])
+
+
+def _decode(
+    codec: _Codec, tokens: _Tokens, window_frames: int, overlap_frames: int = 8
+) -> np.ndarray:
+    pieces = _model(codec)._decode_windows(  # pylint: disable=protected-access
+        tokens, window_frames, overlap_frames
+    )
+    return np.concatenate(list(pieces))
+
+
+def test_decode_windows_overlap() -> None:
+    tokens = _tokens([0.1, 0.2, 0.3, 0.4])
+    full = _decode(_Codec(), tokens, window_frames=1000)
+
+    codec = _Codec()
+    windowed = _decode(codec, tokens, window_frames=50)
+
+    # Context frames hide the edge artifacts of each window
+    assert np.allclose(windowed, full)
+    assert [len(frames) for frames in codec.decoded] == [58, 66, 28]
+
+    # Without context, every window edge is off
+    no_context = _decode(_Codec(), tokens, window_frames=50, overlap_frames=0)
+    assert len(no_context) == len(full)
+    assert not np.allclose(no_context, full)
+
+
+def test_decode_windows_cross_fade() -> None:
+    tokens = _tokens([0.5], frames_per_level=120)
+    drift = 0.01
+    windowed = _decode(_Codec(drift=drift), tokens, window_frames=50)
+    assert len(windowed) == 120 * _HOP
+
+    # Steps between windows are spread over the cross-fade (4 frames)
+    steps = np.abs(np.diff(windowed[_HOP:-_HOP]))
+    assert steps.max() < drift / 10
+
+    without_fade = _decode(
+        _Codec(drift=drift), tokens, window_frames=50, overlap_frames=1
+    )
+    assert np.abs(np.diff(without_fade[_HOP:-_HOP])).max() > drift / 2
+
+
+def _stream(tokens: _Tokens, ref_rms: Any, window_frames: int) -> np.ndarray:
+    gen_config = types.SimpleNamespace(fade_duration=0.1, pad_duration=0.05)
+    pieces = _model(_Codec())._stream_audio(  # pylint: disable=protected-access
+        [tokens], ref_rms, gen_config, window_frames, 8
+    )
+    return np.concatenate(list(pieces))
+
+
+def test_stream_audio_level() -> None:
+    # Quiet first window, louder later
+    tokens = _tokens([0.05, 0.05, 0.9, 0.9])
+    for ref_rms, gain in ((None, 1.0), (0.05, 0.5), (0.2, 1.0)):
+        streamed = _stream(tokens, ref_rms, window_frames=25)
+        whole = _stream(tokens, ref_rms, window_frames=1000)
+
+        # Same as decoding the whole utterance at once
+        assert np.allclose(streamed, whole)
+        assert np.isclose(np.abs(streamed).max(), 0.9 * gain)
+
+
+def test_missing_streaming_internals() -> None:
+    class GenerationTask:
+        def get_indices(self, config: Any, frame_rate: int) -> Any:
+            pass
+
+    model = types.SimpleNamespace(
+        _preprocess_all=print, _generate_iterative=print, _generate_chunked=print
+    )
+    assert not missing_streaming_internals(model, GenerationTask)
+
+    # Renamed or removed upstream
+    del model._generate_chunked  # pylint: disable=protected-access
+    assert missing_streaming_internals(model, None) == [
+        "_generate_chunked",
+        "GenerationTask.get_indices",
+    ]
@@ -0,0 +1,101 @@
+"""Tests for request profiling"""
+
+import pstats
+import threading
+from pathlib import Path
+
+import pytest
+from wyoming.tts import SynthesizeStart
+
+from wyoming_piper import profiling
+from wyoming_piper.profiling import Profiler, current_profile
+
+from .benchmarks.common import make_handler
+
+
+class FakeSession:
+    """Stands in for an onnxruntime session created with enable_profiling."""
+
+    def __init__(self, prefix: str) -> None:
+        self.path = Path(f"{prefix}_2025.json")
+        self.path.write_text("[]", encoding="utf-8")
+
+    def end_profiling(self) -> str:
+        return str(self.path)
+
+
+def work_in_thread() -> None:
+    sum(range(1000))
+
+
+def test_profile_window(tmp_path: Path) -> None:
+    profiler = Profiler(tmp_path, sample_rate=0.0, window_requests=2)
+    assert profiler.start() is None
+
+    # SIGUSR1
+    profiler.request_window()
+    profile = profiler.start("req1")
+    assert profile is not None
+    assert current_profile() is profile
+
+    # One profiled request at a time
+    assert profiler.start("req2") is None
+
+    session = profile.session("piper", FakeSession)
+    assert profile.session("piper", FakeSession) is session
+
+    def worker() -> None:
+        with profile.profile_thread():
+            work_in_thread()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+
+    profiler.finish(profile)
+    assert current_profile() is None
+
+    assert (tmp_path / "req1.piper.ort.json").is_file()
+    assert not session.path.exists()
+    stats = pstats.Stats(str(tmp_path / "req1.prof"))
+    assert any(
+        function_name == "work_in_thread"
+        for _file, _line, function_name in stats.stats  # type: ignore[attr-defined]
+    )
+
+    # Second request of the window, then back to sampling
+    second_profile = profiler.start("req3")
+    assert second_profile is not None
+    profiler.finish(second_profile)
+    assert profiler.start("req4") is None
+
+
+async def test_profile_after_disconnect(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    profiler = Profiler(tmp_path, window_requests=3)
+    profiler.request_window()
+    monkeypatch.setattr(profiling, "_PROFILER", profiler)
+
+    # Client goes away in the middle of a text stream
+    handler = make_handler()
+    await handler.handle_event(SynthesizeStart().event())
+    first_profile = current_profile()
+    assert first_profile is not None
+    await handler.disconnect()
+    assert current_profile() is None
+    assert (tmp_path / f"{first_profile.request_id}.prof").is_file()
+
+    # A second stream on the same connection replaces the first one
+    handler = make_handler()
+    await handler.handle_event(SynthesizeStart().event())
+    second_profile = current_profile()
+    await handler.handle_event(SynthesizeStart().event())
+    assert second_profile is not None
+    assert (tmp_path / f"{second_profile.request_id}.prof").is_file()
+
+    # Profiling still works for the next request
+    third_profile = current_profile()
+    assert third_profile not in (None, second_profile)
+    await handler.disconnect()
+    assert current_profile() is None
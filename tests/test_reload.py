@@ -0,0 +1,196 @@
+"""Tests for reloading voices while the server runs"""
+
+import asyncio
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+from wyoming.info import Attribution, Info, TtsProgram, TtsVoice
+
+from wyoming_piper import handler, voice_files
+from wyoming_piper.catalog import VoiceCatalog
+from wyoming_piper.describe import info_event_bytes, set_info_voices
+from wyoming_piper.voice_files import VoiceFileIndex
+
+from .benchmarks.common import make_cli_args
+
+_ATTRIBUTION = Attribution(name="", url="")
+
+
+def _voice(name: str) -> TtsVoice:
+    return TtsVoice(
+        name=name,
+        description=name,
+        attribution=_ATTRIBUTION,
+        installed=True,
+        version=None,
+        languages=["en_US"],
+    )
+
+
+def _write_voice(data_dir: Path, name: str, model: bytes = b"\0") -> None:
+    (data_dir / f"{name}.onnx").write_bytes(model)
+    (data_dir / f"{name}.onnx.json").write_text("{}")
+
+
+def _loaded(data_dir: Path, name: str, pinned: bool = False) -> handler.LoadedVoice:
+    model_path = data_dir / f"{name}.onnx"
+    return handler.LoadedVoice(
+        None,
+        model_path,
+        pinned=pinned,
+        files_stamp=handler._files_stamp(  # pylint: disable=protected-access
+            model_path, data_dir / f"{name}.onnx.json"
+        ),
+    )
+
+
+def test_set_info_voices() -> None:
+    info = Info(
+        tts=[
+            TtsProgram(
+                name="piper",
+                description="piper",
+                attribution=_ATTRIBUTION,
+                installed=True,
+                version=None,
+                voices=[_voice("a")],
+            )
+        ]
+    )
+    info_bytes = info_event_bytes(info)
+
+    assert not set_info_voices(info, [_voice("a")])
+    assert info_event_bytes(info) is info_bytes
+
+    assert set_info_voices(info, [_voice("a"), _voice("b")])
+    assert b'"b"' in info_event_bytes(info)
+
+
+async def test_reload_changed_voices(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(voice_files, "_INDEX", VoiceFileIndex())
+    for name in ("changed", "pinned", "removed", "same"):
+        _write_voice(tmp_path, name)
+
+    loaded_voices: Dict[str, handler.LoadedVoice] = {
+        "changed": _loaded(tmp_path, "changed"),
+        "pinned": _loaded(tmp_path, "pinned", pinned=True),
+        "removed": _loaded(tmp_path, "removed"),
+        "same": _loaded(tmp_path, "same"),
+    }
+    monkeypatch.setattr(handler, "_VOICES", loaded_voices)
+
+    loaded_names: List[str] = []
+
+    def load_voice(voice_name, cli_args, voices_info, pinned=False):
+        loaded_names.append(voice_name)
+        loaded_voices[voice_name] = _loaded(tmp_path, voice_name, pinned=pinned)
+
+    monkeypatch.setattr(handler, "load_voice", load_voice)
+
+    cli_args = make_cli_args(data_dir=[str(tmp_path)])
+    assert not await handler.reload_changed_voices(cli_args, VoiceCatalog())
+
+    _write_voice(tmp_path, "changed", b"\0\0")
+    _write_voice(tmp_path, "pinned", b"\0\0")
+    os.unlink(tmp_path / "removed.onnx")
+
+    assert await handler.reload_changed_voices(cli_args, VoiceCatalog()) == [
+        "changed",
+        "pinned",
+        "removed",
+    ]
+
+    # Only the preloaded voice is loaded again
+    assert loaded_names == ["pinned"]
+    assert sorted(loaded_voices) == ["pinned", "same"]
+    assert loaded_voices["pinned"].pinned
+
+
+def test_voice_reloader(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(handler, "_MODELS_READY", None)
+
+    # A new event loop, like the server's
+    asyncio.run(_run_voice_reloader())
+
+    # pylint: disable=protected-access
+    assert handler._RELOAD_LOOP is None
+    assert handler._RELOAD_WAKE is None
+
+
+async def _run_voice_reloader() -> None:
+    reloads: "asyncio.Queue[bool]" = asyncio.Queue()
+    num_reloads = 0
+
+    async def reload(requested: bool) -> None:
+        nonlocal num_reloads
+        num_reloads += 1
+        await reloads.put(requested)
+        if num_reloads == 1:
+            raise OSError("logged and ignored")
+
+    # Not running: ignored
+    handler.request_voice_reload()
+
+    task = asyncio.create_task(handler.voice_reloader(reload, interval=0.05))
+    try:
+        assert await asyncio.wait_for(reloads.get(), 10) is False
+
+        # From the web server's thread
+        await asyncio.sleep(0)
+        thread = threading.Thread(target=handler.request_voice_reload)
+        thread.start()
+        thread.join()
+
+        requested = [await asyncio.wait_for(reloads.get(), 10) for _ in range(2)]
+        assert True in requested
+    finally:
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+
+def test_reload_omnivoice_voices(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(handler, "_OMNIVOICE_VOICES", {})
+
+    forgotten: List[str] = []
+
+    class FakeModel:
+        def forget_prompt(self, ref_audio: str) -> None:
+            forgotten.append(Path(ref_audio).parent.name)
+
+    monkeypatch.setattr(handler, "_OMNIVOICE", FakeModel())
+
+    def add_voice(name: str, audio: bytes = b"RIFF") -> None:
+        voice_dir = tmp_path / "English" / name
+        voice_dir.mkdir(parents=True, exist_ok=True)
+        (voice_dir / "ref.wav").write_bytes(audio)
+        (voice_dir / "ref.txt").write_text("Hello.")
+        os.utime(voice_dir / "ref.wav", ns=(len(audio), len(audio)))
+
+    add_voice("alice")
+    add_voice("bob")
+    cli_args = make_cli_args(omnivoice_ref_dir=str(tmp_path))
+    handler.load_omnivoice_voices(cli_args)
+    assert sorted(handler.get_omnivoice_voices()) == ["alice", "bob"]
+    assert not handler.reload_omnivoice_voices(cli_args)
+
+    # New recording, new voice
+    add_voice("alice", b"RIFF2")
+    add_voice("carol")
+    assert handler.reload_omnivoice_voices(cli_args) == ["alice", "carol"]
+    assert forgotten == ["alice"]
+    assert sorted(handler.get_omnivoice_voices()) == ["alice", "bob", "carol"]
+
+    # Removed voice
+    for path in (tmp_path / "English" / "bob").iterdir():
+        path.unlink()
+
+    assert handler.reload_omnivoice_voices(cli_args) == ["bob"]
+    assert forgotten == ["alice", "bob"]
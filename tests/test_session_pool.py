@@ -0,0 +1,109 @@
+"""Tests for the pool of OmniVoice ONNX sessions"""
+
+import threading
+from pathlib import Path
+from typing import Any, List
+
+import numpy as np
+import pytest
+
+from wyoming_piper.omnivoice import OnnxSessionPool
+
+onnx = pytest.importorskip("onnx")
+
+
+def make_onnx_model(path: Path, size: int = 4) -> str:
+    """Graph with one MatMul, like the LM graph's ``logits`` output."""
+    from onnx import TensorProto, helper, numpy_helper
+
+    graph = helper.make_graph(
+        [helper.make_node("MatMul", ["x", "w"], ["logits"])],
+        "matmul",
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, [None, size])],
+        [helper.make_tensor_value_info("logits", TensorProto.FLOAT, [None, size])],
+        [numpy_helper.from_array(np.eye(size, dtype=np.float32), "w")],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    onnx.save(model, str(path))
+    return str(path)
+
+
+def test_concurrent_checkouts(tmp_path: Path) -> None:
+    pool = OnnxSessionPool(make_onnx_model(tmp_path / "model.onnx"), size=3)
+    barrier = threading.Barrier(3, timeout=10)
+    checked_out: List[Any] = []
+
+    def request() -> None:
+        with pool.checkout() as session:
+            checked_out.append(session)
+            x = np.ones((1, 4), dtype=np.float32)
+            assert np.array_equal(session.run(["logits"], {"x": x})[0], x)
+
+            # All three requests hold a session at once
+            barrier.wait()
+
+    threads = [threading.Thread(target=request) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert not barrier.broken
+    assert len({id(session) for session in checked_out}) == 3
+
+    # All returned to the pool
+    with pool.checkout() as first, pool.checkout() as nested:
+        assert nested is first
+
+
+def test_same_thread_reuses_session(tmp_path: Path) -> None:
+    pool = OnnxSessionPool(make_onnx_model(tmp_path / "model.onnx"), size=2)
+
+    # Nested checkouts (one per LM step) don't take a second session
+    with pool.checkout() as session:
+        with pool.checkout() as step_session:
+            assert step_session is session
+
+        other: List[Any] = []
+
+        def other_request() -> None:
+            with pool.checkout() as other_session:
+                other.append(other_session)
+
+        thread = threading.Thread(target=other_request)
+        thread.start()
+        thread.join()
+        assert other[0] is not session
+
+    # use_session overrides the pool for this thread only
+    profiling_session = pool.create_profiling_session(str(tmp_path / "profile"))
+    with pool.use_session(profiling_session):
+        with pool.checkout() as session:
+            assert session is profiling_session
+
+
+def test_session_options(tmp_path: Path) -> None:
+    onnx_path = make_onnx_model(tmp_path / "model.onnx")
+
+    # pylint: disable=protected-access
+    single = OnnxSessionPool(onnx_path)._session_options(0)
+    with pytest.raises(RuntimeError):
+        # Not set: prepacked weights
+        single.get_session_config_entry("session.disable_prepacking")
+
+    pool = OnnxSessionPool(onnx_path, size=2)
+    for worker_index in range(2):
+        sess_options = pool._session_options(worker_index)
+        assert sess_options.get_session_config_entry("session.disable_prepacking") == (
+            "1"
+        )
+        assert sess_options.get_session_config_entry("session.use_env_allocators") == (
+            "1"
+        )
+        assert sess_options.intra_op_num_threads >= 1
+
+    # Weights stay file-backed with memory-mapped models
+    mapped = OnnxSessionPool(onnx_path, use_mmap=True)._session_options(0)
+    assert mapped.get_session_config_entry("session.disable_prepacking") == "1"
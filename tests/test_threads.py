@@ -0,0 +1,40 @@
+"""Tests for the CPU thread budget"""
+
+import onnxruntime
+
+from wyoming_piper.threads import ThreadBudget
+
+
+def test_split_between_workers() -> None:
+    budget = ThreadBudget(8, num_workers=2, cpus=range(16))
+    assert budget.num_cpus == 8
+    assert budget.threads_per_worker == 4
+    assert budget.torch_num_threads == 4
+
+    worker = budget.worker(1)
+    assert worker.intra_op_num_threads == 4
+    assert worker.inter_op_num_threads == 1
+    assert worker.cpus is None
+
+
+def test_budget_limited_to_available_cpus() -> None:
+    budget = ThreadBudget(32, num_workers=3, cpus=[0, 1, 2, 3])
+    assert budget.num_cpus == 4
+    assert budget.threads_per_worker == 1
+
+
+def test_pinned_workers_get_disjoint_cpus() -> None:
+    budget = ThreadBudget(4, num_workers=2, pin_cpus=True, cpus=[2, 3, 6, 7])
+    assert budget.worker(0).cpus == (2, 3)
+    assert budget.worker(1).cpus == (6, 7)
+
+    sess_options = onnxruntime.SessionOptions()
+    budget.configure_session(sess_options, worker_index=1)
+    assert sess_options.intra_op_num_threads == 2
+    assert sess_options.inter_op_num_threads == 1
+
+    # Caller's thread is not listed; CPU ids are 1-based
+    assert (
+        sess_options.get_session_config_entry("session.intra_op_thread_affinities")
+        == "8"
+    )
@@ -0,0 +1,96 @@
+"""Tests for request tracing"""
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+from wyoming.tts import SynthesizeStart
+
+from wyoming_piper import trace as trace_module
+from wyoming_piper.trace import Tracer, current_trace, run_in_executor, span
+
+from .benchmarks.common import make_handler
+
+
+def test_span_without_trace() -> None:
+    assert current_trace() is None
+    with span("nothing"):
+        pass
+
+
+async def test_trace_spans(tmp_path: Path) -> None:
+    trace_path = tmp_path / "trace.jsonl"
+    tracer = Tracer(trace_path)
+    trace = tracer.start("synthesize", "piper", "test")
+    trace.add_sentence("Hello.")
+
+    with span("lock_wait"):
+        pass
+
+    def infer() -> None:
+        with span("inference"):
+            time.sleep(0.01)
+
+    # Spans recorded in a worker thread belong to the request
+    await run_in_executor(infer)
+    await run_in_executor(infer)
+    tracer.finish(trace)
+    tracer.close()
+    assert current_trace() is None
+
+    records = [json.loads(line) for line in trace_path.read_text().splitlines()]
+    assert len(records) == 1
+    record = records[0]
+    assert record["request_id"] == trace.request_id
+    assert record["text_chars"] == 6
+    assert [s["name"] for s in record["spans"]] == [
+        "lock_wait",
+        "inference",
+        "inference",
+    ]
+    assert list(record["breakdown"]) == ["lock_wait", "inference"]
+    assert record["breakdown"]["inference"] >= 0.02
+    assert record["duration"] >= record["breakdown"]["inference"]
+
+
+def test_only_slow_requests_written(tmp_path: Path) -> None:
+    trace_path = tmp_path / "trace.jsonl"
+    tracer = Tracer(trace_path, slow_seconds=0.05)
+
+    fast_trace = tracer.start("synthesize", "piper", "test")
+    tracer.finish(fast_trace)
+
+    slow_trace = tracer.start("stream", "piper", "test")
+    time.sleep(0.06)
+    tracer.finish(slow_trace, error="boom")
+    tracer.close()
+
+    records = [json.loads(line) for line in trace_path.read_text().splitlines()]
+    assert [r["request_id"] for r in records] == [slow_trace.request_id]
+    assert records[0]["error"] == "boom"
+
+
+async def test_unfinished_streams_written(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    trace_path = tmp_path / "trace.jsonl"
+    tracer = Tracer(trace_path)
+    monkeypatch.setattr(trace_module, "_TRACER", tracer)
+
+    # A second stream replaces the first one, then the client goes away
+    handler = make_handler()
+    await handler.handle_event(SynthesizeStart().event())
+    first_trace = current_trace()
+    await handler.handle_event(SynthesizeStart().event())
+    second_trace = current_trace()
+    await handler.disconnect()
+    tracer.close()
+    assert current_trace() is None
+
+    assert (first_trace is not None) and (second_trace is not None)
+    records = [json.loads(line) for line in trace_path.read_text().splitlines()]
+    assert [(r["request_id"], r["error"]) for r in records] == [
+        (first_trace.request_id, "superseded"),
+        (second_trace.request_id, "disconnected"),
+    ]
@@ -0,0 +1,52 @@
+"""Tests for traffic recording and replay scheduling"""
+
+from pathlib import Path
+
+from wyoming.tts import Synthesize, SynthesizeChunk, SynthesizeStart
+
+from wyoming_piper.traffic import (
+    RecordedConnection,
+    TrafficRecorder,
+    load_recording,
+    schedule_connections,
+)
+
+
+def test_record_and_load(tmp_path: Path) -> None:
+    recording_path = tmp_path / "traffic.jsonl"
+    recorder = TrafficRecorder(recording_path)
+    first_id = recorder.connect()
+    second_id = recorder.connect()
+    recorder.record(first_id, Synthesize(text="Hello world.").event())
+    recorder.record(second_id, SynthesizeStart().event())
+    recorder.record(second_id, SynthesizeChunk(text="Hi ").event())
+    recorder.disconnect(first_id)
+    recorder.close()
+
+    # Cut off by a crash
+    with open(recording_path, "a", encoding="utf-8") as recording_file:
+        recording_file.write('{"conn": "')
+
+    connections = load_recording(recording_path)
+    assert [c.conn_id for c in connections] == [first_id, second_id]
+
+    first_events = [event for _offset, event in connections[0].events]
+    assert [e.type for e in first_events] == ["synthesize"]
+    assert Synthesize.from_event(first_events[0]).text == "Hello world."
+
+    second_events = [event for _offset, event in connections[1].events]
+    assert [e.type for e in second_events] == ["synthesize-start", "synthesize-chunk"]
+    offsets = [offset for offset, _event in connections[1].events]
+    assert offsets == sorted(offsets)
+
+
+def test_schedule_connections() -> None:
+    connections = [
+        RecordedConnection("a", start=100.0),
+        RecordedConnection("b", start=101.0),
+        RecordedConnection("c", start=3701.0),
+    ]
+    assert schedule_connections(connections) == [0.0, 1.0, 3601.0]
+    assert schedule_connections(connections, speed=2) == [0.0, 0.5, 1800.5]
+    assert schedule_connections(connections, max_gap=10) == [0.0, 1.0, 11.0]
+    assert not schedule_connections([])
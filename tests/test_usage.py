@@ -0,0 +1,103 @@
+"""Tests for voice usage statistics"""
+
+import time
+from pathlib import Path
+
+import pytest
+from wyoming.tts import SynthesizeStart, SynthesizeVoice
+
+from wyoming_piper import usage
+from wyoming_piper.catalog import VoiceCatalog, VoiceRecord
+from wyoming_piper.usage import USAGE_FILE, UsageStats
+
+from .benchmarks.common import make_handler
+
+
+def _local_time(day: int, hour: int, minute: int = 0) -> float:
+    return time.mktime((2026, 3, day, hour, minute, 0, 0, 0, -1))
+
+
+def test_hour_of_day() -> None:
+    stats = UsageStats()
+    for day in range(1, 11):
+        stats.record("en_US-lessac-medium", _local_time(day, 12))
+        if day % 2 == 0:
+            # German voice every other evening, several times
+            stats.record("de_DE-thorsten-low", _local_time(day, 19, 5))
+            stats.record("de_DE-thorsten-low", _local_time(day, 19, 30))
+
+    # Evening of the next day, ahead of the hour
+    assert [name for name, _score in stats.likely_voices(_local_time(11, 18, 50))] == [
+        "de_DE-thorsten-low"
+    ]
+    assert [name for name, _score in stats.likely_voices(_local_time(11, 12, 30))] == [
+        "en_US-lessac-medium"
+    ]
+    assert stats.likely_voices(_local_time(11, 3)) == []
+
+
+def test_follows() -> None:
+    stats = UsageStats()
+    stats.record("en_US-lessac-medium", _local_time(1, 8))
+    stats.record("en_US-kids-low", _local_time(1, 8, 5))
+    stats.record("en_US-lessac-medium", _local_time(1, 20))
+
+    # Lessac was followed by the kids voice in one of its two uses
+    likely = dict(stats.likely_voices(_local_time(1, 20, 1)))
+    assert likely["en_US-kids-low"] == 0.5
+
+    # Only right after the voice it follows
+    assert "en_US-kids-low" not in dict(stats.likely_voices(_local_time(1, 21)))
+
+
+def test_decay() -> None:
+    stats = UsageStats()
+    stats.record("en_US-lessac-medium", _local_time(1, 8))
+    stats.record("en_US-lessac-medium", _local_time(15, 9))
+
+    # Two weeks later: first day counts half
+    assert stats.days == 1.5
+    assert stats.voices["en_US-lessac-medium"].hours[8] == 0.5
+    assert stats.voices["en_US-lessac-medium"].hours[9] == 1.0
+
+
+def test_save_load(tmp_path: Path) -> None:
+    usage_path = tmp_path / USAGE_FILE
+    stats = UsageStats(usage_path)
+    stats.record("en_US-lessac-medium", _local_time(1, 8))
+    stats.set_size("en_US-lessac-medium", 1234)
+    stats.save()
+
+    loaded = UsageStats.load(usage_path)
+    assert loaded.days == 1
+    assert loaded.voices["en_US-lessac-medium"].num_bytes == 1234
+    assert loaded.voices["en_US-lessac-medium"].hours[8] == 1
+
+    usage_path.write_text("not json", encoding="utf-8")
+    assert not UsageStats.load(usage_path).voices
+
+
+async def test_only_known_voices_recorded(monkeypatch: pytest.MonkeyPatch) -> None:
+    stats = UsageStats()
+    monkeypatch.setattr(usage, "_USAGE_STATS", stats)
+    voices_info = VoiceCatalog(
+        [
+            VoiceRecord(
+                "en_US-lessac-medium",
+                "lessac",
+                "medium",
+                "en_US",
+                aliases=("en-us-lessac-medium",),
+            )
+        ]
+    )
+
+    for voice_name in ("en-us-lessac-medium", "en_US-lesac-medium", "x" * 100):
+        handler = make_handler(voices_info, voice="en_US-default-low")
+        await handler.handle_event(
+            SynthesizeStart(voice=SynthesizeVoice(name=voice_name)).event()
+        )
+        await handler.disconnect()
+
+    # Misspelled or made up names are not kept
+    assert list(stats.voices) == ["en_US-lessac-medium"]
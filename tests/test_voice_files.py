@@ -0,0 +1,134 @@
+"""Tests for the voice file index"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from wyoming_piper import voice_files
+from wyoming_piper.voice_files import VoiceFileIndex
+
+
+def _backdate(path: Path) -> None:
+    """Last changed a minute ago (a listing can be trusted)."""
+    past = time.time() - 60
+    os.utime(path, (past, past))
+
+
+def _count_listings(monkeypatch: pytest.MonkeyPatch) -> list:
+    listed: list = []
+    scandir = os.scandir
+
+    def counting_scandir(path):  # type: ignore[no-untyped-def]
+        listed.append(path)
+        return scandir(path)
+
+    monkeypatch.setattr(voice_files.os, "scandir", counting_scandir)
+    return listed
+
+
+def test_listed_when_changed(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    listed = _count_listings(monkeypatch)
+    index = VoiceFileIndex()
+    (tmp_path / "en_US-test-low.onnx").write_bytes(b"\0")
+    _backdate(tmp_path)
+
+    assert index.find_voice(tmp_path, "en_US-test-low") is None
+    assert index.voice_names(tmp_path) == ["en_US-test-low"]
+    assert len(listed) == 1
+
+    # Added config
+    (tmp_path / "en_US-test-low.onnx.json").write_text("{}")
+    assert index.find_voice(tmp_path, "en_US-test-low") == (
+        tmp_path / "en_US-test-low.onnx",
+        tmp_path / "en_US-test-low.onnx.json",
+    )
+    assert len(listed) == 2
+
+    # Listed again while the change is recent
+    index.find_voice(tmp_path, "en_US-test-low")
+    assert len(listed) == 3
+
+    _backdate(tmp_path)
+    index.find_voice(tmp_path, "en_US-test-low")
+    index.find_voice(tmp_path, "en_US-test-low")
+    assert len(listed) == 4
+
+    # Missing directory
+    assert index.find_voice(tmp_path / "missing", "en_US-test-low") is None
+
+
+def test_quantized_and_sizes(tmp_path: Path) -> None:
+    index = VoiceFileIndex()
+    (tmp_path / "en_US-test-low.onnx").write_bytes(b"\0")
+    (tmp_path / "en_US-test-low.onnx.json").write_text("{}")
+    (tmp_path / "en_US-test-low.int8.onnx").write_bytes(b"")
+
+    assert index.voice_names(tmp_path) == ["en_US-test-low"]
+    assert index.find_voice(tmp_path, "en_US-test-low", prefer_quantized=True) == (
+        tmp_path / "en_US-test-low.int8.onnx",
+        tmp_path / "en_US-test-low.onnx.json",
+    )
+
+    # Empty file that is still being written
+    _backdate(tmp_path)
+    assert index.size(tmp_path, "en_US-test-low.int8.onnx") == 0
+    (tmp_path / "en_US-test-low.int8.onnx").write_bytes(b"\0\0")
+    _backdate(tmp_path)
+    assert index.size(tmp_path, "en_US-test-low.int8.onnx") == 2
+    assert index.size(tmp_path, "en_US-test-low.onnx") == 1
+    assert index.size(tmp_path, "missing.onnx") is None
+
+
+def test_saved(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    onnx_path = data_dir / "custom.onnx"
+    onnx_path.write_bytes(b"\0")
+    config_path = data_dir / "custom.onnx.json"
+    config_path.write_text(
+        json.dumps(
+            {
+                "dataset": "my_voice",
+                "audio": {"quality": "medium"},
+                "espeak": {"voice": "de"},
+            }
+        )
+    )
+    _backdate(config_path)
+    _backdate(data_dir)
+
+    cache_path = tmp_path / voice_files.CACHE_FILE
+    index = VoiceFileIndex.load(cache_path)
+    custom_voice = index.custom_voice(onnx_path, config_path)
+    assert (custom_voice.name, custom_voice.description, custom_voice.language) == (
+        "my_voice",
+        "my_voice (medium)",
+        "de",
+    )
+    assert index.voice_names(data_dir) == ["custom"]
+    index.save()
+
+    # Restart: nothing is listed or parsed again
+    listed = _count_listings(monkeypatch)
+    monkeypatch.setattr(
+        voice_files.CustomVoice, "from_config", pytest.fail  # type: ignore[arg-type]
+    )
+    index = VoiceFileIndex.load(cache_path)
+    assert index.voice_names(data_dir) == ["custom"]
+    assert index.custom_voice(onnx_path, config_path).name == "my_voice"
+    assert not listed
+
+    # Plain JSON, not pickled objects
+    cached = json.loads(cache_path.read_text(encoding="utf-8"))
+    assert cached["custom_voices"][str(config_path)][2] == [
+        "my_voice",
+        "my_voice (medium)",
+        "de",
+    ]
+
+    # Unreadable
+    cache_path.write_bytes(b"\x80not json")
+    assert VoiceFileIndex.load(cache_path).voice_names(data_dir) == ["custom"]
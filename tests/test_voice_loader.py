@@ -0,0 +1,27 @@
+"""Tests for tuned onnxruntime session profiles"""
+
+from pathlib import Path
+
+from wyoming_piper.voice_loader import SessionProfile, load_profile, save_profile
+
+
+def test_save_profile(tmp_path: Path) -> None:
+    tuned = SessionProfile(intra_op_num_threads=2, enable_cpu_mem_arena=False)
+    save_profile(tmp_path, "en_US-tuned-low", tuned, {"real_time_factor": 0.1})
+
+    assert load_profile(tmp_path, "en_US-tuned-low") == tuned
+
+    # Not used for other voices unless asked for
+    assert load_profile(tmp_path, "en_US-other-low") is None
+
+    default = SessionProfile(intra_op_num_threads=4)
+    save_profile(tmp_path, "en_US-default-low", default, {}, as_default=True)
+    assert load_profile(tmp_path, "en_US-other-low") == default
+    assert load_profile(tmp_path, "en_US-tuned-low") == tuned
+
+
+def test_load_profile_missing(tmp_path: Path) -> None:
+    assert load_profile(tmp_path, "en_US-tuned-low") is None
+
+    (tmp_path / "ort_profiles.json").write_text("not json")
+    assert load_profile(tmp_path, "en_US-tuned-low") is None
@@ -1,19 +1,50 @@
 #!/usr/bin/env python3
 import argparse
 import asyncio
-import json
 import logging
 import signal
 from functools import partial
 from pathlib import Path
-from typing import Any, Dict, Set
+from typing import Awaitable, Callable, List, Optional, Set
 
 from wyoming.info import Attribution, Info, TtsProgram, TtsVoice, TtsVoiceSpeaker
 from wyoming.server import AsyncServer, AsyncTcpServer
 
 from . import __version__
-from .download import ensure_voice_exists, find_voice, get_voices
-from .handler import PiperEventHandler, get_omnivoice_voices, load_omnivoice
+from .catalog import VoiceCatalog, VoiceRecord
+from .describe import filter_voices, info_event_bytes, set_info_voices
+from .download import (
+    VoiceNotFoundError,
+    ensure_voice_exists,
+    find_voice,
+    get_voice_catalog,
+)
+from .handler import (
+    PiperEventHandler,
+    get_omnivoice_voices,
+    idle_unloader,
+    load_omnivoice,
+    load_omnivoice_voices,
+    match_voice_names,
+    memory_monitor,
+    preload_piper_voices,
+    reload_changed_voices,
+    reload_omnivoice_voices,
+    report_load_stage,
+    request_voice_reload,
+    start_model_loading,
+    voice_predictor,
+    voice_reloader,
+    warmup_omnivoice,
+)
+from .memory import format_bytes
+from .profiling import Profiler, set_profiler
+from .threads import ThreadBudget, set_thread_budget
+from .trace import Tracer, set_tracer
+from .traffic import TrafficRecorder, set_traffic_recorder
+from .usage import USAGE_FILE, UsageStats, set_usage_stats
+from .voice_files import CACHE_FILE as VOICE_FILES_CACHE
+from .voice_files import VoiceFileIndex, get_voice_file_index, set_voice_file_index
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -83,12 +114,139 @@ async def main() -> None:
         action="store_true",
         help="Download latest voices.json during startup",
     )
+    parser.add_argument(
+        "--info-voices",
+        choices=("all", "installed"),
+        default="all",
+        help="Voices listed in the info sent to clients: every voice in "
+        "voices.json, or only voices downloaded to a data dir (piper; custom "
+        "voices and --voice are always listed)",
+    )
+    parser.add_argument(
+        "--info-language",
+        action="append",
+        default=[],
+        help="Only list voices for this language (en) or locale (en_US) in the "
+        "info sent to clients (can be repeated; --voice is always listed)",
+    )
     #
     parser.add_argument(
         "--use-cuda",
         action="store_true",
         help="Use CUDA if available (requires onnxruntime-gpu)",
     )
+    parser.add_argument(
+        "--no-optimized-model-cache",
+        action="store_true",
+        help="Don't cache onnxruntime-optimized Piper models next to the voices",
+    )
+    parser.add_argument(
+        "--prefer-quantized",
+        action="store_true",
+        help="Use a quantized <voice>.int8.onnx next to a Piper voice if present",
+    )
+    parser.add_argument(
+        "--mmap-models",
+        action="store_true",
+        help="Memory-map model weights so server processes share one copy",
+    )
+    parser.add_argument(
+        "--memory-soft-limit",
+        type=float,
+        help="Resident memory in MiB above which the OmniVoice prompt cache and "
+        "then the loaded piper voice are freed (reloaded on demand)",
+    )
+    parser.add_argument(
+        "--preload-voice",
+        action="append",
+        default=[],
+        help="Load a voice at startup, keep it in memory and warm it up with a "
+        "short synthesis (can be repeated, wildcards allowed; omnivoice: "
+        "'default' is the built-in speaker)",
+    )
+    parser.add_argument(
+        "--predictive-preload",
+        action="store_true",
+        help="Count requests per voice and hour (saved in the download dir) and "
+        "load voices ahead of their usual time or after a voice they usually "
+        "follow (piper backend)",
+    )
+    parser.add_argument(
+        "--preload-budget",
+        type=float,
+        default=256,
+        help="MiB of memory for voices loaded by --predictive-preload "
+        "(default: 256)",
+    )
+    parser.add_argument(
+        "--ready-timeout",
+        type=float,
+        default=300,
+        help="Seconds a request waits for models that are still loading at "
+        "startup (default: 300)",
+    )
+    parser.add_argument(
+        "--idle-unload-seconds",
+        type=float,
+        help="Unload models after this many seconds without requests; they are "
+        "loaded again by the next request",
+    )
+    parser.add_argument(
+        "--voice-reload-interval",
+        type=float,
+        default=0,
+        help="Look for added, removed or replaced voices every this many seconds; "
+        "with 0, only on SIGHUP or a change in the web UI (default: 0)",
+    )
+    parser.add_argument(
+        "--memory-log-interval",
+        type=float,
+        default=0,
+        help="Log memory per loaded model and cache every N seconds (default: off)",
+    )
+    parser.add_argument(
+        "--cpu-budget",
+        type=int,
+        help="Number of CPUs to divide between the backend's onnxruntime "
+        "sessions and torch (default: library defaults, every core each)",
+    )
+    parser.add_argument(
+        "--cpu-affinity",
+        action="store_true",
+        help="Pin the process to --cpu-budget CPUs and each ONNX session to "
+        "its own share of them",
+    )
+    parser.add_argument(
+        "--record-traffic",
+        metavar="FILE",
+        help="Append incoming events (with timing and text, no audio) to a "
+        "JSON lines file for python3 -m wyoming_piper.traffic",
+    )
+    #
+    parser.add_argument(
+        "--tune",
+        action="store_true",
+        help="Benchmark onnxruntime session options for --voice, save the "
+        "fastest to the download dir for later loads, and exit",
+    )
+    parser.add_argument(
+        "--tune-text",
+        action="append",
+        help="Sentence to synthesize while tuning (repeatable; default: "
+        "built-in English sentences of varied length)",
+    )
+    parser.add_argument(
+        "--tune-repeats",
+        type=int,
+        default=3,
+        help="Times each sentence is synthesized per profile (default: 3)",
+    )
+    parser.add_argument(
+        "--tune-default",
+        action="store_true",
+        help="With --tune, also use the fastest options for voices that were "
+        "not tuned themselves",
+    )
     #
     # Web UI for managing custom voices (runs alongside the Wyoming server)
     parser.add_argument(
@@ -109,6 +267,47 @@ async def main() -> None:
         help="Port for the web UI (default: 5000)",
     )
     #
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve Prometheus metrics at /metrics on this port "
+        "(also at /metrics on the web UI with --web-server)",
+    )
+    parser.add_argument(
+        "--metrics-host",
+        default="0.0.0.0",
+        help="Host to bind the metrics port to (default: 0.0.0.0)",
+    )
+    parser.add_argument(
+        "--trace-file",
+        metavar="FILE",
+        help="Append per-request stage timings (JSON lines) to this file",
+    )
+    parser.add_argument(
+        "--trace-slow",
+        type=float,
+        metavar="SECONDS",
+        help="Log the stage timings of requests slower than this; with "
+        "--trace-file, only these requests are written",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        help="Write CPU and onnxruntime profiles of sampled requests here; "
+        "SIGUSR1 profiles the next --profile-requests requests",
+    )
+    parser.add_argument(
+        "--profile-sample",
+        type=float,
+        default=0.0,
+        help="Fraction of requests to profile with --profile-dir (default: 0)",
+    )
+    parser.add_argument(
+        "--profile-requests",
+        type=int,
+        default=1,
+        help="Requests to profile after SIGUSR1 (default: 1)",
+    )
+    #
     # OmniVoice backend options
     parser.add_argument(
         "--omnivoice-steps",
@@ -117,6 +316,22 @@ async def main() -> None:
         help="Number of MaskGIT decode steps for the omnivoice backend "
         "(default: 32, fewer is faster)",
     )
+    parser.add_argument(
+        "--omnivoice-sessions",
+        type=int,
+        default=1,
+        help="Number of ONNX sessions for the omnivoice backend; this many "
+        "requests run at once, with CPU threads split between them. Only "
+        "helps with spare cores (default: 1)",
+    )
+    parser.add_argument(
+        "--omnivoice-decode-window",
+        type=int,
+        default=0,
+        help="Decode OmniVoice audio in windows of this many codec frames "
+        "(~25 per second, e.g. 50) and stream each window as it is ready; 0 "
+        "decodes the whole sentence at once (default: 0)",
+    )
     parser.add_argument(
         "--omnivoice-ref-dir",
         help="Directory of reference voices for cloning (omnivoice backend), "
@@ -161,13 +376,77 @@ async def main() -> None:
     )
     _LOGGER.debug(args)
 
+    if args.cpu_budget:
+        num_workers = args.omnivoice_sessions if args.backend == "omnivoice" else 1
+        thread_budget = ThreadBudget(
+            args.cpu_budget, num_workers=num_workers, pin_cpus=args.cpu_affinity
+        )
+        thread_budget.apply_affinity()
+        set_thread_budget(thread_budget)
+        _LOGGER.info("CPU budget (%s): %s", args.backend, thread_budget.describe())
+    elif args.cpu_affinity:
+        parser.error("--cpu-affinity requires --cpu-budget")
+
+    if args.tune_default and (not args.tune):
+        parser.error("--tune-default requires --tune")
+
+    if args.predictive_preload and (args.backend != "piper"):
+        parser.error("--predictive-preload is only supported for the piper backend")
+
+    if args.tune:
+        if args.backend != "piper":
+            parser.error("--tune is only supported for the piper backend")
+
+        if not args.voice:
+            parser.error("--tune requires --voice")
+
+        _tune_piper(args)
+        return
+
+    load_models: Callable[[], None]
+    reload_voices: Callable[[bool], Awaitable[None]]
     if args.backend == "omnivoice":
         wyoming_info, voices_info = _setup_omnivoice(args)
+        load_models = partial(_load_omnivoice, args)
+        reload_voices = partial(_reload_omnivoice, args, wyoming_info)
     else:
         if not args.voice:
             parser.error("--voice is required for the piper backend")
 
+        # Saved by _piper_voices for the next start
+        set_voice_file_index(
+            VoiceFileIndex.load(Path(args.download_dir) / VOICE_FILES_CACHE)
+        )
         wyoming_info, voices_info = _setup_piper(args)
+        load_models = partial(_load_piper, args, voices_info)
+        reload_voices = _piper_reloader(args, wyoming_info, voices_info)
+
+    # Serialize the Describe response once, before the first client
+    _LOGGER.debug(
+        "Info lists %s voice(s) (%s)",
+        sum(len(program.voices) for program in wyoming_info.tts),
+        format_bytes(len(info_event_bytes(wyoming_info))),
+    )
+
+    traffic_recorder: Optional[TrafficRecorder] = None
+    if args.record_traffic:
+        traffic_recorder = TrafficRecorder(args.record_traffic)
+        set_traffic_recorder(traffic_recorder)
+        _LOGGER.info("Recording traffic to %s", args.record_traffic)
+
+    tracer: Optional[Tracer] = None
+    if args.trace_file or (args.trace_slow is not None):
+        tracer = Tracer(args.trace_file, slow_seconds=args.trace_slow)
+        set_tracer(tracer)
+
+    profiler: Optional[Profiler] = None
+    if args.profile_dir:
+        profiler = Profiler(
+            args.profile_dir,
+            sample_rate=args.profile_sample,
+            window_requests=args.profile_requests,
+        )
+        set_profiler(profiler)
 
     # Start server
     server = AsyncServer.from_uri(args.uri)
@@ -200,6 +479,50 @@ async def main() -> None:
             port=args.web_server_port,
         )
 
+    if args.metrics_port:
+        from .metrics import start_metrics_server
+
+        await start_metrics_server(args.metrics_host, args.metrics_port)
+
+    monitor_task: Optional[asyncio.Task] = None
+    if args.memory_soft_limit or (args.memory_log_interval > 0):
+        monitor_task = asyncio.create_task(
+            memory_monitor(
+                soft_limit_bytes=(
+                    int(args.memory_soft_limit * 1024 * 1024)
+                    if args.memory_soft_limit
+                    else None
+                ),
+                log_interval=args.memory_log_interval,
+            )
+        )
+
+    idle_task: Optional[asyncio.Task] = None
+    if args.idle_unload_seconds:
+        idle_task = asyncio.create_task(idle_unloader(args.idle_unload_seconds))
+
+    # Answer Describe right away; synthesis waits for the models
+    start_model_loading(load_models)
+
+    predictor_task: Optional[asyncio.Task] = None
+    usage_stats: Optional[UsageStats] = None
+    if args.predictive_preload:
+        usage_stats = UsageStats.load(Path(args.download_dir) / USAGE_FILE)
+        set_usage_stats(usage_stats)
+        predictor_task = asyncio.create_task(
+            voice_predictor(
+                usage_stats,
+                args,
+                voices_info,
+                budget_bytes=int(args.preload_budget * 1024 * 1024),
+            )
+        )
+
+    # Voice files changed by the web UI, SIGHUP or --voice-reload-interval
+    reload_task = asyncio.create_task(
+        voice_reloader(reload_voices, args.voice_reload_interval)
+    )
+
     _LOGGER.info("Ready")
     server_task = asyncio.create_task(
         server.run(
@@ -214,135 +537,222 @@ async def main() -> None:
     loop = asyncio.get_running_loop()
     loop.add_signal_handler(signal.SIGINT, server_task.cancel)
     loop.add_signal_handler(signal.SIGTERM, server_task.cancel)
+    loop.add_signal_handler(signal.SIGHUP, request_voice_reload)
+    if profiler is not None:
+        loop.add_signal_handler(signal.SIGUSR1, profiler.request_window)
 
     try:
         await server_task
     except asyncio.CancelledError:
         _LOGGER.info("Server stopped")
+    finally:
+        for task in (monitor_task, idle_task, predictor_task, reload_task):
+            if task is not None:
+                task.cancel()
+
+        if usage_stats is not None:
+            usage_stats.save()
+
+        if traffic_recorder is not None:
+            traffic_recorder.close()
+
+        if tracer is not None:
+            tracer.close()
 
 
 # -----------------------------------------------------------------------------
 
 
-def _setup_piper(args: argparse.Namespace) -> "tuple[Info, Dict[str, Any]]":
+def _setup_piper(args: argparse.Namespace) -> "tuple[Info, VoiceCatalog]":
     """Build Wyoming info and voice table for the piper backend."""
-    # Load voice info
-    voices_info = get_voices(args.download_dir, update_voices=args.update_voices)
+    # Load voice info (aliases are old voice names)
+    voices_info = get_voice_catalog(args.download_dir, update_voices=args.update_voices)
+    wyoming_info = Info(
+        tts=[
+            TtsProgram(
+                name="piper",
+                description="A fast, local, neural text to speech engine",
+                attribution=Attribution(
+                    name="rhasspy", url="https://github.com/rhasspy/piper"
+                ),
+                installed=True,
+                voices=_piper_voices(args, voices_info),
+                version=__version__,
+                supports_synthesize_streaming=(not args.no_streaming),
+            )
+        ],
+    )
 
-    # Resolve aliases for backwards compatibility with old voice names
-    aliases_info: Dict[str, Any] = {}
-    for voice_info in voices_info.values():
-        for voice_alias in voice_info.get("aliases", []):
-            aliases_info[voice_alias] = {"_is_alias": True, **voice_info}
+    return wyoming_info, voices_info
 
-    voices_info.update(aliases_info)
+
+def _piper_voices(
+    args: argparse.Namespace, voices_info: VoiceCatalog
+) -> List[TtsVoice]:
+    """Voices in the Info of the piper backend: catalog and custom voices."""
+    default_voice = voices_info.resolve(args.voice)
     voices = [
         TtsVoice(
-            name=voice_name,
-            description=get_description(voice_info),
+            name=voice.key,
+            description=get_description(voice),
             attribution=Attribution(
                 name="rhasspy", url="https://github.com/rhasspy/piper"
             ),
             installed=True,
             version=None,
-            languages=[
-                voice_info.get("language", {}).get(
-                    "code",
-                    voice_info.get("espeak", {}).get("voice", voice_name.split("_")[0]),
-                )
-            ],
+            languages=[voice.language],
             speakers=(
-                [
-                    TtsVoiceSpeaker(name=speaker_name)
-                    for speaker_name in voice_info["speaker_id_map"]
-                ]
-                if voice_info.get("speaker_id_map")
+                [TtsVoiceSpeaker(name=speaker_name) for speaker_name in voice.speakers]
+                if voice.speakers
                 else None
             ),
         )
-        for voice_name, voice_info in voices_info.items()
-        if not voice_info.get("_is_alias", False)
+        for voice in voices_info.voices.values()
+        if (args.info_voices == "all")
+        or (voice.key == default_voice)
+        or _is_installed(voice.key, args.data_dir)
     ]
 
     custom_voice_names: Set[str] = set()
     if args.voice not in voices_info:
         custom_voice_names.add(args.voice)
 
+    voice_file_index = get_voice_file_index()
     for data_dir in args.data_dir:
-        data_dir = Path(data_dir)
-        if not data_dir.is_dir():
-            continue
-
-        for onnx_path in data_dir.glob("*.onnx"):
-            custom_voice_name = onnx_path.stem
+        for custom_voice_name in voice_file_index.voice_names(data_dir):
             if custom_voice_name not in voices_info:
                 custom_voice_names.add(custom_voice_name)
 
     for custom_voice_name in custom_voice_names:
         # Add custom voice info
-        custom_voice_path, custom_config_path = find_voice(
-            custom_voice_name, args.data_dir
-        )
-        with open(custom_config_path, "r", encoding="utf-8") as custom_config_file:
-            custom_config = json.load(custom_config_file)
-            custom_name = custom_config.get("dataset", custom_voice_path.stem)
-            custom_quality = custom_config.get("audio", {}).get("quality")
-            if custom_quality:
-                description = f"{custom_name} ({custom_quality})"
-            else:
-                description = custom_name
-
-            lang_code = custom_config.get("language", {}).get("code")
-            if not lang_code:
-                lang_code = custom_config.get("espeak", {}).get("voice")
-                if not lang_code:
-                    lang_code = custom_voice_path.stem.split("_")[0]
-
-            voices.append(
-                TtsVoice(
-                    name=custom_name,
-                    description=description,
-                    version=None,
-                    attribution=Attribution(name="", url=""),
-                    installed=True,
-                    languages=[lang_code],
-                )
+        try:
+            custom_voice_path, custom_config_path = find_voice(
+                custom_voice_name, args.data_dir
             )
+        except VoiceNotFoundError:
+            _LOGGER.warning("Custom voice not found: %s", custom_voice_name)
+            continue
 
-    wyoming_info = Info(
-        tts=[
-            TtsProgram(
-                name="piper",
-                description="A fast, local, neural text to speech engine",
-                attribution=Attribution(
-                    name="rhasspy", url="https://github.com/rhasspy/piper"
-                ),
+        custom_voice = voice_file_index.custom_voice(
+            custom_voice_path, custom_config_path
+        )
+        voices.append(
+            TtsVoice(
+                name=custom_voice.name,
+                description=custom_voice.description,
+                version=None,
+                attribution=Attribution(name="", url=""),
                 installed=True,
-                voices=sorted(voices, key=lambda v: v.name),
-                version=__version__,
-                supports_synthesize_streaming=(not args.no_streaming),
+                languages=[custom_voice.language],
             )
-        ],
-    )
+        )
+
+    # Save the listings and parsed configs for the next start
+    voice_file_index.save()
+
+    if args.info_language:
+        voices = filter_voices(voices, args.info_language, keep={default_voice})
+
+    return sorted(voices, key=lambda v: v.name)
+
+
+def _is_installed(voice_name: str, data_dirs: List[str]) -> bool:
+    """True if the voice's model and config are in a data dir."""
+    try:
+        find_voice(voice_name, data_dirs)
+    except VoiceNotFoundError:
+        return False
+
+    return True
+
 
-    # Ensure default voice is downloaded
-    voice_info = voices_info.get(args.voice, {})
-    voice_name = voice_info.get("key", args.voice)
-    assert voice_name is not None
+def _piper_reloader(
+    args: argparse.Namespace, wyoming_info: Info, voices_info: VoiceCatalog
+) -> Callable[[bool], Awaitable[None]]:
+    """Reload for :func:`voice_reloader` with the piper backend.
 
+    The voice list is built again when a data dir changed (or on request), and
+    loaded voices whose files changed are loaded again.
+    """
+    voice_file_index = get_voice_file_index()
+    listings = [voice_file_index.files(data_dir) for data_dir in args.data_dir]
+
+    async def reload(requested: bool) -> None:
+        nonlocal listings
+
+        if requested:
+            # Files may have been overwritten in place
+            voice_file_index.invalidate()
+
+        new_listings = [voice_file_index.files(data_dir) for data_dir in args.data_dir]
+        if requested or (new_listings != listings):
+            listings = new_listings
+            voices = await asyncio.get_running_loop().run_in_executor(
+                None, _piper_voices, args, voices_info
+            )
+            _update_info_voices(wyoming_info, voices)
+
+        await reload_changed_voices(args, voices_info)
+
+    return reload
+
+
+def _load_piper(args: argparse.Namespace, voices_info: VoiceCatalog) -> None:
+    """Download the default voice if needed and load --preload-voice voices."""
+    voice_name = voices_info.resolve(args.voice)
+
+    report_load_stage(f"checking voice {voice_name}")
     ensure_voice_exists(voice_name, args.data_dir, args.download_dir, voices_info)
 
-    return wyoming_info, voices_info
+    if args.preload_voice:
+        preload_piper_voices(
+            match_voice_names(args.preload_voice, voices_info),
+            args,
+            voices_info,
+        )
+
+
+# -----------------------------------------------------------------------------
+
+
+def _tune_piper(args: argparse.Namespace) -> None:
+    """Tune onnxruntime session options for the --voice Piper voice."""
+    from .tune import tune_voice
+
+    voices_info = get_voice_catalog(args.download_dir, update_voices=args.update_voices)
+    voice_name = voices_info.resolve(args.voice)
+
+    ensure_voice_exists(voice_name, args.data_dir, args.download_dir, voices_info)
+    model_path, config_path = find_voice(
+        voice_name, args.data_dir, prefer_quantized=args.prefer_quantized
+    )
+
+    _LOGGER.info("Tuning onnxruntime session options for %s", voice_name)
+    tune_voice(
+        voice_name,
+        model_path,
+        config_path,
+        args.download_dir,
+        sentences=args.tune_text,
+        repeats=args.tune_repeats,
+        as_default=args.tune_default,
+    )
 
 
 # -----------------------------------------------------------------------------
 
 
-def _setup_omnivoice(args: argparse.Namespace) -> "tuple[Info, Dict[str, Any]]":
-    """Build Wyoming info and ensure models for the omnivoice backend.
+_OMNIVOICE_ATTRIBUTION = Attribution(
+    name="k2-fsa", url="https://github.com/k2-fsa/OmniVoice"
+)
+
 
-    The HuggingFace cache is pointed at ``--download-dir`` and the model is
-    downloaded there (unless ``--local-files-only`` is set).
+def _setup_omnivoice(args: argparse.Namespace) -> "tuple[Info, VoiceCatalog]":
+    """Build Wyoming info for the omnivoice backend.
+
+    The HuggingFace cache is pointed at ``--download-dir``; the model is
+    downloaded there (unless ``--local-files-only`` is set) and loaded in the
+    background by :func:`load_omnivoice`.
     """
     import os
 
@@ -351,17 +761,35 @@ def _setup_omnivoice(args: argparse.Namespace) -> "tuple[Info, Dict[str, Any]]":
     if args.local_files_only:
         os.environ["HF_HUB_OFFLINE"] = "1"
 
-    # Download (if needed) and load the shared model + reference voices now,
-    # before serving.
-    load_omnivoice(args)
+    load_omnivoice_voices(args)
 
+    wyoming_info = Info(
+        tts=[
+            TtsProgram(
+                name="omnivoice",
+                description="High-quality multilingual voice-cloning TTS",
+                attribution=_OMNIVOICE_ATTRIBUTION,
+                installed=True,
+                voices=_omnivoice_voices(args),
+                version=__version__,
+                supports_synthesize_streaming=(not args.no_streaming),
+            )
+        ],
+    )
+
+    # voices_info is unused by the omnivoice backend.
+    return wyoming_info, VoiceCatalog()
+
+
+def _omnivoice_voices(args: argparse.Namespace) -> List[TtsVoice]:
+    """Voices in the Info of the omnivoice backend."""
     from .omnivoice import (
         DEFAULT_VOICE_NAME,
         advertise_language,
         get_supported_languages,
     )
 
-    attribution = Attribution(name="k2-fsa", url="https://github.com/k2-fsa/OmniVoice")
+    attribution = _OMNIVOICE_ATTRIBUTION
 
     # Built-in (no-reference) speaker: advertised for every supported language.
     # Used for this voice, an empty voice name, or an unknown one.
@@ -389,34 +817,66 @@ def _setup_omnivoice(args: argparse.Namespace) -> "tuple[Info, Dict[str, Any]]":
             )
         )
 
-    wyoming_info = Info(
-        tts=[
-            TtsProgram(
-                name="omnivoice",
-                description="High-quality multilingual voice-cloning TTS",
-                attribution=attribution,
-                installed=True,
-                voices=voices,
-                version=__version__,
-                supports_synthesize_streaming=(not args.no_streaming),
-            )
-        ],
+    if args.info_language:
+        voices = filter_voices(voices, args.info_language, keep={DEFAULT_VOICE_NAME})
+
+    return voices
+
+
+async def _reload_omnivoice(
+    args: argparse.Namespace, wyoming_info: Info, _requested: bool
+) -> None:
+    """Reload for :func:`voice_reloader` with the omnivoice backend.
+
+    The reference dir is scanned whether or not the reload was requested.
+    """
+    changed = await asyncio.get_running_loop().run_in_executor(
+        None, reload_omnivoice_voices, args
     )
+    if changed:
+        _update_info_voices(wyoming_info, _omnivoice_voices(args))
 
-    # voices_info is unused by the omnivoice backend.
-    return wyoming_info, {}
+
+def _load_omnivoice(args: argparse.Namespace) -> None:
+    """Load the OmniVoice model and warm up --preload-voice voices."""
+    load_omnivoice(args)
+
+    if args.preload_voice:
+        from .omnivoice import DEFAULT_VOICE_NAME
+
+        warmup_omnivoice(
+            match_voice_names(
+                args.preload_voice, [DEFAULT_VOICE_NAME, *get_omnivoice_voices()]
+            )
+        )
 
 
 # -----------------------------------------------------------------------------
 
 
-def get_description(voice_info: Dict[str, Any]):
-    """Get a human readable description for a voice."""
-    name = voice_info["name"]
-    name = " ".join(name.split("_"))
-    quality = voice_info["quality"]
+def _update_info_voices(wyoming_info: Info, voices: List[TtsVoice]) -> None:
+    """Describe the new voices from now on and log what changed."""
+    old_names = {voice.name for voice in wyoming_info.tts[0].voices}
+    num_old_voices = len(wyoming_info.tts[0].voices)
+    if not set_info_voices(wyoming_info, voices):
+        return
+
+    new_names = {voice.name for voice in voices}
+    _LOGGER.info(
+        "Voices changed: %s listed (was %s), added=%s, removed=%s",
+        len(voices),
+        num_old_voices,
+        sorted(new_names - old_names),
+        sorted(old_names - new_names),
+    )
 
-    return f"{name} ({quality})"
+
+# -----------------------------------------------------------------------------
+
+
+def get_description(voice: VoiceRecord):
+    """Get a human readable description for a voice."""
+    return voice.description
 
 
 # -----------------------------------------------------------------------------
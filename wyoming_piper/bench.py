@@ -0,0 +1,485 @@
+"""Load test a Wyoming Piper server.
+
+Drives N concurrent clients, each sending requests one after another over its
+own connection, and reports latency and throughput:
+
+* **TTFA** — time to first audio: request sent to first audio chunk received
+* **TTLA** — time to last audio: request sent to last audio chunk received
+* **RTF** — TTLA / duration of the received audio
+* **throughput** — seconds of audio (and requests) per wall-clock second
+
+Requests are either a single ``synthesize`` event, or (``--mode stream``) a
+text stream of ``synthesize-start``, ``synthesize-chunk`` (a few words each,
+like an LLM producing tokens) and ``synthesize-stop``.
+
+Connects to a running server with ``--uri tcp://...`` or ``unix://...``
+(``--launch`` starts one first). With ``stdio://`` (the default), every client
+launches its own server process. Server arguments go after ``--``:
+
+    python3 -m wyoming_piper.bench --clients 4 --requests 20 \\
+        -- --voice en_US-lessac-medium --data-dir /data
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from asyncio.subprocess import PIPE, Process
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from wyoming.audio import AudioChunk
+from wyoming.client import AsyncClient
+from wyoming.error import Error
+from wyoming.tts import (
+    Synthesize,
+    SynthesizeChunk,
+    SynthesizeStart,
+    SynthesizeStop,
+    SynthesizeStopped,
+    SynthesizeVoice,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_TEXTS = [
+    "Turning on the kitchen lights.",
+    "The front door has been unlocked, and the alarm system is now disarmed.",
+    "Good morning! Today will be mostly cloudy with a high of seventy two "
+    "degrees, and a thirty percent chance of rain in the late afternoon.",
+    "The timer for the pasta is done. Don't forget to save some of the water.",
+]
+
+MODES = ("synthesize", "stream")
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class BenchRequest:
+    """One request to send."""
+
+    text: str
+    voice: Optional[str] = None
+    mode: str = "synthesize"
+
+
+@dataclass
+class RequestResult:
+    """Timings of one request (seconds)."""
+
+    text: str
+    voice: Optional[str]
+    mode: str
+    client: int
+    start: float
+    end: float = 0.0
+    ttfa: Optional[float] = None
+    ttla: Optional[float] = None
+    audio_seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def real_time_factor(self) -> Optional[float]:
+        if (self.ttla is None) or (self.audio_seconds <= 0):
+            return None
+
+        return self.ttla / self.audio_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = asdict(self)
+        result["real_time_factor"] = self.real_time_factor
+        return result
+
+
+class ProcessClient(AsyncClient):
+    """Client for a server process of its own, over stdin/stdout."""
+
+    def __init__(
+        self, server_args: Sequence[str], read_timeout: Optional[float] = None
+    ) -> None:
+        super().__init__(read_timeout=read_timeout)
+        self.server_args = list(server_args)
+        self._proc: Optional[Process] = None
+
+    async def connect(self) -> None:
+        self._proc = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            "wyoming_piper",
+            "--uri",
+            "stdio://",
+            *self.server_args,
+            stdin=PIPE,
+            stdout=PIPE,
+        )
+        self._reader = self._proc.stdout
+        self._writer = self._proc.stdin  # type: ignore[assignment]
+
+    async def disconnect(self) -> None:
+        proc = self._proc
+        self._proc = None
+        self._reader = None
+        self._writer = None
+
+        if proc is not None:
+            if proc.stdin is not None:
+                proc.stdin.close()
+
+            try:
+                await asyncio.wait_for(proc.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+
+
+def make_client(
+    uri: str, server_args: Sequence[str], read_timeout: Optional[float] = None
+) -> AsyncClient:
+    """Client for ``uri`` (a server process per client for stdio://)."""
+    if uri.startswith("stdio://"):
+        return ProcessClient(server_args, read_timeout=read_timeout)
+
+    return AsyncClient.from_uri(uri, connect_timeout=10, read_timeout=read_timeout)
+
+
+def _text_chunks(text: str, words_per_chunk: int) -> List[str]:
+    """Split text into chunks of a few words, keeping the whitespace."""
+    words = text.split(" ")
+    return [
+        " ".join(words[i : i + words_per_chunk])
+        + (" " if i + words_per_chunk < len(words) else "")
+        for i in range(0, len(words), words_per_chunk)
+    ]
+
+
+async def run_request(
+    client: AsyncClient,
+    request: BenchRequest,
+    client_index: int = 0,
+    words_per_chunk: int = 3,
+) -> RequestResult:
+    """Send one request and time the audio that comes back."""
+    voice = SynthesizeVoice(name=request.voice) if request.voice else None
+    result = RequestResult(
+        text=request.text,
+        voice=request.voice,
+        mode=request.mode,
+        client=client_index,
+        start=time.time(),
+    )
+    start_time = time.perf_counter()
+
+    if request.mode == "stream":
+        await client.write_event(SynthesizeStart(voice=voice).event())
+        for text_chunk in _text_chunks(request.text, words_per_chunk):
+            await client.write_event(SynthesizeChunk(text=text_chunk).event())
+
+        await client.write_event(SynthesizeStop().event())
+    else:
+        await client.write_event(Synthesize(text=request.text, voice=voice).event())
+
+    stream_finished = SynthesizeStopped.is_type if request.mode == "stream" else None
+    while True:
+        event = await client.read_event()
+        if event is None:
+            result.error = "Server disconnected"
+            break
+
+        if AudioChunk.is_type(event.type):
+            audio_chunk = AudioChunk.from_event(event)
+            result.ttla = time.perf_counter() - start_time
+            if result.ttfa is None:
+                result.ttfa = result.ttla
+
+            result.audio_seconds += len(audio_chunk.audio) / (
+                audio_chunk.rate * audio_chunk.width * audio_chunk.channels
+            )
+        elif Error.is_type(event.type):
+            result.error = Error.from_event(event).text
+            break
+        elif stream_finished is not None:
+            if stream_finished(event.type):
+                break
+        elif event.type == "audio-stop":
+            break
+
+    result.end = time.time()
+    return result
+
+
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    """Linearly interpolated percentile (None if there are no values)."""
+    if not values:
+        return None
+
+    values = sorted(values)
+    rank = (len(values) - 1) * (pct / 100)
+    lower = int(rank)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+
+
+def summarize(
+    results: Sequence[RequestResult], wall_seconds: Optional[float] = None
+) -> Dict[str, Any]:
+    """Aggregate statistics over results.
+
+    Wall time defaults to first request start to last request end, which leaves
+    out server startup and warmup.
+    """
+    if wall_seconds is None:
+        wall_seconds = (
+            max(r.end for r in results) - min(r.start for r in results)
+            if results
+            else 0.0
+        )
+
+    ok = [r for r in results if r.error is None]
+    audio_seconds = sum(r.audio_seconds for r in ok)
+    summary: Dict[str, Any] = {
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        "wall_seconds": wall_seconds,
+        "audio_seconds": audio_seconds,
+        "requests_per_second": len(ok) / wall_seconds if wall_seconds > 0 else None,
+        "audio_seconds_per_second": (
+            audio_seconds / wall_seconds if wall_seconds > 0 else None
+        ),
+    }
+
+    metrics = {
+        "ttfa": [r.ttfa for r in ok if r.ttfa is not None],
+        "ttla": [r.ttla for r in ok if r.ttla is not None],
+        "rtf": [r.real_time_factor for r in ok if r.real_time_factor is not None],
+    }
+    for name, values in metrics.items():
+        summary[name] = {
+            "mean": sum(values) / len(values) if values else None,
+            **{f"p{pct}": percentile(values, pct) for pct in PERCENTILES},
+        }
+
+    return summary
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """Human-readable summary table."""
+
+    def fmt(value: Optional[float], scale: float = 1.0) -> str:
+        return "-" if value is None else f"{value * scale:.3f}"
+
+    lines = [
+        f"requests: {summary['requests']} ({summary['errors']} error(s)) "
+        f"in {summary['wall_seconds']:.1f}s",
+        f"throughput: {fmt(summary['requests_per_second'])} req/s, "
+        f"{fmt(summary['audio_seconds_per_second'])} audio s/s",
+        f"{'':<10} {'mean':>8} "
+        + " ".join(f"{'p' + str(pct):>8}" for pct in PERCENTILES),
+    ]
+    for name, label, scale in (
+        ("ttfa", "TTFA ms", 1000),
+        ("ttla", "TTLA ms", 1000),
+        ("rtf", "RTF", 1),
+    ):
+        stats = summary[name]
+        lines.append(
+            f"{label:<10} {fmt(stats['mean'], scale):>8} "
+            + " ".join(f"{fmt(stats['p' + str(pct)], scale):>8}" for pct in PERCENTILES)
+        )
+
+    return "\n".join(lines)
+
+
+async def run_client(
+    client: AsyncClient,
+    client_index: int,
+    requests: Sequence[BenchRequest],
+    num_warmup: int = 0,
+    words_per_chunk: int = 3,
+) -> List[RequestResult]:
+    """Send requests one after another on one connection."""
+    results: List[RequestResult] = []
+    async with client:
+        for request_index, request in enumerate(requests):
+            result = await run_request(
+                client, request, client_index, words_per_chunk=words_per_chunk
+            )
+            if result.error is not None:
+                _LOGGER.warning("Client %s: %s", client_index, result.error)
+
+            if request_index >= num_warmup:
+                results.append(result)
+
+    return results
+
+
+async def wait_for_server(uri: str, timeout: float) -> None:
+    """Wait until a server accepts connections on ``uri``."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with AsyncClient.from_uri(uri, connect_timeout=1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+
+            await asyncio.sleep(0.5)
+
+
+def load_texts(texts: Optional[Sequence[str]], text_files: Sequence[str]) -> List[str]:
+    """Texts from the command line and files (one per line)."""
+    all_texts = list(texts or [])
+    for text_file in text_files:
+        with open(text_file, "r", encoding="utf-8") as text_io:
+            all_texts.extend(line.strip() for line in text_io if line.strip())
+
+    return all_texts or DEFAULT_TEXTS
+
+
+def make_requests(
+    texts: Sequence[str],
+    voices: Sequence[Optional[str]],
+    modes: Sequence[str],
+    count: int,
+    rng: random.Random,
+) -> List[BenchRequest]:
+    """Random mix of texts, voices and modes."""
+    return [
+        BenchRequest(
+            text=rng.choice(texts), voice=rng.choice(voices), mode=rng.choice(modes)
+        )
+        for _ in range(count)
+    ]
+
+
+# -----------------------------------------------------------------------------
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--uri", default="stdio://", help="stdio://, unix://<path> or tcp://host:port"
+    )
+    parser.add_argument(
+        "--launch",
+        action="store_true",
+        help="Start a server on --uri (unix/tcp) with the server arguments",
+    )
+    parser.add_argument("--clients", type=int, default=1, help="Concurrent clients")
+    parser.add_argument(
+        "--requests", type=int, default=10, help="Measured requests per client"
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=1, help="Unmeasured requests per client first"
+    )
+    parser.add_argument("--text", action="append", help="Text to synthesize")
+    parser.add_argument(
+        "--text-file",
+        action="append",
+        default=[],
+        help="File with one text per line",
+    )
+    parser.add_argument(
+        "--voice",
+        action="append",
+        help="Voice to use (repeat for a mix; repeat a voice to weight it)",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=(*MODES, "mixed"),
+        default="synthesize",
+        help="Single synthesize events, text streams, or a random mix",
+    )
+    parser.add_argument(
+        "--words-per-chunk",
+        type=int,
+        default=3,
+        help="Words per synthesize-chunk in stream mode",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument(
+        "--timeout", type=float, default=120, help="Seconds to wait for an event"
+    )
+    parser.add_argument("--json", help="Write summary and per-request results here")
+    parser.add_argument("--debug", action="store_true", help="Log DEBUG messages")
+    parser.add_argument(
+        "server_args", nargs=argparse.REMAINDER, help="-- then server arguments"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    server_args = args.server_args
+    if server_args and server_args[0] == "--":
+        server_args = server_args[1:]
+
+    if args.launch and args.uri.startswith("stdio://"):
+        parser.error("--launch needs a unix:// or tcp:// --uri")
+
+    rng = random.Random(args.seed)
+    texts = load_texts(args.text, args.text_file)
+    voices: List[Optional[str]] = list(args.voice or [None])
+    modes = MODES if args.mode == "mixed" else (args.mode,)
+
+    server_proc: Optional[Process] = None
+    if args.launch:
+        server_proc = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "wyoming_piper", "--uri", args.uri, *server_args
+        )
+        await wait_for_server(args.uri, args.timeout)
+
+    try:
+        clients = [
+            run_client(
+                make_client(args.uri, server_args, read_timeout=args.timeout),
+                client_index,
+                make_requests(texts, voices, modes, args.warmup + args.requests, rng),
+                num_warmup=args.warmup,
+                words_per_chunk=args.words_per_chunk,
+            )
+            for client_index in range(args.clients)
+        ]
+
+        client_results = await asyncio.gather(*clients)
+    finally:
+        if server_proc is not None:
+            server_proc.terminate()
+            await server_proc.wait()
+
+    results = [result for results in client_results for result in results]
+    summary = summarize(results)
+    print(format_summary(summary))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as json_file:
+            json.dump(
+                {
+                    "config": {
+                        key: value
+                        for key, value in vars(args).items()
+                        if key not in ("json", "debug")
+                    },
+                    "summary": summary,
+                    "results": [result.to_dict() for result in results],
+                },
+                json_file,
+                indent=2,
+            )
+
+        _LOGGER.info("Wrote %s", Path(args.json).resolve())
+
+
+def run() -> None:
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    try:
+        run()
+    except KeyboardInterrupt:
+        pass
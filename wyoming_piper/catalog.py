@@ -0,0 +1,317 @@
+"""Compact catalog of the Piper voices in ``voices.json``.
+
+``voices.json`` (embedded, plus a downloaded copy with ``--update-voices``) is
+about 230 KB of nested JSON. The catalog keeps only what the server uses, one
+slotted :class:`VoiceRecord` per voice, with an index of the old voice names
+(aliases) and of the voices per language.
+
+The catalog is cached as JSON in ``voices.cache`` in the download directory,
+one array of fields per voice; the records and indexes are rebuilt from it on
+load, so the cache holds plain data only. The cache is used while the source files have the same modification
+time and size as when it was written; if only the modification time changed,
+their SHA-256 hashes are compared before the catalog is rebuilt.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+CACHE_FILE = "voices.cache"
+
+# Bump when VoiceRecord or VoiceCatalog change
+_CACHE_VERSION = 2
+
+# (path, modification time in ns, size)
+SourceStat = Tuple[str, int, int]
+
+
+class VoiceRecord:
+    """One voice from ``voices.json``."""
+
+    __slots__ = ("key", "name", "quality", "language", "speakers", "files", "aliases")
+
+    def __init__(
+        self,
+        key: str,
+        name: str,
+        quality: str,
+        language: str,
+        speakers: Tuple[str, ...] = (),
+        files: Tuple[str, ...] = (),
+        aliases: Tuple[str, ...] = (),
+    ) -> None:
+        self.key = key
+        self.name = name
+        self.quality = quality
+        self.language = language
+        self.speakers = speakers
+        self.files = files
+        self.aliases = aliases
+
+    @staticmethod
+    def from_json(key: str, voice_info: Dict[str, Any]) -> "VoiceRecord":
+        language = voice_info.get("language", {}).get(
+            "code", voice_info.get("espeak", {}).get("voice", key.split("_")[0])
+        )
+        return VoiceRecord(
+            key=voice_info.get("key", key),
+            name=voice_info["name"],
+            quality=voice_info["quality"],
+            language=language,
+            speakers=tuple(voice_info.get("speaker_id_map") or ()),
+            files=tuple(voice_info.get("files", {})),
+            aliases=tuple(voice_info.get("aliases", ())),
+        )
+
+    def to_cache(self) -> List[Any]:
+        """Fields for the JSON catalog cache, in ``__slots__`` order."""
+        return [getattr(self, slot) for slot in self.__slots__]
+
+    @staticmethod
+    def from_cache(values: List[Any]) -> "VoiceRecord":
+        key, name, quality, language, speakers, files, aliases = values
+        return VoiceRecord(
+            key=str(key),
+            name=str(name),
+            quality=str(quality),
+            language=str(language),
+            speakers=tuple(map(str, speakers)),
+            files=tuple(map(str, files)),
+            aliases=tuple(map(str, aliases)),
+        )
+
+    @property
+    def description(self) -> str:
+        """Human readable description, e.g. ``lessac (medium)``."""
+        name = " ".join(self.name.split("_"))
+        return f"{name} ({self.quality})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, VoiceRecord):
+            return NotImplemented
+
+        return all(
+            getattr(self, slot) == getattr(other, slot) for slot in self.__slots__
+        )
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __repr__(self) -> str:
+        return f"VoiceRecord({self.key!r})"
+
+
+class VoiceCatalog:
+    """Voices by key, with alias and language indexes."""
+
+    def __init__(self, records: Iterable[VoiceRecord] = ()) -> None:
+        self.voices: Dict[str, VoiceRecord] = {}
+
+        # alias -> voice key
+        self.aliases: Dict[str, str] = {}
+
+        # language code (ll_CC) and family (ll) -> voice keys
+        self.by_language: Dict[str, List[str]] = {}
+
+        for record in records:
+            self.add(record)
+
+    def add(self, record: VoiceRecord) -> None:
+        """Add a voice, replacing a voice with the same key."""
+        if record.key in self.voices:
+            self.remove(record.key)
+
+        self.voices[record.key] = record
+        for alias in record.aliases:
+            self.aliases[alias] = record.key
+
+        family = record.language.split("_")[0]
+        for language in dict.fromkeys((record.language, family)):
+            self.by_language.setdefault(language, []).append(record.key)
+
+    def remove(self, key: str) -> None:
+        record = self.voices.pop(key, None)
+        if record is None:
+            return
+
+        for alias in record.aliases:
+            if self.aliases.get(alias) == key:
+                del self.aliases[alias]
+
+        for keys in self.by_language.values():
+            if key in keys:
+                keys.remove(key)
+
+    def resolve(self, name: str) -> str:
+        """Key of a voice or alias, or ``name`` if it's not in the catalog."""
+        if name in self.voices:
+            return name
+
+        return self.aliases.get(name, name)
+
+    def get(self, name: str) -> Optional[VoiceRecord]:
+        """Voice by key or alias."""
+        return self.voices.get(self.resolve(name))
+
+    def languages(self, *languages: str) -> List[VoiceRecord]:
+        """Voices for language codes (``en_US``) or families (``en``)."""
+        keys: Dict[str, None] = {}
+        for language in languages:
+            keys.update(dict.fromkeys(self.by_language.get(language, ())))
+
+        return [self.voices[key] for key in keys]
+
+    def __contains__(self, name: object) -> bool:
+        return (name in self.voices) or (name in self.aliases)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.voices)
+
+    def __len__(self) -> int:
+        return len(self.voices)
+
+
+# -----------------------------------------------------------------------------
+
+
+def parse_voices_json(sources: Sequence[Path]) -> VoiceCatalog:
+    """Catalog of the voices in JSON files; later files override earlier ones.
+
+    The first file must exist; the others are skipped if they can't be read.
+    """
+    voices: Dict[str, Any] = {}
+    for i, source in enumerate(sources):
+        _LOGGER.debug("Loading %s", source)
+        try:
+            with open(source, "r", encoding="utf-8") as voices_file:
+                voices.update(json.load(voices_file))
+        except Exception:
+            if i == 0:
+                raise
+
+            _LOGGER.exception("Failed to load %s", source)
+
+    return VoiceCatalog(
+        VoiceRecord.from_json(key, voice_info) for key, voice_info in voices.items()
+    )
+
+
+def _stat_sources(sources: Sequence[Path]) -> List[SourceStat]:
+    stats: List[SourceStat] = []
+    for source in sources:
+        stat = source.stat()
+        stats.append((str(source), stat.st_mtime_ns, stat.st_size))
+
+    return stats
+
+
+def _hash_file(path: Path) -> str:
+    with open(path, "rb") as source_file:
+        return hashlib.sha256(source_file.read()).hexdigest()
+
+
+def _read_cache(
+    cache_path: Path, stats: List[SourceStat]
+) -> Optional[Tuple[VoiceCatalog, bool]]:
+    """Cached catalog if the sources didn't change, and if it must be rewritten."""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as cache_file:
+            cached = json.load(cache_file)
+
+        if cached["version"] != _CACHE_VERSION:
+            return None
+
+        cached_stats: List[SourceStat] = [
+            (str(path), int(mtime_ns), int(size))
+            for path, mtime_ns, size in cached["sources"]
+        ]
+        cached_hashes: List[str] = [str(hash_hex) for hash_hex in cached["hashes"]]
+        catalog = VoiceCatalog(
+            VoiceRecord.from_cache(values) for values in cached["voices"]
+        )
+    except FileNotFoundError:
+        return None
+    except Exception:  # pylint: disable=broad-exception-caught
+        _LOGGER.warning("Ignoring unreadable voice catalog cache: %s", cache_path)
+        return None
+
+    if [stat[0] for stat in cached_stats] != [stat[0] for stat in stats]:
+        return None
+
+    touched = False
+    for stat, cached_stat, cached_hash in zip(stats, cached_stats, cached_hashes):
+        if stat == cached_stat:
+            continue
+
+        # Same contents with a new modification time (copied, touched, ...)
+        if (stat[2] != cached_stat[2]) or (_hash_file(Path(stat[0])) != cached_hash):
+            return None
+
+        touched = True
+
+    return catalog, touched
+
+
+def _write_cache(
+    cache_path: Path, stats: List[SourceStat], catalog: VoiceCatalog
+) -> None:
+    temp_path = cache_path.with_name(cache_path.name + ".tmp")
+    try:
+        hashes = [_hash_file(Path(stat[0])) for stat in stats]
+        with open(temp_path, "w", encoding="utf-8") as cache_file:
+            json.dump(
+                {
+                    "version": _CACHE_VERSION,
+                    "sources": stats,
+                    "hashes": hashes,
+                    "voices": [record.to_cache() for record in catalog.voices.values()],
+                },
+                cache_file,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+
+        os.replace(temp_path, cache_path)
+    except OSError as err:
+        _LOGGER.debug("Not caching voice catalog in %s: %s", cache_path, err)
+
+
+# cache path -> (source stats, catalog) loaded by this process
+_LOADED: Dict[str, Tuple[List[SourceStat], VoiceCatalog]] = {}
+_LOADED_LOCK = threading.Lock()
+
+
+def load_catalog(sources: Sequence[Path], cache_dir: Path) -> VoiceCatalog:
+    """Catalog of the voices in ``sources``, cached in ``cache_dir``.
+
+    Sources that don't exist are skipped, except the first one. The same
+    catalog object is returned while the sources don't change.
+    """
+    sources = [sources[0]] + [source for source in sources[1:] if source.exists()]
+    stats = _stat_sources(sources)
+    cache_path = cache_dir / CACHE_FILE
+
+    with _LOADED_LOCK:
+        loaded = _LOADED.get(str(cache_path))
+        if (loaded is not None) and (loaded[0] == stats):
+            return loaded[1]
+
+        cached = _read_cache(cache_path, stats)
+        if cached is not None:
+            catalog, touched = cached
+            _LOGGER.debug("Loaded voice catalog from %s", cache_path)
+        else:
+            catalog, touched = parse_voices_json(sources), True
+
+        if touched:
+            _write_cache(cache_path, stats, catalog)
+
+        _LOADED[str(cache_path)] = (stats, catalog)
+
+    return catalog
@@ -0,0 +1,147 @@
+"""The ``info`` event sent in response to ``Describe``.
+
+The Info of the Piper backend lists every voice in the catalog, so serializing
+it takes longer than anything else a client asks for before synthesizing, and
+clients (e.g. Home Assistant) describe the server on every reconnect. The
+event is serialized once, with the same bytes as
+:func:`wyoming.event.async_write_event`, and serialized again only after
+:func:`invalidate_info` (when the voices change).
+
+``--info-language`` and ``--info-voices installed`` make the Info smaller by
+leaving out voices with :func:`filter_voices`.
+
+When voices are added or removed while the server runs, :func:`set_info_voices`
+updates the Info in place, so every connection describes the new voices.
+"""
+
+import json
+import re
+from dataclasses import replace
+from typing import Collection, FrozenSet, List, Optional, Sequence, Tuple
+
+from wyoming import __version__ as wyoming_version
+from wyoming.event import Event
+from wyoming.info import Info, TtsVoice
+
+
+def serialize_event(event: Event) -> bytes:
+    """Event as written by :func:`wyoming.event.async_write_event`."""
+    event_dict = event.to_dict()
+    event_dict["version"] = wyoming_version
+
+    data_dict = event_dict.pop("data", None)
+    data_bytes = b""
+    if data_dict:
+        data_bytes = json.dumps(data_dict, ensure_ascii=False).encode("utf-8")
+        event_dict["data_length"] = len(data_bytes)
+
+    if event.payload:
+        event_dict["payload_length"] = len(event.payload)
+
+    return b"".join(
+        (
+            json.dumps(event_dict, ensure_ascii=False).encode("utf-8"),
+            b"\n",
+            data_bytes,
+            event.payload or b"",
+        )
+    )
+
+
+# (info, serialized info event)
+_INFO_BYTES: Optional[Tuple[Info, bytes]] = None
+
+
+def info_event_bytes(info: Info) -> bytes:
+    """Serialized ``info`` event, cached until :func:`invalidate_info`."""
+    global _INFO_BYTES
+    cached = _INFO_BYTES
+    if (cached is None) or (cached[0] is not info):
+        cached = (info, serialize_event(info.event()))
+        _INFO_BYTES = cached
+
+    return cached[1]
+
+
+# (info, names of its voices)
+_INFO_VOICE_NAMES: Optional[Tuple[Info, FrozenSet[str]]] = None
+
+
+def info_voice_names(info: Info) -> FrozenSet[str]:
+    """Names of the voices in the Info, cached until :func:`invalidate_info`."""
+    global _INFO_VOICE_NAMES
+    cached = _INFO_VOICE_NAMES
+    if (cached is None) or (cached[0] is not info):
+        cached = (
+            info,
+            frozenset(voice.name for program in info.tts for voice in program.voices),
+        )
+        _INFO_VOICE_NAMES = cached
+
+    return cached[1]
+
+
+def invalidate_info() -> None:
+    """Serialize the Info again on the next ``Describe`` (voices changed)."""
+    global _INFO_BYTES, _INFO_VOICE_NAMES
+    _INFO_BYTES = None
+    _INFO_VOICE_NAMES = None
+
+
+def set_info_voices(info: Info, voices: List[TtsVoice]) -> bool:
+    """Replace the voices of the Info's TTS program, returning True if they changed."""
+    program = info.tts[0]
+    if program.voices == voices:
+        return False
+
+    program.voices = voices
+    invalidate_info()
+    return True
+
+
+# -----------------------------------------------------------------------------
+
+
+def _split_language(code: str) -> Tuple[str, str]:
+    """(language, region) of ``en_US``, ``en-US`` or ``en``, lower case."""
+    parts = re.split(r"[-_]", code.lower(), maxsplit=1)
+    return parts[0], (parts[1] if len(parts) > 1 else "")
+
+
+def matches_language(code: str, languages: Sequence[str]) -> bool:
+    """True if a voice language matches a language (``en``) or locale (``en_US``)."""
+    language, region = _split_language(code)
+    for wanted in languages:
+        wanted_language, wanted_region = _split_language(wanted)
+        if (wanted_language == language) and (
+            (not wanted_region) or (wanted_region == region)
+        ):
+            return True
+
+    return False
+
+
+def filter_voices(
+    voices: Sequence[TtsVoice],
+    languages: Sequence[str],
+    keep: Collection[str] = (),
+) -> List[TtsVoice]:
+    """Voices with at least one of the languages, listing only those languages.
+
+    Voices named in ``keep`` (e.g. the default voice) are kept even if none of
+    their languages match.
+    """
+    filtered: List[TtsVoice] = []
+    for voice in voices:
+        voice_languages = [
+            code for code in voice.languages if matches_language(code, languages)
+        ]
+        if voice_languages:
+            if len(voice_languages) < len(voice.languages):
+                voice = replace(voice, languages=voice_languages)
+
+            filtered.append(voice)
+        elif voice.name in keep:
+            filtered.append(voice)
+
+    return filtered
@@ -2,6 +2,7 @@
 
 import json
 import logging
+import os
 import shutil
 from pathlib import Path
 from typing import Any, Dict, Iterable, Set, Tuple, Union
@@ -9,6 +10,9 @@ from urllib.error import URLError
 from urllib.parse import quote, urlsplit, urlunsplit
 from urllib.request import urlopen
 
+from .catalog import VoiceCatalog, load_catalog
+from .voice_files import QUANTIZED_SUFFIX, get_voice_file_index
+
 URL_FORMAT = "https://huggingface.co/rhasspy/piper-voices/resolve/main/{file}"
 
 _DIR = Path(__file__).parent
@@ -28,6 +32,18 @@ def _quote_url(url: str) -> str:
     return urlunsplit(parts)
 
 
+def _update_voices_json(voices_download: Path) -> None:
+    """Download latest voices.json."""
+    try:
+        voices_url = URL_FORMAT.format(file="voices.json")
+        _LOGGER.debug("Downloading %s to %s", voices_url, voices_download)
+        with urlopen(_quote_url(voices_url)) as response:
+            with open(voices_download, "wb") as download_file:
+                shutil.copyfileobj(response, download_file)
+    except Exception:
+        _LOGGER.exception("Failed to update voices list")
+
+
 def get_voices(
     download_dir: Union[str, Path], update_voices: bool = False
 ) -> Dict[str, Any]:
@@ -36,15 +52,7 @@ def get_voices(
     voices_download = download_dir / "voices.json"
 
     if update_voices:
-        # Download latest voices.json
-        try:
-            voices_url = URL_FORMAT.format(file="voices.json")
-            _LOGGER.debug("Downloading %s to %s", voices_url, voices_download)
-            with urlopen(_quote_url(voices_url)) as response:
-                with open(voices_download, "wb") as download_file:
-                    shutil.copyfileobj(response, download_file)
-        except Exception:
-            _LOGGER.exception("Failed to update voices list")
+        _update_voices_json(voices_download)
 
     voices_embedded = _DIR / "voices.json"
     _LOGGER.debug("Loading %s", voices_embedded)
@@ -63,13 +71,31 @@ def get_voices(
     return voices
 
 
+def get_voice_catalog(
+    download_dir: Union[str, Path], update_voices: bool = False
+) -> VoiceCatalog:
+    """Catalog of the voices in the downloaded or embedded JSON file.
+
+    Like :func:`get_voices`, but cached in the download directory.
+    """
+    download_dir = Path(download_dir)
+    voices_download = download_dir / "voices.json"
+
+    if update_voices:
+        _update_voices_json(voices_download)
+
+    # Prefer downloaded file to embedded
+    return load_catalog([_DIR / "voices.json", voices_download], download_dir)
+
+
 def ensure_voice_exists(
     name: str,
     data_dirs: Iterable[Union[str, Path]],
     download_dir: Union[str, Path],
-    voices_info: Dict[str, Any],
+    voices_info: VoiceCatalog,
 ):
-    if name not in voices_info:
+    voice = voices_info.get(name)
+    if voice is None:
         # Try as name or file path to a custom voice.
         #
         # This will raise VoiceNotFoundError if the onnx model or config file
@@ -79,27 +105,28 @@ def ensure_voice_exists(
 
     assert data_dirs, "No data dirs"
 
-    voice_info = voices_info[name]
-    voice_files = voice_info["files"]
+    voice_files = voice.files
     verified_files: Set[str] = set()
     files_to_download: Set[str] = set()
+    voice_file_index = get_voice_file_index()
 
     for data_dir in data_dirs:
-        data_dir = Path(data_dir)
+        dir_files = voice_file_index.files(data_dir)
 
-        for file_path, _file_info in voice_files.items():
+        for file_path in voice_files:
             if file_path in verified_files:
                 # Already verified this file in a different data directory
                 continue
 
-            file_name = Path(file_path).name
+            file_name = file_path.rsplit("/", maxsplit=1)[-1]
             if file_name in _SKIP_FILES:
                 continue
 
-            data_file_path = data_dir / file_name
-            _LOGGER.debug("Checking %s", data_file_path)
-            if (not data_file_path.exists()) or (data_file_path.stat().st_size == 0):
-                _LOGGER.debug("Missing %s", data_file_path)
+            # Empty files are checked again in case they are still downloading
+            if (not dir_files.get(file_name)) and (
+                not voice_file_index.size(data_dir, file_name)
+            ):
+                _LOGGER.debug("Missing %s", os.path.join(data_dir, file_name))
                 files_to_download.add(file_path)
                 continue
 
@@ -163,24 +190,53 @@ def ensure_voice_exists(
         _LOGGER.exception("Unexpected error while downloading files for %s", name)
 
 
-def find_voice(name: str, data_dirs: Iterable[Union[str, Path]]) -> Tuple[Path, Path]:
+def quantized_model_path(onnx_path: Union[str, Path]) -> Path:
+    """Path of the quantized sibling of a voice model."""
+    onnx_path = Path(onnx_path)
+    return onnx_path.with_name(onnx_path.stem + QUANTIZED_SUFFIX)
+
+
+def is_quantized_model(onnx_path: Union[str, Path]) -> bool:
+    """True if the model is a quantized variant, not a voice of its own."""
+    return Path(onnx_path).name.endswith(QUANTIZED_SUFFIX)
+
+
+def find_voice(
+    name: str, data_dirs: Iterable[Union[str, Path]], prefer_quantized: bool = False
+) -> Tuple[Path, Path]:
     """Looks for the files for a voice.
 
+    With prefer_quantized, a quantized model next to the voice is used if it
+    exists (with the voice's config).
+
     Returns: tuple of onnx path, config path
     """
+    voice_file_index = get_voice_file_index()
+    name_dir, _sep, base_name = name.rpartition("/")
     for data_dir in data_dirs:
-        data_dir = Path(data_dir)
-        onnx_path = data_dir / f"{name}.onnx"
-        config_path = data_dir / f"{name}.onnx.json"
+        voice_dir = os.path.join(data_dir, name_dir) if name_dir else data_dir
+        found = voice_file_index.find_voice(voice_dir, base_name, prefer_quantized)
+        if found is not None:
+            if prefer_quantized and is_quantized_model(found[0]):
+                _LOGGER.debug("Using quantized model: %s", found[0])
 
-        if onnx_path.exists() and config_path.exists():
-            return onnx_path, config_path
+            return found
 
     # Try as a custom voice
     onnx_path = Path(name)
     config_path = Path(name + ".json")
 
     if onnx_path.exists() and config_path.exists():
-        return onnx_path, config_path
+        return _maybe_quantized(onnx_path, prefer_quantized), config_path
 
     raise VoiceNotFoundError(name)
+
+
+def _maybe_quantized(onnx_path: Path, prefer_quantized: bool) -> Path:
+    if prefer_quantized:
+        quantized_path = quantized_model_path(onnx_path)
+        if quantized_path.exists():
+            _LOGGER.debug("Using quantized model: %s", quantized_path)
+            return quantized_path
+
+    return onnx_path
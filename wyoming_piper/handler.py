@@ -2,13 +2,30 @@
 
 import argparse
 import asyncio
+import fnmatch
+import io
 import logging
 import math
 import tempfile
+import time
 import wave
-from typing import Any, Dict, Optional
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
-from piper import PiperVoice, SynthesisConfig
 from sentence_stream import SentenceBoundaryDetector
 from wyoming.audio import AudioChunk, AudioStart, AudioStop
 from wyoming.error import Error
@@ -23,55 +40,921 @@ from wyoming.tts import (
     SynthesizeStopped,
 )
 
-from .download import ensure_voice_exists, find_voice
+from . import metrics
+from .catalog import VoiceCatalog
+from .describe import info_event_bytes, info_voice_names
+from .download import VoiceNotFoundError, ensure_voice_exists, find_voice
+from .memory import format_bytes, mapped_file_usage, process_rss, release_memory
+from .profiling import RequestProfile, current_profile, get_profiler
+from .threads import get_thread_budget
+from .trace import (
+    RequestTrace,
+    current_trace,
+    get_tracer,
+    run_in_executor,
+    span,
+    trace_method,
+)
+from .traffic import get_traffic_recorder
+from .usage import UsageStats, get_usage_stats
 
 _LOGGER = logging.getLogger(__name__)
 
-# Keep the most recently used voice loaded
-_VOICE: Optional[PiperVoice] = None
-_VOICE_NAME: Optional[str] = None
+# Synthesized by --preload-voice at startup
+_WARMUP_TEXT = "This is a test."
+
+
+@dataclass
+class LoadedVoice:
+    """A Piper voice in memory."""
+
+    voice: Any  # PiperVoice
+    model_path: Path
+    num_bytes: int = 0  # resident memory added by loading the voice
+    pinned: bool = False  # preloaded with --preload-voice, kept loaded
+    predicted: bool = False  # likely to be used soon (--predictive-preload)
+    files_stamp: Tuple[int, ...] = ()  # model and config mtime and size at load
+
+
+# Preloaded and predicted voices, and the most recently used voice
+# (voice name -> voice)
+_VOICES: Dict[str, LoadedVoice] = {}
+
+# Set when a request may change the predicted voices (created on the event
+# loop by voice_predictor)
+_PREDICTOR_WAKE: Optional[asyncio.Event] = None
 _VOICE_LOCK = asyncio.Lock()
 
 # OmniVoice backend model (loaded once, kept in memory) and its reference voices
 _OMNIVOICE: Optional[Any] = None
 _OMNIVOICE_VOICES: Dict[str, Any] = {}  # voice name -> OmniVoiceRef
 
+# One slot per OmniVoice ONNX session (see --omnivoice-sessions), created on
+# the event loop by _omnivoice_slots
+_OMNIVOICE_SLOTS: Optional[asyncio.Semaphore] = None
+_OMNIVOICE_LOAD_LOCK: Optional[asyncio.Lock] = None
+
+# Set by request_voice_reload to wake voice_reloader, running in this loop
+# (both created by voice_reloader)
+_RELOAD_WAKE: Optional[asyncio.Event] = None
+_RELOAD_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+# For --idle-unload-seconds
+_ACTIVE_REQUESTS = 0
+_LAST_ACTIVITY = time.monotonic()
+_IDLE_UNLOADED = False  # models were unloaded since the last voice load
+
+# Models loaded in the background at startup (see start_model_loading)
+_MODELS_READY: Optional["asyncio.Task[None]"] = None
+_LOAD_STAGE: Optional[str] = None
+_LOAD_START = 0.0
+
 
 def get_omnivoice_voices() -> Dict[str, Any]:
     """Return the loaded OmniVoice reference voices (name -> OmniVoiceRef)."""
     return _OMNIVOICE_VOICES
 
 
+def load_omnivoice_voices(cli_args: argparse.Namespace) -> None:
+    """Find the OmniVoice reference voices in ``--omnivoice-ref-dir``."""
+    global _OMNIVOICE_VOICES
+
+    if not cli_args.omnivoice_ref_dir:
+        return
+
+    from .omnivoice import scan_ref_dir
+
+    _OMNIVOICE_VOICES = {v.name: v for v in scan_ref_dir(cli_args.omnivoice_ref_dir)}
+    _LOGGER.info(
+        "Loaded %d OmniVoice reference voice(s) from %s",
+        len(_OMNIVOICE_VOICES),
+        cli_args.omnivoice_ref_dir,
+    )
+
+
+def reload_omnivoice_voices(cli_args: argparse.Namespace) -> List[str]:
+    """Find the reference voices again and return the names of changed voices.
+
+    The voice-clone prompts of changed and removed voices are dropped, so they
+    are encoded again from the new recording on next use.
+    """
+    global _OMNIVOICE_VOICES
+
+    if not cli_args.omnivoice_ref_dir:
+        return []
+
+    from .omnivoice import scan_ref_dir
+
+    old_voices = _OMNIVOICE_VOICES
+    new_voices = {v.name: v for v in scan_ref_dir(cli_args.omnivoice_ref_dir)}
+    changed = sorted(
+        name
+        for name in old_voices.keys() | new_voices.keys()
+        if old_voices.get(name) != new_voices.get(name)
+    )
+    if not changed:
+        return []
+
+    model = _OMNIVOICE
+    for name in changed:
+        old_ref = old_voices.get(name)
+        if (model is not None) and (old_ref is not None) and old_ref.ref_audio:
+            model.forget_prompt(old_ref.ref_audio)
+
+    _OMNIVOICE_VOICES = new_voices
+    _LOGGER.info("OmniVoice voices changed: %s", ", ".join(changed))
+    return changed
+
+
 def load_omnivoice(cli_args: argparse.Namespace) -> None:
     """Load the shared OmniVoice model once (no-op if already loaded).
 
-    Called at startup so the (heavy) model is ready before the first request;
-    handlers share this single instance, serialized by ``_VOICE_LOCK``.
+    Called in the background at startup so the (heavy) model is ready before
+    the first request. Handlers share this single instance;
+    :func:`_omnivoice_slots` admits one request per ONNX session in its pool.
+    Runs in an executor thread, so it must not create asyncio objects.
     """
-    global _OMNIVOICE, _OMNIVOICE_VOICES
+    global _OMNIVOICE
 
     if _OMNIVOICE is not None:
         return
 
-    from .omnivoice import OmniVoiceModel, ensure_omnivoice_downloaded, scan_ref_dir
-
-    if cli_args.omnivoice_ref_dir:
-        _OMNIVOICE_VOICES = {
-            v.name: v for v in scan_ref_dir(cli_args.omnivoice_ref_dir)
-        }
+    from .omnivoice import OmniVoiceModel, ensure_omnivoice_downloaded
 
-    _LOGGER.info("Loading OmniVoice model")
+    load_start = time.perf_counter()
+    report_load_stage("checking OmniVoice model files")
     onnx_path = ensure_omnivoice_downloaded(
         local_files_only=cli_args.local_files_only,
         onnx_repo=cli_args.omnivoice_onnx_repo,
         data_dirs=cli_args.data_dir,
     )
+    report_load_stage("loading OmniVoice model")
     _OMNIVOICE = OmniVoiceModel(
         onnx_path,
         num_step=cli_args.omnivoice_steps,
         default_language=cli_args.omnivoice_language,
         local_files_only=cli_args.local_files_only,
+        num_sessions=cli_args.omnivoice_sessions,
+        thread_budget=get_thread_budget(),
+        use_mmap=cli_args.mmap_models,
+    )
+    metrics.VOICE_LOADS.inc(backend="omnivoice", voice="model")
+    metrics.VOICE_LOAD_SECONDS.observe(
+        time.perf_counter() - load_start, backend="omnivoice", voice="model"
+    )
+    if cli_args.mmap_models:
+        _log_mapped_models()
+
+    if (cli_args.omnivoice_decode_window > 0) and (not _OMNIVOICE.supports_streaming):
+        _LOGGER.warning(
+            "Installed omnivoice version can't stream audio; ignoring "
+            "--omnivoice-decode-window and decoding whole sentences"
+        )
+
+
+def _omnivoice_slots(cli_args: argparse.Namespace) -> asyncio.Semaphore:
+    """One slot per OmniVoice ONNX session (only called on the event loop).
+
+    Sized from ``--omnivoice-sessions`` like the session pool, and kept when
+    the model is reloaded so requests holding a slot release the same one.
+    """
+    global _OMNIVOICE_SLOTS
+
+    if _OMNIVOICE_SLOTS is None:
+        _OMNIVOICE_SLOTS = asyncio.Semaphore(max(1, cli_args.omnivoice_sessions))
+
+    return _OMNIVOICE_SLOTS
+
+
+def report_load_stage(stage: str) -> None:
+    """Log (and show in the web UI status) the current model loading step."""
+    global _LOAD_STAGE
+
+    _LOAD_STAGE = stage
+    _LOGGER.info("Loading: %s", stage)
+
+
+async def _load_models(load: Callable[[], None], progress_interval: float) -> None:
+    global _LOAD_STAGE, _LAST_ACTIVITY
+
+    load_future = asyncio.get_running_loop().run_in_executor(None, load)
+    try:
+        while True:
+            try:
+                await asyncio.wait_for(asyncio.shield(load_future), progress_interval)
+                break
+            except asyncio.TimeoutError:
+                _LOGGER.info(
+                    "Still loading: %s (%.0fs)",
+                    _LOAD_STAGE,
+                    time.monotonic() - _LOAD_START,
+                )
+    except Exception:  # pylint: disable=broad-exception-caught
+        # Requests load what they need on demand, and report the error
+        _LOGGER.exception("Failed to load models in the background")
+    else:
+        _LOGGER.info("Models loaded in %.2fs", time.monotonic() - _LOAD_START)
+    finally:
+        _LOAD_STAGE = None
+
+        # Don't count startup as idle time
+        _LAST_ACTIVITY = time.monotonic()
+
+
+def start_model_loading(
+    load: Callable[[], None], progress_interval: float = 10
+) -> "asyncio.Task[None]":
+    """Run ``load`` in a thread while the server starts answering events.
+
+    Synthesis waits for it in :func:`wait_until_ready`. Progress is logged
+    every ``progress_interval`` seconds.
+    """
+    global _MODELS_READY, _LOAD_START
+
+    _LOAD_START = time.monotonic()
+    _MODELS_READY = asyncio.create_task(_load_models(load, progress_interval))
+    return _MODELS_READY
+
+
+async def wait_until_ready(timeout: Optional[float] = None) -> None:
+    """Wait for models loading in the background, at most ``timeout`` seconds."""
+    if (_MODELS_READY is None) or _MODELS_READY.done():
+        return
+
+    with span("model_wait"):
+        try:
+            await asyncio.wait_for(asyncio.shield(_MODELS_READY), timeout)
+        except asyncio.TimeoutError as err:
+            raise TimeoutError(f"Models are still loading ({_LOAD_STAGE})") from err
+
+
+def get_load_status() -> Dict[str, Any]:
+    """Background model loading for the web UI status."""
+    loading = (_MODELS_READY is not None) and (not _MODELS_READY.done())
+    return {
+        "ready": not loading,
+        "stage": _LOAD_STAGE if loading else None,
+        "seconds": (time.monotonic() - _LOAD_START) if loading else None,
+    }
+
+
+def _log_mapped_models() -> None:
+    """Log resident memory of the memory-mapped model files."""
+    for path, usage in mapped_file_usage().items():
+        _LOGGER.info(
+            "Mapped %s: rss=%.1f MiB, shared=%.1f MiB, private=%.1f MiB",
+            path,
+            usage.rss / (1024 * 1024),
+            usage.shared / (1024 * 1024),
+            usage.private / (1024 * 1024),
+        )
+
+
+def get_memory_usage() -> Dict[str, int]:
+    """Approximate bytes held by each loaded model and cache.
+
+    Piper voices are measured by the growth of resident memory while loading,
+    OmniVoice by its tensor sizes and the growth while creating its sessions.
+    """
+    usage: Dict[str, int] = {
+        f"piper:{voice_name}": loaded.num_bytes
+        # Copy: voices may be loaded in a worker thread
+        for voice_name, loaded in list(_VOICES.items())
+    }
+
+    if _OMNIVOICE is not None:
+        for part, num_bytes in _OMNIVOICE.memory_usage().items():
+            usage[f"omnivoice:{part}"] = num_bytes
+
+    return usage
+
+
+def get_memory_status(cli_args: argparse.Namespace) -> Dict[str, Any]:
+    """Memory report for the web UI status."""
+    soft_limit = cli_args.memory_soft_limit
+    return {
+        "rss": process_rss(),
+        "soft_limit": int(soft_limit * 1024 * 1024) if soft_limit else None,
+        "components": get_memory_usage(),
+        "mapped": {
+            path: {
+                "rss": usage.rss,
+                "pss": usage.pss,
+                "shared": usage.shared,
+                "private": usage.private,
+            }
+            for path, usage in mapped_file_usage().items()
+        },
+    }
+
+
+def _eviction_tier(loaded: LoadedVoice) -> int:
+    """Voices in lower tiers are evicted first when memory is short."""
+    if loaded.pinned:
+        return 2
+
+    return 1 if loaded.predicted else 0
+
+
+async def enforce_memory_limit(limit_bytes: int) -> List[str]:
+    """Free caches, then the loaded Piper voices, while over ``limit_bytes``.
+
+    Voices kept loaded on purpose go last: predicted voices, then voices
+    preloaded with ``--preload-voice``, each only if memory is still over the
+    limit. Returns what was evicted. The OmniVoice model itself is never
+    unloaded.
+    """
+    rss = process_rss()
+    if rss <= limit_bytes:
+        return []
+
+    evicted: List[str] = []
+    if (_OMNIVOICE is not None) and _OMNIVOICE.clear_prompt_cache():
+        evicted.append("omnivoice prompt cache")
+        release_memory()
+
+    if (process_rss() > limit_bytes) and _VOICES:
+        async with _VOICE_LOCK:
+            # Reloaded on the next request for them
+            for tier in range(3):
+                tier_names = [
+                    voice_name
+                    for voice_name, loaded in _VOICES.items()
+                    if _eviction_tier(loaded) == tier
+                ]
+                if not tier_names:
+                    continue
+
+                for voice_name in tier_names:
+                    del _VOICES[voice_name]
+                    evicted.append(f"piper voice {voice_name}")
+
+                release_memory()
+                if process_rss() <= limit_bytes:
+                    break
+
+    if evicted:
+        _LOGGER.warning(
+            "Memory over soft limit (%s > %s), evicted %s: rss=%s",
+            format_bytes(rss),
+            format_bytes(limit_bytes),
+            ", ".join(evicted),
+            format_bytes(process_rss()),
+        )
+    else:
+        _LOGGER.debug(
+            "Memory over soft limit (%s > %s), nothing to evict",
+            format_bytes(rss),
+            format_bytes(limit_bytes),
+        )
+
+    return evicted
+
+
+def _log_memory_usage() -> None:
+    _LOGGER.info(
+        "Memory: rss=%s%s",
+        format_bytes(process_rss()),
+        "".join(
+            f", {name}={format_bytes(num_bytes)}"
+            for name, num_bytes in get_memory_usage().items()
+        ),
+    )
+
+
+async def memory_monitor(
+    soft_limit_bytes: Optional[int] = None,
+    log_interval: float = 0,
+    check_interval: float = 5,
+) -> None:
+    """Log memory usage and enforce the soft limit until cancelled."""
+    intervals = [log_interval] if log_interval > 0 else []
+    if soft_limit_bytes:
+        intervals.append(check_interval)
+
+    if not intervals:
+        return
+
+    interval = min(intervals)
+    next_log = time.monotonic() + log_interval
+    while True:
+        await asyncio.sleep(interval)
+        if soft_limit_bytes:
+            await enforce_memory_limit(soft_limit_bytes)
+
+        if (log_interval > 0) and (time.monotonic() >= next_log):
+            _log_memory_usage()
+            next_log += log_interval
+
+
+def _request_started() -> None:
+    global _ACTIVE_REQUESTS, _LAST_ACTIVITY
+
+    _ACTIVE_REQUESTS += 1
+    _LAST_ACTIVITY = time.monotonic()
+
+
+def _request_finished() -> None:
+    global _ACTIVE_REQUESTS, _LAST_ACTIVITY
+
+    _ACTIVE_REQUESTS = max(0, _ACTIVE_REQUESTS - 1)
+    _LAST_ACTIVITY = time.monotonic()
+
+
+def unload_idle_models() -> List[str]:
+    """Unload the Piper voices and OmniVoice model if no request is running.
+
+    Voices that are likely to be used soon (``--predictive-preload``) stay.
+
+    Their onnxruntime sessions, and with them the sessions' memory arenas, are
+    released. Returns what was unloaded.
+    """
+    global _OMNIVOICE, _IDLE_UNLOADED
+
+    if _ACTIVE_REQUESTS > 0:
+        return []
+
+    rss_before = process_rss()
+    unloaded: List[str] = []
+    for voice_name, loaded in list(_VOICES.items()):
+        if not loaded.predicted:
+            unloaded.append(f"piper voice {voice_name}")
+            del _VOICES[voice_name]
+
+    if _OMNIVOICE is not None:
+        unloaded.append("omnivoice model")
+        _OMNIVOICE = None
+
+    if unloaded:
+        release_memory()
+        _IDLE_UNLOADED = True
+        _LOGGER.info(
+            "Idle, unloaded %s: rss=%s (was %s)",
+            ", ".join(unloaded),
+            format_bytes(process_rss()),
+            format_bytes(rss_before),
+        )
+
+    return unloaded
+
+
+async def idle_unloader(idle_seconds: float) -> None:
+    """Unload models after ``idle_seconds`` without requests, until cancelled.
+
+    They are loaded again by the next request that needs them.
+    """
+    while True:
+        delay = idle_seconds
+        if _ACTIVE_REQUESTS == 0:
+            idle_for = time.monotonic() - _LAST_ACTIVITY
+            if idle_for >= idle_seconds:
+                unload_idle_models()
+            else:
+                delay = idle_seconds - idle_for
+
+        await asyncio.sleep(delay)
+
+
+async def ensure_omnivoice_loaded(cli_args: argparse.Namespace) -> None:
+    """Load the OmniVoice model again if it was unloaded while idle.
+
+    Requests still holding a slot of :func:`_omnivoice_slots` keep it; the
+    reloaded model shares the same slots.
+    """
+    global _IDLE_UNLOADED, _OMNIVOICE_LOAD_LOCK
+
+    if _OMNIVOICE is not None:
+        return
+
+    if _OMNIVOICE_LOAD_LOCK is None:
+        # Created on the event loop
+        _OMNIVOICE_LOAD_LOCK = asyncio.Lock()
+
+    async with _OMNIVOICE_LOAD_LOCK:
+        if _OMNIVOICE is not None:
+            # Loaded by another request while waiting
+            return
+
+        load_start = time.perf_counter()
+        await asyncio.get_running_loop().run_in_executor(None, load_omnivoice, cli_args)
+        _LOGGER.info(
+            "Reloaded OmniVoice model in %.2fs", time.perf_counter() - load_start
+        )
+        _IDLE_UNLOADED = False
+
+
+def load_voice(
+    voice_name: str,
+    cli_args: argparse.Namespace,
+    voices_info: VoiceCatalog,
+    pinned: bool = False,
+    predicted: bool = False,
+) -> LoadedVoice:
+    """Load a Piper voice, downloading it if needed.
+
+    Other voices that are neither preloaded nor predicted are released, so
+    only those and the most recently used voice stay in memory.
+    """
+    global _IDLE_UNLOADED
+
+    # Piper backend (onnxruntime) is only imported when it is used
+    from .voice_loader import load_piper_voice, load_profile
+
+    _LOGGER.debug("Loading voice: %s", voice_name)
+    load_start = time.perf_counter()
+    with span("ensure_voice"):
+        # May download the voice
+        ensure_voice_exists(
+            voice_name, cli_args.data_dir, cli_args.download_dir, voices_info
+        )
+
+    for loaded_name, other in list(_VOICES.items()):
+        if not (other.pinned or other.predicted):
+            del _VOICES[loaded_name]
+
+    rss_before = process_rss()
+    with span("voice_load"):
+        model_path, config_path = find_voice(
+            voice_name, cli_args.data_dir, prefer_quantized=cli_args.prefer_quantized
+        )
+        voice = load_piper_voice(
+            model_path,
+            config_path,
+            use_cuda=cli_args.use_cuda,
+            profile=load_profile(cli_args.download_dir, voice_name),
+            use_cache=(not cli_args.no_optimized_model_cache),
+            use_mmap=cli_args.mmap_models,
+        )
+
+    if get_tracer() is not None:
+        # Split synthesis into espeak and ONNX time
+        trace_method(voice, "phonemize", "phonemize")
+        trace_method(voice, "phoneme_ids_to_audio", "inference")
+
+    loaded = LoadedVoice(
+        voice,
+        model_path,
+        num_bytes=max(0, process_rss() - rss_before),
+        pinned=pinned,
+        predicted=predicted,
+        files_stamp=_files_stamp(model_path, config_path),
+    )
+    _VOICES[voice_name] = loaded
+    usage_stats = get_usage_stats()
+    if usage_stats is not None:
+        usage_stats.set_size(voice_name, loaded.num_bytes)
+
+    metrics.VOICE_LOADS.inc(backend="piper", voice=voice_name)
+    metrics.VOICE_LOAD_SECONDS.observe(
+        time.perf_counter() - load_start, backend="piper", voice=voice_name
     )
+    if _IDLE_UNLOADED:
+        _LOGGER.info(
+            "Reloaded voice %s in %.2fs", voice_name, time.perf_counter() - load_start
+        )
+        _IDLE_UNLOADED = False
+
+    if cli_args.mmap_models:
+        _log_mapped_models()
+
+    return loaded
+
+
+def _files_stamp(model_path: Path, config_path: Path) -> Tuple[int, ...]:
+    """Modification times and sizes of a voice's model and config."""
+    model_stat = model_path.stat()
+    config_stat = config_path.stat()
+    return (
+        model_stat.st_mtime_ns,
+        model_stat.st_size,
+        config_stat.st_mtime_ns,
+        config_stat.st_size,
+    )
+
+
+def _voice_files_changed(
+    voice_name: str, loaded: LoadedVoice, cli_args: argparse.Namespace
+) -> bool:
+    """True if a loaded voice's files were replaced or removed since loading."""
+    try:
+        model_path, config_path = find_voice(
+            voice_name, cli_args.data_dir, prefer_quantized=cli_args.prefer_quantized
+        )
+        return (model_path != loaded.model_path) or (
+            _files_stamp(model_path, config_path) != loaded.files_stamp
+        )
+    except (VoiceNotFoundError, OSError):
+        return True
+
+
+async def reload_changed_voices(
+    cli_args: argparse.Namespace, voices_info: VoiceCatalog
+) -> List[str]:
+    """Unload the Piper voices whose files changed since they were loaded.
+
+    Voices preloaded with ``--preload-voice`` are loaded again right away; the
+    others are loaded by the next request that needs them. Voices whose files
+    didn't change are left alone. Returns the names of the changed voices.
+    """
+    changed: List[str] = []
+    async with _VOICE_LOCK:
+        for voice_name, loaded in list(_VOICES.items()):
+            if not _voice_files_changed(voice_name, loaded, cli_args):
+                continue
+
+            del _VOICES[voice_name]
+            changed.append(voice_name)
+            if not loaded.pinned:
+                continue
+
+            try:
+                await asyncio.get_running_loop().run_in_executor(
+                    None,
+                    partial(load_voice, voice_name, cli_args, voices_info, pinned=True),
+                )
+            except Exception:  # pylint: disable=broad-exception-caught
+                _LOGGER.exception("Failed to load changed voice %s", voice_name)
+
+    if changed:
+        release_memory()
+        _LOGGER.info("Voice files changed: %s", ", ".join(changed))
+
+    return changed
+
+
+def _omnivoice_voice_kwargs(
+    voice_name: Optional[str], language: Optional[str]
+) -> Dict[str, Any]:
+    """Map a requested voice to OmniVoice synthesis arguments.
+
+    A known ``voice_name`` selects a cloning reference voice or a
+    voice-design (instruct) voice, using its own language; otherwise the
+    built-in OmniVoice speaker is used with the request/default ``language``.
+    """
+    from .omnivoice import DEFAULT_VOICE_NAME
+
+    ref = None
+    if voice_name and voice_name != DEFAULT_VOICE_NAME:
+        ref = _OMNIVOICE_VOICES.get(voice_name)
+        if ref is None:
+            _LOGGER.debug(
+                "Unknown OmniVoice voice %r; using built-in speaker", voice_name
+            )
+
+    if ref is not None:
+        return {
+            "ref_audio": ref.ref_audio,
+            "ref_text": ref.ref_text,
+            "instruct": ref.instruct,
+            "language": ref.language,
+        }
+
+    # Built-in speaker (voice "default", empty, or unknown).
+    return {"language": language}
+
+
+def match_voice_names(patterns: List[str], voice_names: Iterable[str]) -> List[str]:
+    """Voice names matching ``--preload-voice`` patterns, in order.
+
+    A pattern without wildcards is used as is, even if it isn't a known voice.
+    """
+    voice_names = list(voice_names)
+    matched: List[str] = []
+    for pattern in patterns:
+        if any(c in pattern for c in "*?["):
+            names = fnmatch.filter(voice_names, pattern)
+        else:
+            names = [pattern]
+
+        matched.extend(name for name in names if name not in matched)
+
+    return matched
+
+
+def preload_piper_voices(
+    voice_names: List[str],
+    cli_args: argparse.Namespace,
+    voices_info: VoiceCatalog,
+) -> None:
+    """Load Piper voices to keep in memory and synthesize a sentence with each.
+
+    The first synthesis allocates the onnxruntime arena, selects kernels and
+    initializes espeak, so the first real request doesn't wait for it.
+    """
+    for voice_name in voice_names:
+        # Resolve alias
+        voice_name = voices_info.resolve(voice_name)
+        report_load_stage(f"preloading voice {voice_name}")
+        load_start = time.perf_counter()
+        try:
+            loaded = _VOICES.get(voice_name)
+            if loaded is None:
+                loaded = load_voice(voice_name, cli_args, voices_info, pinned=True)
+            else:
+                loaded.pinned = True
+
+            warmup_start = time.perf_counter()
+            for _audio_chunk in loaded.voice.synthesize(_WARMUP_TEXT):
+                pass
+        except Exception:  # pylint: disable=broad-exception-caught
+            _LOGGER.exception("Failed to preload voice %s", voice_name)
+            continue
+
+        _LOGGER.info(
+            "Preloaded voice %s: load=%.2fs, warmup=%.2fs",
+            voice_name,
+            warmup_start - load_start,
+            time.perf_counter() - warmup_start,
+        )
+
+
+def warmup_omnivoice(voice_names: List[str]) -> None:
+    """Synthesize a sentence with each OmniVoice voice (``default``: built-in).
+
+    Also encodes and caches the reference audio of cloning voices.
+    """
+    assert _OMNIVOICE is not None, "OmniVoice model was not loaded"
+    for voice_name in voice_names:
+        report_load_stage(f"warming up OmniVoice voice {voice_name}")
+        warmup_start = time.perf_counter()
+        with wave.open(io.BytesIO(), "wb") as wav_writer:
+            _OMNIVOICE.synthesize_wav(
+                _WARMUP_TEXT, wav_writer, **_omnivoice_voice_kwargs(voice_name, None)
+            )
+
+        _LOGGER.info(
+            "Warmed up OmniVoice voice %s in %.2fs",
+            voice_name,
+            time.perf_counter() - warmup_start,
+        )
+
+
+def _estimate_voice_bytes(
+    voice_name: str, usage_stats: UsageStats, cli_args: argparse.Namespace
+) -> int:
+    """Resident size of a voice when it was last loaded, or its model size."""
+    loaded = _VOICES.get(voice_name)
+    if (loaded is not None) and (loaded.num_bytes > 0):
+        return loaded.num_bytes
+
+    voice_stats = usage_stats.voices.get(voice_name)
+    if (voice_stats is not None) and (voice_stats.num_bytes > 0):
+        return voice_stats.num_bytes
+
+    try:
+        model_path, _config_path = find_voice(
+            voice_name, cli_args.data_dir, prefer_quantized=cli_args.prefer_quantized
+        )
+    except VoiceNotFoundError:
+        # Not downloaded: not worth a download ahead of time
+        return -1
+
+    return model_path.stat().st_size
+
+
+async def preload_predicted_voices(
+    usage_stats: UsageStats,
+    cli_args: argparse.Namespace,
+    voices_info: VoiceCatalog,
+    budget_bytes: int,
+) -> List[str]:
+    """Load the voices likely to be used soon that fit in ``budget_bytes``.
+
+    Returns the voices that were loaded.
+    """
+    chosen: List[str] = []
+    total_bytes = 0
+    for voice_name, _score in usage_stats.likely_voices():
+        num_bytes = _estimate_voice_bytes(voice_name, usage_stats, cli_args)
+        if (num_bytes < 0) or (total_bytes + num_bytes > budget_bytes):
+            continue
+
+        chosen.append(voice_name)
+        total_bytes += num_bytes
+
+    for voice_name, loaded in list(_VOICES.items()):
+        loaded.predicted = voice_name in chosen
+
+    soft_limit = cli_args.memory_soft_limit
+    loaded_names: List[str] = []
+    for voice_name in chosen:
+        if voice_name in _VOICES:
+            continue
+
+        if soft_limit and (
+            process_rss() + _estimate_voice_bytes(voice_name, usage_stats, cli_args)
+            > soft_limit * 1024 * 1024
+        ):
+            _LOGGER.debug("Not preloading voice %s: memory soft limit", voice_name)
+            break
+
+        async with _VOICE_LOCK:
+            if voice_name in _VOICES:
+                _VOICES[voice_name].predicted = True
+                continue
+
+            load_start = time.perf_counter()
+            await asyncio.get_running_loop().run_in_executor(
+                None,
+                partial(load_voice, voice_name, cli_args, voices_info, predicted=True),
+            )
+
+        _LOGGER.info(
+            "Preloaded likely voice %s in %.2fs",
+            voice_name,
+            time.perf_counter() - load_start,
+        )
+        loaded_names.append(voice_name)
+
+    return loaded_names
+
+
+async def voice_predictor(
+    usage_stats: UsageStats,
+    cli_args: argparse.Namespace,
+    voices_info: VoiceCatalog,
+    budget_bytes: int,
+    interval: float = 60,
+) -> None:
+    """Keep likely voices loaded, until cancelled.
+
+    Runs at startup, every ``interval`` seconds and after each request, and
+    saves the usage statistics.
+    """
+    global _PREDICTOR_WAKE
+
+    wake = _PREDICTOR_WAKE = asyncio.Event()
+    try:
+        while True:
+            wake.clear()
+            await wait_until_ready()
+            try:
+                await preload_predicted_voices(
+                    usage_stats, cli_args, voices_info, budget_bytes
+                )
+            except Exception:  # pylint: disable=broad-exception-caught
+                _LOGGER.exception("Failed to preload likely voices")
+
+            usage_stats.save()
+
+            try:
+                await asyncio.wait_for(wake.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        _PREDICTOR_WAKE = None
+
+
+def _wake_voice_predictor() -> None:
+    """Have :func:`voice_predictor` update the predicted voices now."""
+    if _PREDICTOR_WAKE is not None:
+        _PREDICTOR_WAKE.set()
+
+
+def request_voice_reload() -> None:
+    """Have :func:`voice_reloader` look for changed voices now (thread-safe)."""
+    loop, wake = _RELOAD_LOOP, _RELOAD_WAKE
+    if (loop is None) or (wake is None):
+        return
+
+    try:
+        loop.call_soon_threadsafe(wake.set)
+    except RuntimeError:
+        # Loop was closed while shutting down
+        pass
+
+
+async def voice_reloader(
+    reload: Callable[[bool], Awaitable[None]], interval: float = 0
+) -> None:
+    """Reload voices when requested or every ``interval`` seconds, until cancelled.
+
+    ``reload`` is called with True after :func:`request_voice_reload` (SIGHUP
+    or a change in the web UI), and with False when the interval is up. With
+    an interval of 0, voices are only reloaded when requested.
+    """
+    global _RELOAD_LOOP, _RELOAD_WAKE
+
+    wake = _RELOAD_WAKE = asyncio.Event()
+    _RELOAD_LOOP = asyncio.get_running_loop()
+    try:
+        while True:
+            try:
+                await asyncio.wait_for(
+                    wake.wait(), interval if (interval > 0) else None
+                )
+                requested = True
+            except asyncio.TimeoutError:
+                requested = False
+
+            wake.clear()
+            await wait_until_ready()
+            try:
+                await reload(requested)
+            except Exception:  # pylint: disable=broad-exception-caught
+                _LOGGER.exception("Failed to reload voices")
+    finally:
+        _RELOAD_LOOP = _RELOAD_WAKE = None
 
 
 def _silence_bytes(wav_writer: wave.Wave_write, seconds: float) -> bytes:
@@ -81,27 +964,60 @@ def _silence_bytes(wav_writer: wave.Wave_write, seconds: float) -> bytes:
     return bytes(num_frames * bytes_per_frame)
 
 
+def _observe_synthesis(
+    backend: str, voice: str, seconds: float, audio_seconds: float
+) -> None:
+    """Record synthesis time and real-time factor of one sentence."""
+    metrics.SYNTHESIS_SECONDS.observe(seconds, backend=backend, voice=voice)
+    if audio_seconds > 0:
+        metrics.REAL_TIME_FACTOR.observe(
+            seconds / audio_seconds, backend=backend, voice=voice
+        )
+
+
 class PiperEventHandler(AsyncEventHandler):
     def __init__(
         self,
         wyoming_info: Info,
         cli_args: argparse.Namespace,
-        voices_info: Dict[str, Any],
+        voices_info: VoiceCatalog,
         *args,
         **kwargs,
     ) -> None:
         super().__init__(*args, **kwargs)
 
         self.cli_args = cli_args
-        self.wyoming_info_event = wyoming_info.event()
+        self.wyoming_info = wyoming_info
         self.voices_info = voices_info
         self.is_streaming: Optional[bool] = None
         self.sbd = SentenceBoundaryDetector()
         self._synthesize: Optional[Synthesize] = None
 
+        self._recorder = get_traffic_recorder()
+        self._connection_id: Optional[str] = None
+        if self._recorder is not None:
+            self._connection_id = self._recorder.connect()
+
+        # Request being timed (see _start_request)
+        self._request_start: Optional[float] = None
+        self._request_voice = ""
+        self._metric_voice = ""
+        self._first_audio_sent = False
+        self._tracer = get_tracer()
+        self._trace: Optional[RequestTrace] = None
+        self._profiler = get_profiler()
+        self._profile: Optional[RequestProfile] = None
+        self._in_request = False
+        metrics.ACTIVE_CONNECTIONS.inc()
+
     async def handle_event(self, event: Event) -> bool:
+        if self._connection_id is not None:
+            assert self._recorder is not None
+            self._recorder.record(self._connection_id, event)
+
         if Describe.is_type(event.type):
-            await self.write_event(self.wyoming_info_event)
+            self.writer.write(info_event_bytes(self.wyoming_info))
+            await self.writer.drain()
             _LOGGER.debug("Sent info")
             return True
 
@@ -115,6 +1031,7 @@ class PiperEventHandler(AsyncEventHandler):
 
                 # Sent outside a stream, so we must process it
                 synthesize = Synthesize.from_event(event)
+                self._start_request(synthesize, "synthesize")
                 self._synthesize = Synthesize(text="", voice=synthesize.voice)
                 self.sbd = SentenceBoundaryDetector()
                 start_sent = False
@@ -138,6 +1055,7 @@ class PiperEventHandler(AsyncEventHandler):
                     # No final sentence
                     await self.write_event(AudioStop().event())
 
+                self._finish_request()
                 return True
 
             if self.cli_args.no_streaming:
@@ -150,6 +1068,7 @@ class PiperEventHandler(AsyncEventHandler):
                 self.is_streaming = True
                 self.sbd = SentenceBoundaryDetector()
                 self._synthesize = Synthesize(text="", voice=stream_start.voice)
+                self._start_request(self._synthesize, "stream")
                 _LOGGER.debug("Text stream started: voice=%s", stream_start.voice)
                 return True
 
@@ -171,7 +1090,9 @@ class PiperEventHandler(AsyncEventHandler):
                     await self._handle_synthesize(self._synthesize)
 
                 # End of audio
+                self.is_streaming = False
                 await self.write_event(SynthesizeStopped().event())
+                self._finish_request()
 
                 _LOGGER.debug("Text stream stopped")
                 return True
@@ -182,11 +1103,110 @@ class PiperEventHandler(AsyncEventHandler):
             synthesize = Synthesize.from_event(event)
             return await self._handle_synthesize(synthesize)
         except Exception as err:
+            metrics.REQUEST_ERRORS.inc(backend=self.cli_args.backend)
+            self._request_start = None
+            self._finish_request(error=repr(err))
             await self.write_event(
                 Error(text=str(err), code=err.__class__.__name__).event()
             )
             raise err
 
+    async def disconnect(self) -> None:
+        metrics.ACTIVE_CONNECTIONS.dec()
+        if self._in_request:
+            # Client went away in the middle of a text stream
+            self._request_start = None
+            self._finish_request(error="disconnected")
+
+        if self._connection_id is not None:
+            assert self._recorder is not None
+            self._recorder.disconnect(self._connection_id)
+            self._connection_id = None
+
+    def _start_request(self, synthesize: Synthesize, mode: str) -> None:
+        """Start timing (and maybe tracing or profiling) a request."""
+        if self._in_request:
+            # Previous request never finished (another synthesize-start)
+            self._request_start = None
+            self._finish_request(error="superseded")
+
+        if self.cli_args.backend == "omnivoice":
+            self._request_voice = self._omnivoice_voice_label(synthesize)
+        else:
+            self._request_voice = self._resolve_voice(synthesize)[0] or "default"
+            usage_stats = get_usage_stats()
+            if (usage_stats is not None) and self._is_known_voice(self._request_voice):
+                # Names made up by clients would each stay in the file forever
+                usage_stats.record(self._request_voice)
+                _wake_voice_predictor()
+
+        self._metric_voice = self._metric_voice_label(self._request_voice)
+        self._request_start = time.perf_counter()
+        self._first_audio_sent = False
+        self._in_request = True
+        _request_started()
+
+        metrics.REQUESTS.inc(
+            backend=self.cli_args.backend, voice=self._metric_voice, mode=mode
+        )
+        if self._tracer is not None:
+            self._trace = self._tracer.start(
+                mode, self.cli_args.backend, self._request_voice
+            )
+
+        if self._profiler is not None:
+            self._profile = self._profiler.start(
+                self._trace.request_id if self._trace is not None else None
+            )
+
+    def _finish_request(self, error: Optional[str] = None) -> None:
+        """Record the duration of the current request."""
+        if self._in_request:
+            self._in_request = False
+            _request_finished()
+
+        if self._profile is not None:
+            assert self._profiler is not None
+            self._profiler.finish(self._profile)
+            self._profile = None
+
+        if self._trace is not None:
+            assert self._tracer is not None
+            self._tracer.finish(self._trace, error=error)
+            self._trace = None
+
+        if self._request_start is None:
+            return
+
+        metrics.REQUEST_SECONDS.observe(
+            time.perf_counter() - self._request_start,
+            backend=self.cli_args.backend,
+            voice=self._metric_voice,
+        )
+        self._request_start = None
+
+    @asynccontextmanager
+    async def _synthesis_slot(
+        self, lock: Union[asyncio.Lock, asyncio.Semaphore]
+    ) -> AsyncIterator[None]:
+        """Hold ``lock`` while synthesizing, recording the queue and wait time."""
+        backend = self.cli_args.backend
+        wait_start = time.perf_counter()
+        metrics.QUEUE_DEPTH.inc(backend=backend)
+        try:
+            with span("lock_wait"):
+                await lock.acquire()
+        finally:
+            metrics.QUEUE_DEPTH.dec(backend=backend)
+
+        metrics.LOCK_WAIT_SECONDS.observe(
+            time.perf_counter() - wait_start, backend=backend
+        )
+        try:
+            yield
+        finally:
+            lock.release()
+
     async def _handle_synthesize(
         self,
         synthesize: Synthesize,
@@ -196,58 +1216,56 @@ class PiperEventHandler(AsyncEventHandler):
     ) -> bool:
         _LOGGER.debug(synthesize)
 
-        raw_text = synthesize.text
-
-        # Join multiple lines
-        text = " ".join(raw_text.strip().splitlines())
-
-        if self.cli_args.auto_punctuation and text:
-            # Add automatic punctuation (important for some voices)
-            has_punctuation = False
-            for punc_char in self.cli_args.auto_punctuation:
-                if text[-1] == punc_char:
-                    has_punctuation = True
-                    break
-
-            if not has_punctuation:
-                text = text + self.cli_args.auto_punctuation[0]
+        text = self._prepare_text(synthesize.text)
+        voice_name, voice_speaker = self._resolve_voice(synthesize)
 
-        _LOGGER.debug("synthesize: raw_text=%s, text='%s'", raw_text, text)
+        trace = current_trace()
+        if trace is not None:
+            trace.add_sentence(text)
 
-        # Resolve voice (piper backend only)
-        voice_name: Optional[str] = None
-        voice_speaker: Optional[str] = None
-        if self.cli_args.backend != "omnivoice":
-            if synthesize.voice is not None:
-                voice_name = synthesize.voice.name
-                voice_speaker = synthesize.voice.speaker
-
-            if voice_name is None:
-                # Default voice
-                voice_name = self.cli_args.voice
+        await wait_until_ready(self.cli_args.ready_timeout)
+        if self.cli_args.backend == "omnivoice":
+            await ensure_omnivoice_loaded(self.cli_args)
 
-            if voice_name == self.cli_args.voice:
-                # Default speaker
-                voice_speaker = voice_speaker or self.cli_args.speaker
-
-            assert voice_name is not None
+        if (
+            self.cli_args.backend == "omnivoice"
+            and self.cli_args.omnivoice_decode_window > 0
+            and (_OMNIVOICE is not None)
+            and _OMNIVOICE.supports_streaming
+        ):
+            await self._stream_omnivoice(
+                text,
+                synthesize,
+                send_start=send_start,
+                send_stop=send_stop,
+                add_silence=add_silence,
+            )
+            return True
 
-            # Resolve alias
-            voice_info = self.voices_info.get(voice_name, {})
-            voice_name = voice_info.get("key", voice_name)
-            assert voice_name is not None
+        is_omnivoice = self.cli_args.backend == "omnivoice"
+        synthesis_lock: Union[asyncio.Lock, asyncio.Semaphore] = (
+            _omnivoice_slots(self.cli_args) if is_omnivoice else _VOICE_LOCK
+        )
 
         with tempfile.NamedTemporaryFile(mode="wb+", suffix=".wav") as output_file:
-            async with _VOICE_LOCK:
+            async with self._synthesis_slot(synthesis_lock):
+                synthesis_start = time.perf_counter()
                 wav_writer: wave.Wave_write = wave.open(output_file, "wb")
                 with wav_writer:
-                    if self.cli_args.backend == "omnivoice":
+                    if is_omnivoice:
                         req_voice = req_language = None
                         if synthesize.voice is not None:
                             req_voice = synthesize.voice.name
                             req_language = synthesize.voice.language
-                        self._synthesize_omnivoice(
-                            text, wav_writer, req_voice, req_language
+
+                        # Off the event loop so pooled sessions run in parallel
+                        await run_in_executor(
+                            self._omnivoice_call,
+                            self._synthesize_omnivoice,
+                            text,
+                            wav_writer,
+                            req_voice,
+                            req_language,
                         )
                     else:
                         assert voice_name is not None
@@ -255,6 +1273,15 @@ class PiperEventHandler(AsyncEventHandler):
                             text, wav_writer, voice_name, voice_speaker
                         )
 
+                    _observe_synthesis(
+                        self.cli_args.backend,
+                        self._metric_voice_label(
+                            voice_name or self._omnivoice_voice_label(synthesize)
+                        ),
+                        time.perf_counter() - synthesis_start,
+                        wav_writer.tell() / wav_writer.getframerate(),
+                    )
+
                     if add_silence and self.cli_args.sentence_silence:
                         wav_writer.writeframes(
                             _silence_bytes(wav_writer, self.cli_args.sentence_silence)
@@ -267,6 +1294,8 @@ class PiperEventHandler(AsyncEventHandler):
                 rate = wav_file.getframerate()
                 width = wav_file.getsampwidth()
                 channels = wav_file.getnchannels()
+                with span("wav_read"):
+                    audio_bytes = wav_file.readframes(wav_file.getnframes())
 
                 if send_start:
                     await self.write_event(
@@ -278,30 +1307,155 @@ class PiperEventHandler(AsyncEventHandler):
                     )
 
                 # Audio
-                audio_bytes = wav_file.readframes(wav_file.getnframes())
-                bytes_per_sample = width * channels
-                bytes_per_chunk = bytes_per_sample * self.cli_args.samples_per_chunk
-                num_chunks = int(math.ceil(len(audio_bytes) / bytes_per_chunk))
-
-                # Split into chunks
-                for i in range(num_chunks):
-                    offset = i * bytes_per_chunk
-                    chunk = audio_bytes[offset : offset + bytes_per_chunk]
-
-                    await self.write_event(
-                        AudioChunk(
-                            audio=chunk,
-                            rate=rate,
-                            width=width,
-                            channels=channels,
-                        ).event(),
-                    )
+                await self._write_audio_chunks(audio_bytes, rate, width, channels)
 
             if send_stop:
                 await self.write_event(AudioStop().event())
 
         return True
 
+    def _prepare_text(self, raw_text: str) -> str:
+        """Join lines and add automatic punctuation."""
+        # Join multiple lines
+        text = " ".join(raw_text.strip().splitlines())
+
+        if self.cli_args.auto_punctuation and text:
+            # Add automatic punctuation (important for some voices)
+            has_punctuation = False
+            for punc_char in self.cli_args.auto_punctuation:
+                if text[-1] == punc_char:
+                    has_punctuation = True
+                    break
+
+            if not has_punctuation:
+                text = text + self.cli_args.auto_punctuation[0]
+
+        _LOGGER.debug("synthesize: raw_text=%s, text='%s'", raw_text, text)
+        return text
+
+    def _resolve_voice(
+        self, synthesize: Synthesize
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Voice name and speaker for a request (piper backend only)."""
+        if self.cli_args.backend == "omnivoice":
+            return None, None
+
+        voice_name: Optional[str] = None
+        voice_speaker: Optional[str] = None
+        if synthesize.voice is not None:
+            voice_name = synthesize.voice.name
+            voice_speaker = synthesize.voice.speaker
+
+        if voice_name is None:
+            # Default voice
+            voice_name = self.cli_args.voice
+
+        if voice_name == self.cli_args.voice:
+            # Default speaker
+            voice_speaker = voice_speaker or self.cli_args.speaker
+
+        assert voice_name is not None
+
+        # Resolve alias
+        voice_name = self.voices_info.resolve(voice_name)
+
+        return voice_name, voice_speaker
+
+    async def _write_audio_chunks(
+        self, audio_bytes: bytes, rate: int, width: int, channels: int
+    ) -> None:
+        """Split raw audio into chunks of --samples-per-chunk and send them."""
+        bytes_per_sample = width * channels
+        bytes_per_chunk = bytes_per_sample * self.cli_args.samples_per_chunk
+        num_chunks = int(math.ceil(len(audio_bytes) / bytes_per_chunk))
+
+        if audio_bytes:
+            metrics.AUDIO_BYTES.inc(len(audio_bytes), backend=self.cli_args.backend)
+            if (self._request_start is not None) and (not self._first_audio_sent):
+                self._first_audio_sent = True
+                metrics.TIME_TO_FIRST_AUDIO.observe(
+                    time.perf_counter() - self._request_start,
+                    backend=self.cli_args.backend,
+                    voice=self._metric_voice,
+                )
+
+        # Split into chunks
+        with span("write"):
+            for i in range(num_chunks):
+                offset = i * bytes_per_chunk
+                chunk = audio_bytes[offset : offset + bytes_per_chunk]
+
+                await self.write_event(
+                    AudioChunk(
+                        audio=chunk,
+                        rate=rate,
+                        width=width,
+                        channels=channels,
+                    ).event(),
+                )
+
+    async def _stream_omnivoice(
+        self,
+        text: str,
+        synthesize: Synthesize,
+        send_start: bool = True,
+        send_stop: bool = True,
+        add_silence: bool = False,
+    ) -> None:
+        """Synthesize with the omnivoice backend, sending audio per decode window.
+
+        The blocking model calls run in the default executor so each decoded
+        window can be written to the client while the next one is decoding.
+        """
+        assert _OMNIVOICE is not None, "OmniVoice model was not loaded"
+
+        req_voice = req_language = None
+        if synthesize.voice is not None:
+            req_voice = synthesize.voice.name
+            req_language = synthesize.voice.language
+
+        rate, width, channels = _OMNIVOICE.sampling_rate, 2, 1
+
+        async with self._synthesis_slot(_omnivoice_slots(self.cli_args)):
+            synthesis_start = time.perf_counter()
+            num_frames = 0
+            audio_stream = _OMNIVOICE.synthesize_stream(
+                text,
+                window_frames=self.cli_args.omnivoice_decode_window,
+                **_omnivoice_voice_kwargs(req_voice, req_language),
+            )
+
+            if send_start:
+                await self.write_event(
+                    AudioStart(rate=rate, width=width, channels=channels).event()
+                )
+
+            while True:
+                audio_bytes = await run_in_executor(
+                    self._omnivoice_call, next, audio_stream, None
+                )
+                if audio_bytes is None:
+                    break
+
+                num_frames += len(audio_bytes) // (width * channels)
+                await self._write_audio_chunks(audio_bytes, rate, width, channels)
+
+            _observe_synthesis(
+                self.cli_args.backend,
+                self._metric_voice_label(self._omnivoice_voice_label(synthesize)),
+                time.perf_counter() - synthesis_start,
+                num_frames / rate,
+            )
+
+        if add_silence and self.cli_args.sentence_silence:
+            num_frames = int(rate * self.cli_args.sentence_silence)
+            await self._write_audio_chunks(
+                bytes(num_frames * width * channels), rate, width, channels
+            )
+
+        if send_stop:
+            await self.write_event(AudioStop().event())
+
     def _synthesize_piper(
         self,
         text: str,
@@ -310,28 +1464,18 @@ class PiperEventHandler(AsyncEventHandler):
         voice_speaker: Optional[str],
     ) -> None:
         """Synthesize with the piper backend into ``wav_writer``."""
-        global _VOICE, _VOICE_NAME
-
-        if voice_name != _VOICE_NAME:
-            # Load new voice
-            _LOGGER.debug("Loading voice: %s", voice_name)
-            ensure_voice_exists(
-                voice_name,
-                self.cli_args.data_dir,
-                self.cli_args.download_dir,
-                self.voices_info,
-            )
-            model_path, config_path = find_voice(voice_name, self.cli_args.data_dir)
-            _VOICE = PiperVoice.load(
-                model_path, config_path, use_cuda=self.cli_args.use_cuda
-            )
-            _VOICE_NAME = voice_name
+        from piper import PiperVoice, SynthesisConfig
 
-        assert _VOICE is not None
+        loaded = _VOICES.get(voice_name)
+        metrics.cache_lookup("voice", hit=(loaded is not None))
+        if loaded is None:
+            loaded = load_voice(voice_name, self.cli_args, self.voices_info)
 
         syn_config = SynthesisConfig()
         if voice_speaker is not None:
-            syn_config.speaker_id = _VOICE.config.speaker_id_map.get(voice_speaker)
+            syn_config.speaker_id = loaded.voice.config.speaker_id_map.get(
+                voice_speaker
+            )
             if syn_config.speaker_id is None:
                 try:
                     # Try to interpret as an id
@@ -353,7 +1497,41 @@ class PiperEventHandler(AsyncEventHandler):
         if self.cli_args.noise_w_scale is not None:
             syn_config.noise_w_scale = self.cli_args.noise_w_scale
 
-        _VOICE.synthesize_wav(text, wav_writer, syn_config)
+        voice = loaded.voice
+        profile = current_profile()
+        if profile is not None:
+            from .voice_loader import create_profiling_session, load_profile
+
+            # Same voice on a session that writes an onnxruntime profile
+            voice = PiperVoice(
+                config=loaded.voice.config,
+                session=profile.session(
+                    "piper",
+                    partial(
+                        create_profiling_session,
+                        loaded.model_path,
+                        use_cuda=self.cli_args.use_cuda,
+                        profile=load_profile(self.cli_args.download_dir, voice_name),
+                    ),
+                ),
+            )
+
+        voice.synthesize_wav(text, wav_writer, syn_config)
+
+    def _omnivoice_call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Call into the OmniVoice model from a worker thread.
+
+        For a profiled request, the call is CPU profiled and runs on the
+        request's profiling session.
+        """
+        profile = current_profile()
+        if profile is None:
+            return func(*args)
+
+        assert _OMNIVOICE is not None
+        session = profile.session("omnivoice", _OMNIVOICE.create_profiling_session)
+        with profile.profile_thread(), _OMNIVOICE.use_session(session):
+            return func(*args)
 
     def _synthesize_omnivoice(
         self,
@@ -364,33 +1542,34 @@ class PiperEventHandler(AsyncEventHandler):
     ) -> None:
         """Synthesize with the omnivoice (ONNX) backend into ``wav_writer``.
 
-        Uses the shared model loaded at startup; access is serialized by the
-        caller via ``_VOICE_LOCK``. A known ``voice_name`` selects a cloning
-        reference voice or a voice-design (instruct) voice, using its own
-        language; otherwise the built-in OmniVoice speaker is used with the
-        request/default ``language``.
+        Uses the shared model loaded at startup; concurrency is limited by the
+        caller via :func:`_omnivoice_slots`. The voice is resolved by
+        :func:`_omnivoice_voice_kwargs`.
         """
         assert _OMNIVOICE is not None, "OmniVoice model was not loaded"
 
-        from .omnivoice import DEFAULT_VOICE_NAME
+        _OMNIVOICE.synthesize_wav(
+            text, wav_writer, **_omnivoice_voice_kwargs(voice_name, language)
+        )
 
-        ref = None
-        if voice_name and voice_name != DEFAULT_VOICE_NAME:
-            ref = _OMNIVOICE_VOICES.get(voice_name)
-            if ref is None:
-                _LOGGER.debug(
-                    "Unknown OmniVoice voice %r; using built-in speaker", voice_name
-                )
+    def _is_known_voice(self, voice_name: str) -> bool:
+        """True for voices in the catalog or found on disk (not made up)."""
+        return (
+            (voice_name in self.voices_info)
+            or (voice_name in (self.cli_args.voice, "default"))
+            or (voice_name in info_voice_names(self.wyoming_info))
+        )
 
-        if ref is not None:
-            _OMNIVOICE.synthesize_wav(
-                text,
-                wav_writer,
-                ref_audio=ref.ref_audio,
-                ref_text=ref.ref_text,
-                instruct=ref.instruct,
-                language=ref.language,
-            )
-        else:
-            # Built-in speaker (voice "default", empty, or unknown).
-            _OMNIVOICE.synthesize_wav(text, wav_writer, language=language)
+    def _metric_voice_label(self, voice_name: str) -> str:
+        """Voice label for the metrics: ``other`` for unknown voice names."""
+        if self._is_known_voice(voice_name):
+            return voice_name
+
+        return metrics.OTHER_VOICE
+
+    def _omnivoice_voice_label(self, synthesize: Synthesize) -> str:
+        """Requested OmniVoice voice name for the metrics."""
+        if (synthesize.voice is not None) and synthesize.voice.name:
+            return synthesize.voice.name
+
+        return "default"
@@ -0,0 +1,157 @@
+"""Resident memory of the process and its memory-mapped model files.
+
+With ``--mmap-models``, model weights are mapped read-only from files, so
+every process (and every session) that loads the same model shares one copy in
+the page cache. This reads ``/proc/<pid>/smaps`` (Linux only) to report how much
+of each mapped model file is resident, and how much of that is shared with
+other mappings versus private to the process.
+
+:func:`process_rss` and :func:`release_memory` back the per-model accounting
+and the ``--memory-soft-limit`` eviction in the event handler.
+
+Usage:
+    python -m wyoming_piper.memory <pid> [<pid> ...]
+"""
+
+import argparse
+import ctypes
+import gc
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+# Files that hold model weights
+MODEL_SUFFIXES = (".onnx", ".opt", ".data", ".ort")
+
+
+@dataclass
+class MappedUsage:
+    """Resident memory (in bytes) of one mapped file, summed over mappings."""
+
+    rss: int = 0
+    pss: int = 0
+    shared: int = 0
+    private: int = 0
+
+
+def _is_model_file(path: str) -> bool:
+    return path.endswith(MODEL_SUFFIXES)
+
+
+def mapped_file_usage(
+    pid: Union[int, str] = "self",
+    paths: Optional[Iterable[Union[str, Path]]] = None,
+) -> Dict[str, MappedUsage]:
+    """Resident memory of mapped model files (or ``paths``) in a process.
+
+    Returns an empty dict when ``/proc`` is not available.
+    """
+    wanted = {str(Path(p).resolve()) for p in paths} if paths is not None else None
+    usage: Dict[str, MappedUsage] = {}
+    smaps_path = Path("/proc") / str(pid) / "smaps"
+    if not smaps_path.exists():
+        return usage
+
+    current: Optional[MappedUsage] = None
+    with open(smaps_path, "r", encoding="utf-8") as smaps_file:
+        for line in smaps_file:
+            parts = line.split()
+            if not parts:
+                continue
+
+            if ("-" in parts[0]) and (not parts[0].endswith(":")):
+                # Header of a new mapping: address perms offset dev inode [path]
+                current = None
+                if len(parts) >= 6:
+                    path = " ".join(parts[5:])
+                    if (wanted is None and _is_model_file(path)) or (
+                        wanted is not None and path in wanted
+                    ):
+                        current = usage.setdefault(path, MappedUsage())
+
+                continue
+
+            if (current is None) or (len(parts) != 3) or (parts[2] != "kB"):
+                continue
+
+            key, value = parts[0], int(parts[1]) * 1024
+            if key == "Rss:":
+                current.rss += value
+            elif key == "Pss:":
+                current.pss += value
+            elif key in ("Shared_Clean:", "Shared_Dirty:"):
+                current.shared += value
+            elif key in ("Private_Clean:", "Private_Dirty:"):
+                current.private += value
+
+    return usage
+
+
+def format_usage(usage: Dict[str, MappedUsage]) -> str:
+    """Table of mapped file usage in MiB."""
+    lines = [f"{'rss':>8} {'pss':>8} {'shared':>8} {'private':>8}  file"]
+    for path, file_usage in sorted(usage.items()):
+        lines.append(
+            " ".join(
+                f"{value / (1024 * 1024):8.1f}"
+                for value in (
+                    file_usage.rss,
+                    file_usage.pss,
+                    file_usage.shared,
+                    file_usage.private,
+                )
+            )
+            + f"  {path}"
+        )
+
+    return os.linesep.join(lines)
+
+
+def process_rss() -> int:
+    """Resident memory of this process in bytes (0 without ``/proc``)."""
+    try:
+        with open("/proc/self/statm", "r", encoding="utf-8") as statm_file:
+            resident_pages = int(statm_file.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return 0
+
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def release_memory() -> None:
+    """Collect garbage and return free heap memory to the OS.
+
+    glibc keeps freed memory in its heap; ``malloc_trim`` hands it back, so
+    the resident size actually drops after a model is released.
+    """
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        # Not glibc
+        pass
+
+
+def format_bytes(num_bytes: int) -> str:
+    """Bytes as MiB for log lines."""
+    return f"{num_bytes / (1024 * 1024):.1f} MiB"
+
+
+# -----------------------------------------------------------------------------
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Report resident memory of mapped model files (MiB)"
+    )
+    parser.add_argument("pid", nargs="+", help="Process id(s) of wyoming-piper")
+    args = parser.parse_args()
+
+    for pid in args.pid:
+        print(f"pid {pid}")
+        print(format_usage(mapped_file_usage(pid)))
+
+
+if __name__ == "__main__":
+    main()
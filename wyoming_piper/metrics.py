@@ -0,0 +1,317 @@
+"""Synthesis metrics in the Prometheus text format.
+
+The metrics are module-level and updated from the event handler and the
+backends. They are exported at ``/metrics`` on the web UI (``--web-server``)
+and/or on a standalone port (``--metrics-port``). The standalone server is a
+minimal asyncio HTTP responder, so metrics don't need any extra dependencies.
+"""
+
+import asyncio
+import logging
+import math
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds, from a cached voice to a cold OmniVoice request
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Synthesis seconds per second of audio
+RTF_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 5)
+
+# Voice label for voice names the server doesn't know. Clients choose the
+# voice name, and every label value is a separate series.
+OTHER_VOICE = "other"
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+
+    return (
+        "{"
+        + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+        + "}"
+    )
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+
+    if value == int(value):
+        return str(int(value))
+
+    return repr(value)
+
+
+class _Metric:
+    """Base class: a named metric with one value per label combination."""
+
+    kind = ""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        registry: Optional["Registry"] = None,
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} needs labels {self.label_names}")
+
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError()
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Value that only goes up."""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = list(self._values.items())
+
+        for key, value in values:
+            yield (
+                f"{self.name}{_format_labels(self.label_names, key)} "
+                f"{_format_value(value)}"
+            )
+
+
+class Gauge(Counter):
+    """Value that goes up and down."""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Counts of observations in cumulative buckets, with their sum."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, *args, buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+
+        # label values -> (count per bucket + overflow, sum)
+        self._values: Dict[LabelValues, Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        bucket_index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0))
+            counts[bucket_index] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels: str) -> int:
+        counts, _total = self._values.get(self._key(labels), ([], 0.0))
+        return sum(counts)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = [
+                (key, list(counts), total)
+                for key, (counts, total) in self._values.items()
+            ]
+
+        label_names = self.label_names + ("le",)
+        for key, counts, total in values:
+            cumulative = 0
+            for upper_bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                yield (
+                    f"{self.name}_bucket"
+                    f"{_format_labels(label_names, (*key, _format_value(upper_bound)))} "
+                    f"{cumulative}"
+                )
+
+            labels = _format_labels(self.label_names, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    """Set of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+# -----------------------------------------------------------------------------
+
+REQUESTS = Counter(
+    "wyoming_piper_requests_total",
+    "Synthesis requests (a synthesize event or a text stream)",
+    ("backend", "voice", "mode"),
+)
+REQUEST_ERRORS = Counter(
+    "wyoming_piper_request_errors_total",
+    "Events that failed with an error sent to the client",
+    ("backend",),
+)
+TIME_TO_FIRST_AUDIO = Histogram(
+    "wyoming_piper_time_to_first_audio_seconds",
+    "Request received to first audio chunk sent",
+    ("backend", "voice"),
+)
+REQUEST_SECONDS = Histogram(
+    "wyoming_piper_request_seconds",
+    "Request received to last audio sent",
+    ("backend", "voice"),
+)
+SYNTHESIS_SECONDS = Histogram(
+    "wyoming_piper_synthesis_seconds",
+    "Time to synthesize one sentence, excluding lock wait",
+    ("backend", "voice"),
+)
+REAL_TIME_FACTOR = Histogram(
+    "wyoming_piper_real_time_factor",
+    "Synthesis seconds per second of audio, per sentence",
+    ("backend", "voice"),
+    buckets=RTF_BUCKETS,
+)
+LOCK_WAIT_SECONDS = Histogram(
+    "wyoming_piper_lock_wait_seconds",
+    "Time waiting for the voice lock (piper) or a session slot (omnivoice)",
+    ("backend",),
+)
+QUEUE_DEPTH = Gauge(
+    "wyoming_piper_queue_depth",
+    "Sentences waiting for the voice lock or a session slot",
+    ("backend",),
+)
+VOICE_LOADS = Counter(
+    "wyoming_piper_voice_loads_total", "Voice (or model) loads", ("backend", "voice")
+)
+VOICE_LOAD_SECONDS = Histogram(
+    "wyoming_piper_voice_load_seconds",
+    "Time to load a voice (or model)",
+    ("backend", "voice"),
+)
+CACHE_REQUESTS = Counter(
+    "wyoming_piper_cache_requests_total",
+    "Cache lookups: loaded voice, optimized model file, OmniVoice voice prompt",
+    ("cache", "result"),
+)
+AUDIO_BYTES = Counter(
+    "wyoming_piper_audio_bytes_total", "Bytes of audio sent to clients", ("backend",)
+)
+ACTIVE_CONNECTIONS = Gauge("wyoming_piper_active_connections", "Connected clients", ())
+
+
+def cache_lookup(cache: str, hit: bool) -> None:
+    """Count a cache hit or miss."""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def render() -> str:
+    """All metrics in the Prometheus text format."""
+    return REGISTRY.render()
+
+
+# -----------------------------------------------------------------------------
+
+
+async def _handle_http(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), timeout=10)
+        while (await asyncio.wait_for(reader.readline(), timeout=10)) not in (
+            b"\r\n",
+            b"\n",
+            b"",
+        ):
+            pass  # skip headers
+
+        parts = request_line.decode("latin-1").split()
+        if (
+            (len(parts) >= 2)
+            and (parts[0] == "GET")
+            and (parts[1].split("?")[0] in ("/", "/metrics"))
+        ):
+            status, content_type, body = "200 OK", CONTENT_TYPE, render().encode()
+        else:
+            status, content_type, body = "404 Not Found", "text/plain", b"Not found\n"
+
+        writer.write(
+            (
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode("latin-1")
+            + body
+        )
+        await writer.drain()
+    except (asyncio.TimeoutError, ConnectionError) as err:
+        _LOGGER.debug("Metrics request failed: %s", err)
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(host: str, port: int) -> asyncio.AbstractServer:
+    """Serve ``/metrics`` over HTTP on the running event loop."""
+    server = await asyncio.start_server(_handle_http, host=host, port=port)
+    _LOGGER.info("Metrics available on http://%s:%s/metrics", host, port)
+    return server
@@ -17,12 +17,25 @@ clean at low step counts (e.g. ``--omnivoice-steps 10``) while running fast on
 CPU. The int4 quantization is hardcoded for now.
 """
 
+import importlib.util
+import itertools
 import logging
+import os
+import queue
 import re
+import sys
+import threading
 import wave
+from contextlib import contextmanager
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, List, Optional, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from .memory import process_rss
+from .metrics import cache_lookup
+from .threads import ThreadBudget
+from .trace import span
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -40,6 +53,40 @@ PIPELINE_REPO = "k2-fsa/OmniVoice"
 # voice name. Reserved: cannot be a cloning voice.
 DEFAULT_VOICE_NAME = "default"
 
+# Streaming codec decode: the final tokens are decoded in windows of this many
+# audio frames (~25 per second), each with OVERLAP frames of context on both
+# sides that is decoded but discarded, so window edges match a full decode.
+DECODE_WINDOW_FRAMES = 50
+DECODE_OVERLAP_FRAMES = 8
+
+# Private OmniVoice internals used by synthesize_stream (see _generate_tokens),
+# present in omnivoice 0.2
+_STREAMING_MODEL_METHODS = (
+    "_preprocess_all",
+    "_generate_iterative",
+    "_generate_chunked",
+)
+_STREAMING_TASK_METHODS = ("get_indices",)
+
+
+def missing_streaming_internals(model: Any, task_class: Any) -> List[str]:
+    """Internals used by :meth:`OmniVoiceModel.synthesize_stream` that are missing.
+
+    ``model`` is the loaded ``OmniVoice`` and ``task_class`` its
+    ``GenerationTask`` class (None if the installed version has none).
+    """
+    missing = [
+        name
+        for name in _STREAMING_MODEL_METHODS
+        if not callable(getattr(model, name, None))
+    ]
+    missing.extend(
+        f"GenerationTask.{name}"
+        for name in _STREAMING_TASK_METHODS
+        if not callable(getattr(task_class, name, None))
+    )
+    return missing
+
 
 def advertise_language(code: str) -> str:
     """Format a language for the Wyoming Info in the BCP-47 form HA expects.
@@ -50,11 +97,37 @@ def advertise_language(code: str) -> str:
     return code.replace("_", "-")
 
 
+@lru_cache(maxsize=1)
+def load_lang_map() -> Any:
+    """The ``omnivoice.utils.lang_map`` module, loaded without torch.
+
+    ``import omnivoice.utils.lang_map`` runs the ``omnivoice`` package
+    ``__init__``, which pulls in torch/transformers (~6 s). The language table
+    is needed for the Wyoming Info at startup, long before the model, so
+    ``lang_map.py`` is loaded as a standalone module by file path instead.
+    """
+    module = sys.modules.get("omnivoice.utils.lang_map")
+    if module is not None:
+        # Package is already imported
+        return module
+
+    spec = importlib.util.find_spec("omnivoice")
+    if spec is not None and spec.submodule_search_locations:
+        lang_path = Path(spec.submodule_search_locations[0]) / "utils" / "lang_map.py"
+        mod_spec = importlib.util.spec_from_file_location("_ov_lang_map", lang_path)
+        if lang_path.is_file() and mod_spec is not None and mod_spec.loader is not None:
+            module = importlib.util.module_from_spec(mod_spec)
+            mod_spec.loader.exec_module(module)
+            return module
+
+    from omnivoice.utils import lang_map
+
+    return lang_map
+
+
 def get_supported_languages() -> List[str]:
     """All languages OmniVoice supports, as HA-facing codes (e.g. 'en', 'zh')."""
-    from omnivoice.utils.lang_map import LANG_IDS
-
-    return sorted(advertise_language(code) for code in LANG_IDS)
+    return sorted(advertise_language(code) for code in load_lang_map().LANG_IDS)
 
 
 def _normalize_language(language: Optional[str]) -> Optional[str]:
@@ -69,13 +142,12 @@ def _normalize_language(language: Optional[str]) -> Optional[str]:
     if not language or language.lower() == "none":
         return language
 
-    from omnivoice.utils.lang_map import LANG_IDS, LANG_NAME_TO_ID
-
-    if language in LANG_IDS or language.lower() in LANG_NAME_TO_ID:
+    lang_map = load_lang_map()
+    if language in lang_map.LANG_IDS or language.lower() in lang_map.LANG_NAME_TO_ID:
         return language
 
     primary = re.split(r"[-_]", language, maxsplit=1)[0].lower()
-    if primary in LANG_IDS:
+    if primary in lang_map.LANG_IDS:
         return primary
 
     return language  # unknown; OmniVoice will warn and go language-agnostic
@@ -98,6 +170,7 @@ class OmniVoiceRef:
     ref_audio: Optional[str] = None
     ref_text: Optional[str] = None
     instruct: Optional[str] = None
+    ref_mtime_ns: int = 0  # of ref_audio, so a replaced recording compares unequal
 
 
 def scan_ref_dir(ref_dir: Union[str, Path]) -> List[OmniVoiceRef]:
@@ -155,11 +228,19 @@ def scan_ref_dir(ref_dir: Union[str, Path]) -> List[OmniVoiceRef]:
                         "Skipping voice %r: cannot read %s (%s)", name, txt, err
                     )
                     continue
+                try:
+                    ref_mtime_ns = wav.stat().st_mtime_ns
+                except OSError as err:
+                    _LOGGER.warning(
+                        "Skipping voice %r: cannot read %s (%s)", name, wav, err
+                    )
+                    continue
                 voice = OmniVoiceRef(
                     name=name,
                     language=lang_dir.name,
                     ref_audio=str(wav),
                     ref_text=ref_text,
+                    ref_mtime_ns=ref_mtime_ns,
                 )
             else:
                 try:
@@ -186,7 +267,7 @@ def scan_ref_dir(ref_dir: Union[str, Path]) -> List[OmniVoiceRef]:
             seen[name] = lang_dir.name
             voices.append(voice)
 
-    _LOGGER.info("Loaded %d OmniVoice reference voice(s) from %s", len(voices), base)
+    _LOGGER.debug("Found %d OmniVoice reference voice(s) in %s", len(voices), base)
     return voices
 
 
@@ -241,6 +322,125 @@ def ensure_omnivoice_downloaded(
     return onnx_path
 
 
+class OnnxSessionPool:
+    """A fixed set of onnxruntime sessions for one graph.
+
+    Each request checks out a session for its whole MaskGIT loop, so up to
+    ``size`` requests run the LM at the same time. The CPU threads are split
+    between the sessions instead of every session using all cores, so this
+    only raises throughput when there are cores to spare.
+
+    With more than one session (or ``use_mmap``), weight prepacking is
+    disabled so the graph's external weights stay file-backed: every session,
+    and every server process, maps the same page-cache pages instead of holding
+    a private packed copy (the prepacked weights container is not exposed by
+    the Python API). Activation memory comes from one shared arena allocator
+    registered in the ORT environment.
+    """
+
+    def __init__(
+        self,
+        onnx_path: str,
+        size: int = 1,
+        thread_budget: Optional[ThreadBudget] = None,
+        use_mmap: bool = False,
+    ) -> None:
+        import onnxruntime as ort
+
+        self.size = max(1, size)
+        self._onnx_path = onnx_path
+        self._thread_budget = thread_budget
+        self._use_mmap = use_mmap
+
+        if self.size > 1:
+            ort.create_and_register_allocator(
+                ort.OrtMemoryInfo(
+                    "Cpu",
+                    ort.OrtAllocatorType.ORT_ARENA_ALLOCATOR,
+                    0,
+                    ort.OrtMemType.DEFAULT,
+                ),
+                None,
+            )
+
+        self._sessions: "queue.Queue[Any]" = queue.Queue()
+        self._local = threading.local()
+        for worker_index in range(self.size):
+            self._sessions.put(
+                ort.InferenceSession(
+                    onnx_path,
+                    self._session_options(worker_index),
+                    providers=["CPUExecutionProvider"],
+                )
+            )
+
+        _LOGGER.debug("Created %s ONNX session(s)", self.size)
+
+    def _session_options(self, worker_index: int) -> Any:
+        """Options for the session of one worker."""
+        import onnxruntime as ort
+
+        sess_options = ort.SessionOptions()
+        sess_options.graph_optimization_level = (
+            ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+        if self._thread_budget is not None:
+            self._thread_budget.configure_session(sess_options, worker_index)
+        elif self.size > 1:
+            # One session keeps the onnxruntime default (all cores)
+            sess_options.intra_op_num_threads = max(
+                1, (os.cpu_count() or 1) // self.size
+            )
+
+        if (self.size > 1) or self._use_mmap:
+            sess_options.add_session_config_entry("session.disable_prepacking", "1")
+
+        if self.size > 1:
+            sess_options.add_session_config_entry("session.use_env_allocators", "1")
+
+        return sess_options
+
+    def create_profiling_session(self, profile_prefix: str) -> Any:
+        """Extra session like the first worker's that writes an ORT profile."""
+        import onnxruntime as ort
+
+        sess_options = self._session_options(0)
+        sess_options.enable_profiling = True
+        sess_options.profile_file_prefix = profile_prefix
+
+        return ort.InferenceSession(
+            self._onnx_path, sess_options, providers=["CPUExecutionProvider"]
+        )
+
+    @contextmanager
+    def use_session(self, session: Any) -> Iterator[None]:
+        """Run this thread's checkouts in the block on ``session``."""
+        self._local.session = session
+        try:
+            yield
+        finally:
+            self._local.session = None
+
+    @contextmanager
+    def checkout(self) -> Iterator[Any]:
+        """Reserve a session for the calling thread until the block exits.
+
+        Nested checkouts on the same thread reuse the reserved session.
+        """
+        session = getattr(self._local, "session", None)
+        if session is not None:
+            yield session
+            return
+
+        session = self._sessions.get()
+        self._local.session = session
+        try:
+            yield session
+        finally:
+            self._local.session = None
+            self._sessions.put(session)
+
+
 class OmniVoiceModel:
     """Loaded OmniVoice model that synthesizes into a wave writer."""
 
@@ -250,19 +450,26 @@ class OmniVoiceModel:
         num_step: int = 32,
         default_language: str = "English",
         local_files_only: bool = False,
+        num_sessions: int = 1,
+        thread_budget: Optional[ThreadBudget] = None,
+        use_mmap: bool = False,
     ) -> None:
         import types
 
         import numpy as np
-        import onnxruntime as ort
         import torch
+        from omnivoice.models import omnivoice as omnivoice_module
         from omnivoice.models.omnivoice import OmniVoice, OmniVoiceModelOutput
 
+        if thread_budget is not None:
+            thread_budget.configure_torch()
+
         self._np = np
         self._torch = torch
         self.num_step = num_step
         self.default_language = default_language
         self._prompt_cache: dict = {}  # ref_audio path -> VoiceClonePrompt
+        self._prompt_lock = threading.Lock()
 
         _LOGGER.debug("Loading OmniVoice pipeline (torch, fp32, cpu)")
         model = OmniVoice.from_pretrained(
@@ -273,15 +480,23 @@ class OmniVoiceModel:
         )
         model.eval()
 
-        _LOGGER.debug("Loading ONNX LM graph: %s", onnx_path)
-        sess_options = ort.SessionOptions()
-        sess_options.graph_optimization_level = (
-            ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # Approximate memory of each part, for --memory-soft-limit and status
+        self._torch_bytes = sum(
+            tensor.numel() * tensor.element_size()
+            for tensor in itertools.chain(model.parameters(), model.buffers())
         )
-        session = ort.InferenceSession(
-            onnx_path, sess_options, providers=["CPUExecutionProvider"]
+
+        _LOGGER.debug("Loading ONNX LM graph: %s", onnx_path)
+        rss_before = process_rss()
+        pool = OnnxSessionPool(
+            onnx_path,
+            size=num_sessions,
+            thread_budget=thread_budget,
+            use_mmap=use_mmap,
         )
-        input_names = {i.name for i in session.get_inputs()}
+        self._onnx_bytes = max(0, process_rss() - rss_before)
+        with pool.checkout() as session:
+            input_names = {i.name for i in session.get_inputs()}
 
         def onnx_forward(
             _self,
@@ -323,20 +538,77 @@ class OmniVoiceModel:
                 "position_ids": position_ids.cpu().numpy().astype(np.int64),
             }
             feeds = {k: v for k, v in feeds.items() if k in input_names}
-            logits = session.run(["logits"], feeds)[0]
+            with pool.checkout() as session:
+                logits = session.run(["logits"], feeds)[0]
             return OmniVoiceModelOutput(logits=torch.from_numpy(logits))
 
         model.forward = types.MethodType(onnx_forward, model)
 
         self._model = model
-        self._session = session
+        self._pool = pool
         self.sampling_rate: int = int(model.sampling_rate)
+
+        # Checked once here instead of failing on the first streamed request
+        missing = missing_streaming_internals(
+            model, getattr(omnivoice_module, "GenerationTask", None)
+        )
+        self.supports_streaming = not missing
+        if missing:
+            _LOGGER.debug("Installed omnivoice lacks: %s", ", ".join(missing))
         _LOGGER.info(
-            "OmniVoice loaded (num_step=%s, sample_rate=%s)",
+            "OmniVoice loaded (num_step=%s, sample_rate=%s, sessions=%s)",
             num_step,
             self.sampling_rate,
+            pool.size,
         )
 
+    def memory_usage(self) -> Dict[str, int]:
+        """Approximate bytes held by each part of the model."""
+        prompt_bytes = 0
+        for prompt in list(self._prompt_cache.values()):
+            tokens = prompt.ref_audio_tokens
+            prompt_bytes += tokens.numel() * tokens.element_size()
+
+        return {
+            "torch": self._torch_bytes,
+            "onnx": self._onnx_bytes,
+            "prompt_cache": prompt_bytes,
+        }
+
+    def clear_prompt_cache(self) -> int:
+        """Drop the in-memory voice-clone prompts (``ref.rvq`` files are kept)."""
+        with self._prompt_lock:
+            num_prompts = len(self._prompt_cache)
+            self._prompt_cache.clear()
+
+        return num_prompts
+
+    def forget_prompt(self, ref_audio: str) -> None:
+        """Drop the voice-clone prompt of a changed or removed reference voice.
+
+        Its ``ref.rvq`` file is deleted too, so the reference is encoded again
+        even if the new recording is older than the cached codes.
+        """
+        with self._prompt_lock:
+            self._prompt_cache.pop(ref_audio, None)
+            try:
+                Path(ref_audio).with_suffix(".rvq").unlink(missing_ok=True)
+            except OSError as err:
+                _LOGGER.warning("Could not delete cached reference codes: %s", err)
+
+    def create_profiling_session(self, profile_prefix: str) -> Any:
+        """LM session that writes an onnxruntime profile (see ``use_session``)."""
+        return self._pool.create_profiling_session(profile_prefix)
+
+    def use_session(self, session: Any) -> Any:
+        """Context manager running this thread's LM calls on ``session``."""
+        return self._pool.use_session(session)
+
+    @property
+    def num_sessions(self) -> int:
+        """Number of requests that can synthesize concurrently."""
+        return self._pool.size
+
     def _voice_clone_prompt(self, ref_audio: str, ref_text: Optional[str]):
         """Get the (cached) voice-clone prompt for a reference audio file.
 
@@ -344,11 +616,22 @@ class OmniVoiceModel:
         WAV, as ``ref.rvq`` -- built lazily on first use and regenerated when the
         WAV is newer than the cached file. Avoids re-encoding on every request.
         """
+        cached = self._prompt_cache.get(ref_audio)
+        cache_lookup("omnivoice_prompt", hit=(cached is not None))
+        if cached is not None:
+            return cached
+
+        with self._prompt_lock:
+            return self._load_voice_clone_prompt(ref_audio, ref_text)
+
+    def _load_voice_clone_prompt(self, ref_audio: str, ref_text: Optional[str]):
+        """Load or encode a voice-clone prompt (cache miss, under the lock)."""
         torch = self._torch
         from omnivoice.models.omnivoice import VoiceClonePrompt
 
         cached = self._prompt_cache.get(ref_audio)
         if cached is not None:
+            # Encoded by a concurrent request while we waited
             return cached
 
         wav_path = Path(ref_audio)
@@ -387,6 +670,36 @@ class OmniVoiceModel:
         self._prompt_cache[ref_audio] = prompt
         return prompt
 
+    def _generate_kwargs(
+        self,
+        text: str,
+        ref_audio: Optional[str] = None,
+        ref_text: Optional[str] = None,
+        instruct: Optional[str] = None,
+        language: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Build the ``generate`` arguments for one request's voice mode."""
+        kwargs: Dict[str, Any] = dict(
+            text=text,
+            language=_normalize_language(language or self.default_language),
+            num_step=self.num_step,
+        )
+        if ref_audio:
+            with span("voice_prompt"):
+                kwargs["voice_clone_prompt"] = self._voice_clone_prompt(
+                    ref_audio, ref_text
+                )
+        elif instruct:
+            kwargs["instruct"] = instruct
+
+        return kwargs
+
+    def _to_pcm(self, audio) -> bytes:  # type: ignore[no-untyped-def]
+        """Float audio in [-1, 1] to 16-bit little-endian PCM bytes."""
+        np = self._np
+        pcm = np.clip(audio, -1.0, 1.0)
+        return (pcm * 32767.0).astype("<i2").tobytes()
+
     def synthesize_wav(
         self,
         text: str,
@@ -408,17 +721,9 @@ class OmniVoiceModel:
         torch = self._torch
         np = self._np
 
-        kwargs = dict(
-            text=text,
-            language=_normalize_language(language or self.default_language),
-            num_step=self.num_step,
-        )
-        if ref_audio:
-            kwargs["voice_clone_prompt"] = self._voice_clone_prompt(ref_audio, ref_text)
-        elif instruct:
-            kwargs["instruct"] = instruct
+        kwargs = self._generate_kwargs(text, ref_audio, ref_text, instruct, language)
 
-        with torch.no_grad():
+        with torch.no_grad(), self._pool.checkout(), span("generate"):
             audios = self._model.generate(**kwargs)
 
         audio = audios[0]
@@ -426,10 +731,187 @@ class OmniVoiceModel:
             audio = audio.detach().cpu().numpy()
         audio = np.asarray(audio, dtype=np.float32).squeeze()
 
-        pcm = np.clip(audio, -1.0, 1.0)
-        pcm = (pcm * 32767.0).astype("<i2")
-
         wav_writer.setnchannels(1)
         wav_writer.setsampwidth(2)
         wav_writer.setframerate(self.sampling_rate)
-        wav_writer.writeframes(pcm.tobytes())
+        wav_writer.writeframes(self._to_pcm(audio))
+
+    def synthesize_stream(
+        self,
+        text: str,
+        ref_audio: Optional[str] = None,
+        ref_text: Optional[str] = None,
+        instruct: Optional[str] = None,
+        language: Optional[str] = None,
+        window_frames: int = DECODE_WINDOW_FRAMES,
+        overlap_frames: int = DECODE_OVERLAP_FRAMES,
+    ) -> Iterator[bytes]:
+        """Synthesize ``text``, yielding 16-bit mono PCM as it is decoded.
+
+        Voice modes are the same as :meth:`synthesize_wav`. The MaskGIT loop
+        still runs to completion first, but the final tokens are then decoded
+        by the codec in windows of ``window_frames`` and each window is yielded
+        as soon as it is ready, so playback can start before the whole
+        utterance is decoded.
+
+        Post-processing differs slightly from :meth:`synthesize_wav`: long
+        internal silences are not trimmed and, without a reference recording,
+        the volume is not normalized to the peak of the utterance. Both need
+        the whole waveform; a gain taken from the first window would clip
+        louder windows after it, so the codec's own level is kept.
+        """
+        kwargs = self._generate_kwargs(text, ref_audio, ref_text, instruct, language)
+        token_chunks, ref_rms, gen_config = self._generate_tokens(**kwargs)
+
+        for audio in self._stream_audio(
+            token_chunks, ref_rms, gen_config, window_frames, overlap_frames
+        ):
+            if len(audio) > 0:
+                yield self._to_pcm(audio)
+
+    def _generate_tokens(self, **kwargs):  # type: ignore[no-untyped-def]
+        """Run the MaskGIT loop only, without decoding audio.
+
+        Mirrors ``OmniVoice.generate`` for a single text: returns the list of
+        generated code tensors (one per text chunk; long texts are chunked),
+        the reference RMS, and the generation config.
+        """
+        # pylint: disable=protected-access
+        torch = self._torch
+        from omnivoice.models.omnivoice import OmniVoiceGenerationConfig
+
+        model = self._model
+        gen_config = OmniVoiceGenerationConfig.from_dict(kwargs)
+
+        with torch.no_grad(), self._pool.checkout():
+            task = model._preprocess_all(
+                text=kwargs["text"],
+                language=kwargs.get("language"),
+                voice_clone_prompt=kwargs.get("voice_clone_prompt"),
+                instruct=kwargs.get("instruct"),
+                preprocess_prompt=gen_config.preprocess_prompt,
+            )
+            short_idx, _long_idx = task.get_indices(
+                gen_config, model.audio_tokenizer.config.frame_rate
+            )
+            with span("generate"):
+                if short_idx:
+                    token_chunks = [model._generate_iterative(task, gen_config)[0]]
+                else:
+                    token_chunks = model._generate_chunked(task, gen_config)[0]
+
+        return token_chunks, task.ref_rms[0], gen_config
+
+    def _decode_windows(  # type: ignore[no-untyped-def]
+        self, tokens, window_frames: int, overlap_frames: int
+    ):
+        """Decode (codebooks, frames) codes window by window into float audio.
+
+        Each window is decoded with ``overlap_frames`` of context on both sides.
+        The left context is dropped; part of the right context is kept and
+        linearly cross-faded with the start of the next window to hide seams.
+        """
+        torch = self._torch
+        np = self._np
+
+        codec = self._model.audio_tokenizer
+        hop = int(self.sampling_rate // codec.config.frame_rate)
+        num_frames = int(tokens.shape[-1])
+        window_frames = max(1, window_frames)
+        overlap_frames = max(0, overlap_frames)
+        fade = (overlap_frames * hop) // 2
+
+        pending = None  # decoded right context, cross-faded into the next window
+        for start in range(0, num_frames, window_frames):
+            end = min(start + window_frames, num_frames)
+            ctx_start = max(0, start - overlap_frames)
+            ctx_end = min(num_frames, end + overlap_frames)
+
+            with torch.no_grad(), span("decode"):
+                audio = (
+                    codec.decode(
+                        tokens[:, ctx_start:ctx_end].to(codec.device).unsqueeze(0)
+                    )
+                    .audio_values[0]
+                    .cpu()
+                    .numpy()
+                )
+            audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+
+            head = (start - ctx_start) * hop
+            body = (end - start) * hop
+            is_last = end >= num_frames
+            piece = audio[head:] if is_last else audio[head : head + body + fade]
+
+            if pending is not None:
+                n = min(len(pending), len(piece))
+                weights = np.linspace(0, 1, n, dtype=np.float32)
+                piece = piece.copy()
+                piece[:n] = pending[:n] * (1 - weights) + piece[:n] * weights
+
+            if is_last:
+                pending = None
+            else:
+                pending = piece[body:]
+                piece = piece[:body]
+
+            yield piece
+
+    def _stream_audio(  # type: ignore[no-untyped-def]
+        self, token_chunks, ref_rms, gen_config, window_frames, overlap_frames
+    ):
+        """Decode and post-process text chunks into a stream of float audio.
+
+        Applies the same edge fades, padding and between-chunk gaps as the
+        non-streaming pipeline. The gain is the same for every window: from the
+        reference RMS if there is one, 1 otherwise. One window is held back so
+        the final fade out can be applied once the end of the audio is known.
+        """
+        np = self._np
+        sample_rate = self.sampling_rate
+
+        edge_fade = int(gen_config.fade_duration * sample_rate)
+        gap_fade = int(0.3 * sample_rate) // 3  # matches cross_fade_chunks
+        pad = np.zeros(int(gen_config.pad_duration * sample_rate), dtype=np.float32)
+
+        def fade(audio, num_samples: int, fade_in: bool):  # type: ignore[no-untyped-def]
+            k = min(num_samples, len(audio) // 2)
+            if k <= 0:
+                return audio
+            audio = audio.copy()
+            if fade_in:
+                audio[:k] *= np.linspace(0, 1, k, dtype=np.float32)
+            else:
+                audio[-k:] *= np.linspace(1, 0, k, dtype=np.float32)
+            return audio
+
+        gain = 1.0
+        if (ref_rms is not None) and (ref_rms < 0.1):
+            gain = ref_rms / 0.1
+
+        held = None
+        yield pad
+
+        for chunk_idx, tokens in enumerate(token_chunks):
+            fade_in = edge_fade
+            if chunk_idx > 0:
+                fade_in = gap_fade
+                if held is not None:
+                    yield fade(held, gap_fade, fade_in=False)
+                    held = None
+                yield np.zeros(gap_fade, dtype=np.float32)
+
+            for piece in self._decode_windows(tokens, window_frames, overlap_frames):
+                piece = piece * gain
+                if fade_in:
+                    piece = fade(piece, fade_in, fade_in=True)
+                    fade_in = 0
+
+                if held is not None:
+                    yield held
+                held = piece
+
+        if held is not None:
+            yield fade(held, edge_fade, fade_in=False)
+
+        yield pad
@@ -0,0 +1,222 @@
+"""CPU and onnxruntime profiles of sampled requests.
+
+With ``--profile-dir``, a request is profiled when it is sampled
+(``--profile-sample``, a fraction of requests) or after the server receives
+SIGUSR1, which profiles the next ``--profile-requests`` requests. One request
+is profiled at a time.
+
+For a profiled request, these files are written to the profile directory:
+
+* ``<request id>.prof`` — Python CPU profile (``cProfile``) of the synthesis
+  path, including the backend's worker threads; open it with ``pstats`` or
+  snakeviz
+* ``<request id>.<backend>.ort.json`` — onnxruntime operator profile, in
+  Chrome trace format (open it in ``chrome://tracing`` or Perfetto)
+
+onnxruntime can only profile a session created with profiling enabled, so a
+profiled request runs on an extra session created when it first synthesizes.
+The session is created while the CPU profile is paused and is discarded after
+the request.
+
+The CPU profile of the event loop thread also contains whatever other
+connections were doing at the same time.
+"""
+
+import cProfile
+import logging
+import pstats
+import random
+import threading
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RequestProfile:
+    """Profilers and onnxruntime sessions of one profiled request."""
+
+    def __init__(self, request_id: str, profile_dir: Path) -> None:
+        self.request_id = request_id
+        self.profile_dir = profile_dir
+        self._profiles: List[cProfile.Profile] = []
+        self._profiles_lock = threading.Lock()
+        self._thread_profile: Optional[cProfile.Profile] = None
+        self._thread_id: Optional[int] = None
+
+        # label -> session created with enable_profiling
+        self._sessions: Dict[str, Any] = {}
+        self._sessions_lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the CPU profile of the calling (event loop) thread."""
+        self._thread_profile = self._enable()
+        self._thread_id = threading.get_ident()
+
+    def _enable(self) -> Optional[cProfile.Profile]:
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ allows a single active profiler per interpreter
+            _LOGGER.debug("Could not start a CPU profiler in this thread")
+            return None
+
+        with self._profiles_lock:
+            self._profiles.append(profile)
+
+        return profile
+
+    @contextmanager
+    def profile_thread(self) -> Iterator[None]:
+        """CPU profile the block in a worker thread."""
+        profile = self._enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+
+    @contextmanager
+    def paused(self) -> Iterator[None]:
+        """Leave the block out of the event loop thread's CPU profile."""
+        if (self._thread_profile is None) or (threading.get_ident() != self._thread_id):
+            yield
+            return
+
+        self._thread_profile.disable()
+        try:
+            yield
+        finally:
+            self._thread_profile.enable()
+
+    def session(self, label: str, create_session: Callable[[str], Any]) -> Any:
+        """Profiling session for ``label``, created on first use.
+
+        ``create_session`` gets the file prefix for the onnxruntime profile.
+        """
+        with self._sessions_lock:
+            session = self._sessions.get(label)
+            if session is None:
+                prefix = str(self.profile_dir / f"{self.request_id}.{label}")
+                with self.paused():
+                    session = create_session(prefix)
+
+                self._sessions[label] = session
+
+        return session
+
+    def finish(self) -> List[Path]:
+        """Stop profiling and write the profiles."""
+        if self._thread_profile is not None:
+            self._thread_profile.disable()
+
+        paths: List[Path] = []
+        with self._profiles_lock:
+            profiles = list(self._profiles)
+
+        if profiles:
+            stats = pstats.Stats(profiles[0])
+            for profile in profiles[1:]:
+                stats.add(profile)
+
+            prof_path = self.profile_dir / f"{self.request_id}.prof"
+            stats.dump_stats(str(prof_path))
+            paths.append(prof_path)
+
+        for label, session in self._sessions.items():
+            # onnxruntime names the file <prefix>_<timestamp>.json
+            ort_path = Path(session.end_profiling())
+            final_path = self.profile_dir / f"{self.request_id}.{label}.ort.json"
+            ort_path.replace(final_path)
+            paths.append(final_path)
+
+        self._sessions.clear()
+        return paths
+
+
+# Profile of the request being handled in this context
+_CURRENT: ContextVar[Optional[RequestProfile]] = ContextVar(
+    "wyoming_piper_profile", default=None
+)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    """Profile of the current request, or None if it is not profiled."""
+    return _CURRENT.get()
+
+
+class Profiler:
+    """Chooses the requests to profile and writes their profiles."""
+
+    def __init__(
+        self,
+        profile_dir: Union[str, Path],
+        sample_rate: float = 0.0,
+        window_requests: int = 1,
+    ) -> None:
+        self.profile_dir = Path(profile_dir)
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        self.sample_rate = sample_rate
+        self.window_requests = max(1, window_requests)
+        self._pending = 0
+        self._active: Optional[RequestProfile] = None
+
+    def request_window(self) -> None:
+        """Profile the next requests (on SIGUSR1)."""
+        self._pending = self.window_requests
+        _LOGGER.info("Profiling the next %s request(s)", self._pending)
+
+    def start(self, request_id: Optional[str] = None) -> Optional[RequestProfile]:
+        """Start profiling the current request if it is chosen."""
+        if self._active is not None:
+            return None
+
+        if self._pending > 0:
+            self._pending -= 1
+        elif (self.sample_rate <= 0) or (random.random() >= self.sample_rate):
+            return None
+
+        profile = RequestProfile(request_id or uuid.uuid4().hex[:12], self.profile_dir)
+        self._active = profile
+        _CURRENT.set(profile)
+        profile.start()
+        return profile
+
+    def finish(self, profile: RequestProfile) -> None:
+        """Stop profiling a request and write its profiles."""
+        if _CURRENT.get() is profile:
+            _CURRENT.set(None)
+
+        if self._active is profile:
+            self._active = None
+
+        try:
+            paths = profile.finish()
+        except OSError:
+            _LOGGER.exception("Failed to write profile of %s", profile.request_id)
+            return
+
+        _LOGGER.info(
+            "Profiled request %s: %s",
+            profile.request_id,
+            ", ".join(str(p) for p in paths),
+        )
+
+
+# Profiler for this process (None: --profile-dir not given)
+_PROFILER: Optional[Profiler] = None
+
+
+def set_profiler(profiler: Optional[Profiler]) -> None:
+    """Set the profiler used for requests from now on."""
+    global _PROFILER
+    _PROFILER = profiler
+
+
+def get_profiler() -> Optional[Profiler]:
+    """Profiler for this process, or None if requests are not profiled."""
+    return _PROFILER
@@ -0,0 +1,139 @@
+"""CPU thread budget shared by the torch and onnxruntime backends.
+
+torch and onnxruntime each size their thread pools to every core by default.
+In the omnivoice backend they alternate on every decode step, and with several
+ONNX sessions (or Piper running alongside) they oversubscribe the CPU, which
+makes tail latency unpredictable on shared hosts.
+
+A :class:`ThreadBudget` divides one ``--cpu-budget`` between a backend's
+workers: each worker (ONNX session) gets an equal share of intra-op threads and
+a single inter-op thread, torch gets one worker's share, and with
+``--cpu-affinity`` the process is pinned to the budgeted CPUs and each worker's
+intra-op threads to its own slice of them.
+"""
+
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class WorkerThreads:
+    """Threads (and optionally CPUs) assigned to one worker."""
+
+    intra_op_num_threads: int
+    inter_op_num_threads: int
+    cpus: Optional[Tuple[int, ...]] = None
+
+
+def available_cpus() -> List[int]:
+    """CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+
+    return list(range(os.cpu_count() or 1))
+
+
+class ThreadBudget:
+    """Assignment of a fixed number of CPUs to a backend's workers."""
+
+    def __init__(
+        self,
+        num_cpus: int,
+        num_workers: int = 1,
+        pin_cpus: bool = False,
+        cpus: Optional[Sequence[int]] = None,
+    ) -> None:
+        if cpus is None:
+            cpus = available_cpus()
+
+        self.num_cpus = max(1, min(num_cpus, len(cpus)))
+        self.cpus: Tuple[int, ...] = tuple(cpus[: self.num_cpus])
+        self.num_workers = max(1, num_workers)
+        self.pin_cpus = pin_cpus
+
+    @property
+    def threads_per_worker(self) -> int:
+        """Intra-op threads for each worker."""
+        return max(1, self.num_cpus // self.num_workers)
+
+    @property
+    def torch_num_threads(self) -> int:
+        """Threads for torch (process-wide, so one worker's share)."""
+        return self.threads_per_worker
+
+    def worker(self, index: int = 0) -> WorkerThreads:
+        """Threads for worker ``index`` (workers past the budget wrap around)."""
+        num_threads = self.threads_per_worker
+        cpus: Optional[Tuple[int, ...]] = None
+        if self.pin_cpus:
+            start = (index * num_threads) % self.num_cpus
+            cpus = tuple(
+                self.cpus[(start + i) % self.num_cpus] for i in range(num_threads)
+            )
+
+        return WorkerThreads(
+            intra_op_num_threads=num_threads, inter_op_num_threads=1, cpus=cpus
+        )
+
+    def configure_session(self, sess_options: Any, worker_index: int = 0) -> None:
+        """Apply a worker's threads to onnxruntime ``SessionOptions``."""
+        worker = self.worker(worker_index)
+        sess_options.intra_op_num_threads = worker.intra_op_num_threads
+        sess_options.inter_op_num_threads = worker.inter_op_num_threads
+
+        if worker.cpus and (worker.intra_op_num_threads > 1):
+            # One entry per intra-op thread except the caller's, 1-based CPU ids
+            sess_options.add_session_config_entry(
+                "session.intra_op_thread_affinities",
+                ";".join(str(cpu + 1) for cpu in worker.cpus[1:]),
+            )
+
+    def apply_affinity(self) -> None:
+        """Pin the process to the budgeted CPUs (if requested).
+
+        Call early, before worker threads are started, so they inherit it.
+        """
+        if self.pin_cpus and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, self.cpus)
+
+    def configure_torch(self) -> None:
+        """Size torch's (process-wide) thread pools."""
+        import torch
+
+        torch.set_num_threads(self.torch_num_threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Can only be set before torch runs any parallel work
+            _LOGGER.debug("torch inter-op threads already initialized")
+
+    def describe(self) -> str:
+        """One-line summary for the startup log."""
+        summary = (
+            f"{self.num_cpus} cpu(s), {self.num_workers} worker(s) x "
+            f"{self.threads_per_worker} intra-op thread(s), "
+            f"torch={self.torch_num_threads}"
+        )
+        if self.pin_cpus:
+            summary += f", pinned to {list(self.cpus)}"
+
+        return summary
+
+
+# Budget for this process (None: library defaults)
+_BUDGET: Optional[ThreadBudget] = None
+
+
+def set_thread_budget(budget: Optional[ThreadBudget]) -> None:
+    """Set the budget used for sessions created from now on."""
+    global _BUDGET
+    _BUDGET = budget
+
+
+def get_thread_budget() -> Optional[ThreadBudget]:
+    """Budget for this process, or None if --cpu-budget was not given."""
+    return _BUDGET
@@ -0,0 +1,209 @@
+"""Per-request timing spans and a structured trace log.
+
+A request (a ``synthesize`` event or a text stream) gets a
+:class:`RequestTrace` with a short id when a :class:`Tracer` is configured
+(``--trace-file`` and/or ``--trace-slow``). The trace is held in a context
+variable, so code on the request's path records named stages with::
+
+    with span("phonemize"):
+        ...
+
+without passing the trace around. :func:`span` is a no-op outside a traced
+request. Blocking work sent to a thread must go through
+:func:`run_in_executor` so the spans it records land in the request's trace.
+
+Finished traces are written as JSON lines (one per request, or only slow ones
+with ``--trace-slow``), and requests slower than ``--trace-slow`` seconds are
+logged with their span breakdown and input text length.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass, field
+from functools import partial, wraps
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestTrace:
+    """Timing spans of one request."""
+
+    request_id: str
+    mode: str
+    backend: str
+    voice: str
+    start: float = field(default_factory=time.perf_counter)
+    wall_start: float = field(default_factory=time.time)
+    text_chars: int = 0
+    sentences: int = 0
+    duration: Optional[float] = None
+    error: Optional[str] = None
+
+    # (name, seconds from request start, seconds)
+    spans: List[Tuple[str, float, float]] = field(default_factory=list)
+
+    def add_span(self, name: str, start: float, end: float) -> None:
+        self.spans.append((name, start - self.start, end - start))
+
+    def add_sentence(self, text: str) -> None:
+        self.sentences += 1
+        self.text_chars += len(text)
+
+    def breakdown(self) -> Dict[str, float]:
+        """Total seconds per span name, in order of first appearance."""
+        totals: Dict[str, float] = {}
+        for name, _offset, seconds in self.spans:
+            totals[name] = totals.get(name, 0.0) + seconds
+
+        return totals
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "request_id": self.request_id,
+            "start": self.wall_start,
+            "duration": self.duration,
+            "mode": self.mode,
+            "backend": self.backend,
+            "voice": self.voice,
+            "text_chars": self.text_chars,
+            "sentences": self.sentences,
+            "error": self.error,
+            "breakdown": {
+                name: round(seconds, 6) for name, seconds in self.breakdown().items()
+            },
+            "spans": [
+                {"name": name, "offset": round(offset, 6), "seconds": round(seconds, 6)}
+                for name, offset, seconds in self.spans
+            ],
+        }
+
+
+# Trace of the request being handled in this context
+_CURRENT: ContextVar[Optional[RequestTrace]] = ContextVar(
+    "wyoming_piper_trace", default=None
+)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    """Trace of the current request, or None if it is not traced."""
+    return _CURRENT.get()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Record the time spent in the block as a span of the current request."""
+    trace = _CURRENT.get()
+    if trace is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_span(name, start, time.perf_counter())
+
+
+def trace_method(obj: Any, method_name: str, span_name: str) -> None:
+    """Replace a method on one object with a version that records a span."""
+    method = getattr(obj, method_name)
+
+    @wraps(method)
+    def traced(*args, **kwargs):  # type: ignore[no-untyped-def]
+        with span(span_name):
+            return method(*args, **kwargs)
+
+    setattr(obj, method_name, traced)
+
+
+def run_in_executor(func: Callable[..., Any], *args: Any) -> "asyncio.Future[Any]":
+    """Run ``func`` in the default executor with the current request's trace."""
+    return asyncio.get_running_loop().run_in_executor(
+        None, partial(copy_context().run, func, *args)
+    )
+
+
+class Tracer:
+    """Starts request traces and writes/logs them when they finish."""
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        slow_seconds: Optional[float] = None,
+    ) -> None:
+        self.path = Path(path) if path else None
+        self.slow_seconds = slow_seconds
+        self._file: Optional[IO[str]] = None
+        if self.path is not None:
+            self._file = open(  # pylint: disable=consider-using-with
+                self.path, "a", encoding="utf-8"
+            )
+
+    def start(self, mode: str, backend: str, voice: str) -> RequestTrace:
+        """Start tracing a request in the current context."""
+        trace = RequestTrace(
+            request_id=uuid.uuid4().hex[:12], mode=mode, backend=backend, voice=voice
+        )
+        _CURRENT.set(trace)
+        return trace
+
+    def finish(self, trace: RequestTrace, error: Optional[str] = None) -> None:
+        """Stop tracing a request; write and log it."""
+        if _CURRENT.get() is trace:
+            _CURRENT.set(None)
+
+        trace.duration = time.perf_counter() - trace.start
+        trace.error = error
+
+        is_slow = (self.slow_seconds is not None) and (
+            trace.duration >= self.slow_seconds
+        )
+        if is_slow:
+            _LOGGER.warning(
+                "Slow request %s (%.3fs, %s char(s) in %s sentence(s), voice=%s): %s",
+                trace.request_id,
+                trace.duration,
+                trace.text_chars,
+                trace.sentences,
+                trace.voice,
+                ", ".join(
+                    f"{name}={seconds:.3f}s"
+                    for name, seconds in trace.breakdown().items()
+                ),
+            )
+        else:
+            _LOGGER.debug(
+                "Request %s finished in %.3fs", trace.request_id, trace.duration
+            )
+
+        if (self._file is not None) and (is_slow or (self.slow_seconds is None)):
+            self._file.write(json.dumps(trace.to_dict(), ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# Tracer for this process (None: requests are not traced)
+_TRACER: Optional[Tracer] = None
+
+
+def set_tracer(tracer: Optional[Tracer]) -> None:
+    """Set the tracer used for requests from now on."""
+    global _TRACER
+    _TRACER = tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    """Tracer for this process, or None if requests are not traced."""
+    return _TRACER
@@ -0,0 +1,419 @@
+"""Record incoming Wyoming traffic and replay it against a server.
+
+With ``--record-traffic <file>``, the server appends one JSON line per event it
+receives (audio it sends back is not recorded)::
+
+    {"conn": "3f2a...", "start": 1760000000.0}               # connected
+    {"conn": "3f2a...", "t": 0.012, "type": "synthesize-start", "data": {...}}
+    {"conn": "3f2a...", "t": 0.153, "type": "synthesize-chunk", "data": {...}}
+    {"conn": "3f2a...", "t": 2.801, "end": true}              # disconnected
+
+``start`` is wall clock time, ``t`` is seconds since the connection started.
+Recordings contain the synthesized text.
+
+Replaying re-drives a server with the same connections, events and timing
+(faster or slower with ``--speed``) and reports the same statistics as
+``wyoming_piper.bench``. Server arguments go after ``--``:
+
+    python3 -m wyoming_piper.traffic traffic.jsonl --speed 2 \\
+        --uri tcp://127.0.0.1:10200 --launch -- --voice en_US-lessac-medium
+
+The stdio server has no disconnect notification, so connections to it have no
+``end`` line.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+import uuid
+from asyncio.subprocess import Process
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+from wyoming.audio import AudioChunk
+from wyoming.client import AsyncClient
+from wyoming.error import Error
+from wyoming.event import Event
+from wyoming.tts import Synthesize, SynthesizeChunk, SynthesizeStart, SynthesizeStop
+
+from .bench import (
+    RequestResult,
+    format_summary,
+    make_client,
+    summarize,
+    wait_for_server,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TrafficRecorder:
+    """Appends incoming events to a JSON lines file."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self._file: IO[str] = open(  # pylint: disable=consider-using-with
+            self.path, "a", encoding="utf-8"
+        )
+        self._starts: Dict[str, float] = {}
+
+    def connect(self) -> str:
+        """Record a new connection and return its id."""
+        conn_id = uuid.uuid4().hex[:12]
+        self._starts[conn_id] = time.monotonic()
+        self._write({"conn": conn_id, "start": time.time()})
+        return conn_id
+
+    def record(self, conn_id: str, event: Event) -> None:
+        """Record an event received on a connection (payload is dropped)."""
+        self._write(
+            {
+                "conn": conn_id,
+                "t": self._offset(conn_id),
+                "type": event.type,
+                "data": event.data,
+            }
+        )
+
+    def disconnect(self, conn_id: str) -> None:
+        """Record the end of a connection."""
+        self._write({"conn": conn_id, "t": self._offset(conn_id), "end": True})
+        self._starts.pop(conn_id, None)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def _offset(self, conn_id: str) -> float:
+        return round(time.monotonic() - self._starts[conn_id], 4)
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        # One line per write so a crash loses at most the current event
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+
+# Recorder for this process (None: --record-traffic not given)
+_RECORDER: Optional[TrafficRecorder] = None
+
+
+def set_traffic_recorder(recorder: Optional[TrafficRecorder]) -> None:
+    """Set the recorder used for connections from now on."""
+    global _RECORDER
+    _RECORDER = recorder
+
+
+def get_traffic_recorder() -> Optional[TrafficRecorder]:
+    """Recorder for this process, or None if traffic is not recorded."""
+    return _RECORDER
+
+
+# -----------------------------------------------------------------------------
+
+
+@dataclass
+class RecordedConnection:
+    """Events received on one recorded connection."""
+
+    conn_id: str
+    start: float
+    events: List[Tuple[float, Event]] = field(default_factory=list)
+
+
+def load_recording(path: Union[str, Path]) -> List[RecordedConnection]:
+    """Recorded connections, ordered by start time."""
+    connections: Dict[str, RecordedConnection] = {}
+    with open(path, "r", encoding="utf-8") as recording_file:
+        for line_num, line in enumerate(recording_file, start=1):
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Last line may be cut off if the server was killed
+                _LOGGER.warning("Skipping bad line %s in %s", line_num, path)
+                continue
+
+            conn_id = record["conn"]
+            if "start" in record:
+                connections[conn_id] = RecordedConnection(conn_id, record["start"])
+                continue
+
+            connection = connections.get(conn_id)
+            if (connection is None) or record.get("end"):
+                continue
+
+            connection.events.append(
+                (record["t"], Event(type=record["type"], data=record.get("data")))
+            )
+
+    return sorted(connections.values(), key=lambda c: c.start)
+
+
+def schedule_connections(
+    connections: Sequence[RecordedConnection],
+    speed: float = 1.0,
+    max_gap: Optional[float] = None,
+) -> List[float]:
+    """Seconds from the start of the replay to open each connection.
+
+    Idle gaps between consecutive connections longer than ``max_gap`` (recorded
+    seconds) are shortened to ``max_gap``, e.g. for recordings spanning days.
+    """
+    offsets: List[float] = []
+    offset = 0.0
+    for i, connection in enumerate(connections):
+        if i > 0:
+            gap = connection.start - connections[i - 1].start
+            if max_gap is not None:
+                gap = min(gap, max_gap)
+
+            offset += gap
+
+        offsets.append(offset / speed)
+
+    return offsets
+
+
+async def replay_connection(
+    client: AsyncClient,
+    connection: RecordedConnection,
+    client_index: int = 0,
+    speed: float = 1.0,
+) -> List[RequestResult]:
+    """Send a connection's events at their recorded times and time the audio.
+
+    A request is a ``synthesize`` event outside a text stream, or a text stream
+    from ``synthesize-start`` to ``synthesize-stop``.
+    """
+    results: List[RequestResult] = []
+
+    # Requests sent but not finished: (result, start time)
+    pending: Deque[Tuple[RequestResult, float]] = deque()
+    done_sending = False
+
+    async def read_responses() -> None:
+        while pending or (not done_sending):
+            try:
+                event = await client.read_event()
+            except asyncio.TimeoutError:
+                event = None
+
+            if event is None:
+                for result, _start_time in pending:
+                    result.error = "Server disconnected or timed out"
+                    result.end = time.time()
+                    results.append(result)
+
+                pending.clear()
+                break
+
+            if not pending:
+                # info, or audio for a request that was already finished
+                continue
+
+            result, start_time = pending[0]
+            finished = False
+            if AudioChunk.is_type(event.type):
+                audio_chunk = AudioChunk.from_event(event)
+                result.ttla = time.perf_counter() - start_time
+                if result.ttfa is None:
+                    result.ttfa = result.ttla
+
+                result.audio_seconds += len(audio_chunk.audio) / (
+                    audio_chunk.rate * audio_chunk.width * audio_chunk.channels
+                )
+            elif Error.is_type(event.type):
+                result.error = Error.from_event(event).text
+                finished = True
+            elif result.mode == "stream":
+                finished = event.type == "synthesize-stopped"
+            else:
+                finished = event.type == "audio-stop"
+
+            if finished:
+                result.end = time.time()
+                results.append(result)
+                pending.popleft()
+
+    async with client:
+        reader_task = asyncio.create_task(read_responses())
+        connection_start = time.perf_counter()
+        in_stream = False
+        for offset, event in connection.events:
+            delay = connection_start + (offset / speed) - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            if reader_task.done():
+                break
+
+            if SynthesizeStart.is_type(event.type):
+                in_stream = True
+                stream_start = SynthesizeStart.from_event(event)
+                voice = stream_start.voice.name if stream_start.voice else None
+                pending.append(
+                    (
+                        RequestResult("", voice, "stream", client_index, time.time()),
+                        time.perf_counter(),
+                    )
+                )
+            elif SynthesizeChunk.is_type(event.type) and in_stream and pending:
+                pending[-1][0].text += SynthesizeChunk.from_event(event).text
+            elif SynthesizeStop.is_type(event.type):
+                in_stream = False
+            elif Synthesize.is_type(event.type) and (not in_stream):
+                synthesize = Synthesize.from_event(event)
+                voice = synthesize.voice.name if synthesize.voice else None
+                pending.append(
+                    (
+                        RequestResult(
+                            synthesize.text,
+                            voice,
+                            "synthesize",
+                            client_index,
+                            time.time(),
+                        ),
+                        time.perf_counter(),
+                    )
+                )
+
+            await client.write_event(event)
+
+        done_sending = True
+        if not pending:
+            reader_task.cancel()
+
+        try:
+            await reader_task
+        except asyncio.CancelledError:
+            pass
+
+    return results
+
+
+# -----------------------------------------------------------------------------
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("recording", help="File written by --record-traffic")
+    parser.add_argument(
+        "--uri",
+        default="stdio://",
+        help="stdio:// (a server process per connection), unix://<path> or "
+        "tcp://host:port",
+    )
+    parser.add_argument(
+        "--launch",
+        action="store_true",
+        help="Start a server on --uri (unix/tcp) with the server arguments",
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Replay speed (2 = twice as fast, same order of events)",
+    )
+    parser.add_argument(
+        "--max-gap",
+        type=float,
+        help="Shorten idle gaps between connections to at most this many "
+        "recorded seconds",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=120, help="Seconds to wait for an event"
+    )
+    parser.add_argument("--json", help="Write summary and per-request results here")
+    parser.add_argument("--debug", action="store_true", help="Log DEBUG messages")
+
+    # Server arguments go after -- (REMAINDER would swallow our own options
+    # after the recording)
+    argv = sys.argv[1:]
+    server_args: List[str] = []
+    if "--" in argv:
+        split_index = argv.index("--")
+        argv, server_args = argv[:split_index], argv[split_index + 1 :]
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    if args.launch and args.uri.startswith("stdio://"):
+        parser.error("--launch needs a unix:// or tcp:// --uri")
+
+    connections = load_recording(args.recording)
+    offsets = schedule_connections(connections, args.speed, args.max_gap)
+    _LOGGER.info(
+        "Replaying %s connection(s) over %.1fs",
+        len(connections),
+        offsets[-1] if offsets else 0.0,
+    )
+
+    server_proc: Optional[Process] = None
+    if args.launch:
+        server_proc = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "wyoming_piper", "--uri", args.uri, *server_args
+        )
+        await wait_for_server(args.uri, args.timeout)
+
+    async def replay(client_index: int, start_offset: float) -> List[RequestResult]:
+        await asyncio.sleep(start_offset)
+        return await replay_connection(
+            make_client(args.uri, server_args, read_timeout=args.timeout),
+            connections[client_index],
+            client_index,
+            speed=args.speed,
+        )
+
+    try:
+        connection_results = await asyncio.gather(
+            *(replay(i, offset) for i, offset in enumerate(offsets))
+        )
+    finally:
+        if server_proc is not None:
+            server_proc.terminate()
+            await server_proc.wait()
+
+    results = [result for results in connection_results for result in results]
+    summary = summarize(results)
+    print(format_summary(summary))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as json_file:
+            json.dump(
+                {
+                    "config": {
+                        key: value
+                        for key, value in vars(args).items()
+                        if key not in ("json", "debug")
+                    },
+                    "summary": summary,
+                    "results": [result.to_dict() for result in results],
+                },
+                json_file,
+                indent=2,
+            )
+
+        _LOGGER.info("Wrote %s", Path(args.json).resolve())
+
+
+def run() -> None:
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    try:
+        run()
+    except KeyboardInterrupt:
+        pass
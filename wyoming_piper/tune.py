@@ -0,0 +1,189 @@
+"""Benchmark onnxruntime session options for a Piper voice (--tune).
+
+The best thread count, execution mode, graph optimization level and arena
+setting differ between a Raspberry Pi and a many-core server, so they are
+measured on the host: the voice is loaded under every combination in a grid
+and synthesizes a few sentences of realistic lengths. The profile with the
+lowest real-time factor is saved to the download dir and picked up by later
+voice loads (see :func:`wyoming_piper.voice_loader.load_profile`).
+"""
+
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Union
+
+import onnxruntime
+from piper import SynthesisConfig
+
+from .threads import available_cpus, get_thread_budget
+from .voice_loader import SessionProfile, load_piper_voice, save_profile
+
+_LOGGER = logging.getLogger(__name__)
+
+# Short command response, typical announcement, and a long paragraph
+DEFAULT_SENTENCES = [
+    "Turning on the kitchen lights.",
+    "The front door has been unlocked, and the alarm system is now disarmed.",
+    "Good morning! Today will be mostly cloudy with a high of seventy two "
+    "degrees, a light breeze from the west, and a thirty percent chance of "
+    "rain in the late afternoon, so you may want to bring an umbrella.",
+]
+
+
+@dataclass
+class TuneResult:
+    """Measurement of one session profile."""
+
+    profile: SessionProfile
+    load_seconds: float
+    synthesis_seconds: float
+    audio_seconds: float
+
+    @property
+    def real_time_factor(self) -> float:
+        return self.synthesis_seconds / max(self.audio_seconds, 1e-6)
+
+
+def thread_candidates(max_threads: int) -> List[int]:
+    """Powers of two up to ``max_threads``, plus ``max_threads`` itself."""
+    candidates = []
+    num_threads = 1
+    while num_threads < max_threads:
+        candidates.append(num_threads)
+        num_threads *= 2
+
+    candidates.append(max_threads)
+    return candidates
+
+
+def profile_grid(max_threads: int) -> Iterable[SessionProfile]:
+    """Every combination of the tuned session options."""
+    for threads, mode, level, arena in itertools.product(
+        thread_candidates(max_threads),
+        ("sequential", "parallel"),
+        ("basic", "extended", "all"),
+        (True, False),
+    ):
+        yield SessionProfile(
+            intra_op_num_threads=threads,
+            # Inter-op threads only matter in parallel mode
+            inter_op_num_threads=(1 if mode == "sequential" else 2),
+            execution_mode=mode,
+            graph_optimization_level=level,
+            enable_cpu_mem_arena=arena,
+        )
+
+
+def measure_profile(
+    model_path: Union[str, Path],
+    config_path: Union[str, Path],
+    profile: SessionProfile,
+    sentences: Sequence[str],
+    repeats: int = 3,
+    syn_config: Optional[SynthesisConfig] = None,
+) -> TuneResult:
+    """Load the voice with ``profile`` and time synthesis of ``sentences``."""
+    start_time = time.perf_counter()
+    voice = load_piper_voice(model_path, config_path, profile=profile, use_cache=False)
+    load_seconds = time.perf_counter() - start_time
+
+    # Warm up (arena allocation, kernel selection, espeak initialization)
+    for _chunk in voice.synthesize(sentences[0], syn_config):
+        pass
+
+    synthesis_seconds = 0.0
+    num_samples = 0
+    for _ in range(repeats):
+        for sentence in sentences:
+            start_time = time.perf_counter()
+            for chunk in voice.synthesize(sentence, syn_config):
+                num_samples += len(chunk.audio_int16_bytes) // 2
+
+            synthesis_seconds += time.perf_counter() - start_time
+
+    return TuneResult(
+        profile=profile,
+        load_seconds=load_seconds,
+        synthesis_seconds=synthesis_seconds,
+        audio_seconds=num_samples / voice.config.sample_rate,
+    )
+
+
+def tune_voice(
+    voice_name: str,
+    model_path: Union[str, Path],
+    config_path: Union[str, Path],
+    profile_dir: Union[str, Path],
+    sentences: Optional[Sequence[str]] = None,
+    repeats: int = 3,
+    as_default: bool = False,
+) -> TuneResult:
+    """Benchmark the session option grid for a voice and save the winner.
+
+    With ``as_default``, the winner is also used for voices that were not
+    tuned themselves.
+    """
+    if not sentences:
+        sentences = DEFAULT_SENTENCES
+
+    budget = get_thread_budget()
+    max_threads = budget.num_cpus if budget is not None else len(available_cpus())
+
+    # Deterministic output so every profile does the same work
+    syn_config = SynthesisConfig(noise_scale=0.0, noise_w_scale=0.0)
+
+    results: List[TuneResult] = []
+    for profile in profile_grid(max_threads):
+        result = measure_profile(
+            model_path,
+            config_path,
+            profile,
+            sentences,
+            repeats=repeats,
+            syn_config=syn_config,
+        )
+        _LOGGER.info(
+            "rtf=%.4f load=%.2fs threads=%s mode=%s opt=%s arena=%s",
+            result.real_time_factor,
+            result.load_seconds,
+            profile.intra_op_num_threads,
+            profile.execution_mode,
+            profile.graph_optimization_level,
+            profile.enable_cpu_mem_arena,
+        )
+        results.append(result)
+
+    best = min(results, key=lambda r: r.real_time_factor)
+    baseline = measure_profile(
+        model_path,
+        config_path,
+        SessionProfile(),
+        sentences,
+        repeats=repeats,
+        syn_config=syn_config,
+    )
+
+    profiles_path = save_profile(
+        profile_dir,
+        voice_name,
+        best.profile,
+        {
+            "real_time_factor": best.real_time_factor,
+            "default_real_time_factor": baseline.real_time_factor,
+            "num_cpus": max_threads,
+            "onnxruntime": onnxruntime.__version__,
+        },
+        as_default=as_default,
+    )
+    _LOGGER.info(
+        "Best profile for %s: rtf=%.4f (onnxruntime defaults: %.4f), saved to %s",
+        voice_name,
+        best.real_time_factor,
+        baseline.real_time_factor,
+        profiles_path,
+    )
+
+    return best
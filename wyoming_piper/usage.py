@@ -0,0 +1,254 @@
+"""Per-voice usage statistics for predictive preloading.
+
+With ``--predictive-preload``, every Piper request is counted here and the
+statistics are saved to ``voice_usage.json`` in the download directory. For
+each voice, they hold:
+
+* on how many days the voice was used in each hour of the (local) day
+* how often each other voice was requested within a few minutes after it
+* its resident size once loaded
+
+Counts decay with a half-life of two weeks, so a changed routine takes over
+after a while. The event handler uses :meth:`UsageStats.likely_voices` to keep
+voices loaded ahead of their usual time, and right after a voice that is
+usually followed by another one.
+"""
+
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+_LOGGER = logging.getLogger(__name__)
+
+USAGE_FILE = "voice_usage.json"
+
+# Counts are halved after this many days
+HALF_LIFE_DAYS = 14.0
+
+# A voice requested this soon after another one "follows" it
+FOLLOW_SECONDS = 10 * 60
+
+# Load a voice this many seconds before an hour in which it is likely used
+LOOKAHEAD_SECONDS = 15 * 60
+
+# Fraction of days with a use in the hour
+HOUR_THRESHOLD = 0.5
+
+# Fraction of uses of a voice that were followed by the other voice
+FOLLOW_THRESHOLD = 0.3
+
+
+@dataclass
+class VoiceStats:
+    """Usage of one voice."""
+
+    uses: float = 0.0
+
+    # Days with a use in each hour of the day
+    hours: List[float] = field(default_factory=lambda: [0.0] * 24)
+
+    # voice name -> uses of that voice within FOLLOW_SECONDS after this one
+    followed_by: Dict[str, float] = field(default_factory=dict)
+
+    # Resident memory of the loaded voice (0: not known yet)
+    num_bytes: int = 0
+
+    # Local day * 24 + hour of the last use counted in hours
+    last_hour: int = -1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "uses": round(self.uses, 4),
+            "hours": [round(count, 4) for count in self.hours],
+            "followed_by": {
+                name: round(count, 4) for name, count in self.followed_by.items()
+            },
+            "num_bytes": self.num_bytes,
+            "last_hour": self.last_hour,
+        }
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "VoiceStats":
+        hours = [float(count) for count in data.get("hours", [])]
+        return VoiceStats(
+            uses=float(data.get("uses", 0.0)),
+            hours=(hours + [0.0] * 24)[:24],
+            followed_by={
+                name: float(count)
+                for name, count in data.get("followed_by", {}).items()
+            },
+            num_bytes=int(data.get("num_bytes", 0)),
+            last_hour=int(data.get("last_hour", -1)),
+        )
+
+
+def _local_day_hour(timestamp: float) -> Tuple[int, int]:
+    """Days since the epoch and hour, in local time."""
+    local_time = time.localtime(timestamp)
+    local_seconds = timestamp + local_time.tm_gmtoff
+    return int(local_seconds // 86400), local_time.tm_hour
+
+
+class UsageStats:
+    """Decayed usage counts of voices, saved as JSON."""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None) -> None:
+        self.path = Path(path) if path else None
+        self.voices: Dict[str, VoiceStats] = {}
+
+        # Days with any use (decayed like the counts)
+        self.days = 0.0
+        self.last_day = -1
+
+        self._last_use: Optional[Tuple[str, float]] = None
+        self._dirty = False
+
+    @staticmethod
+    def load(path: Union[str, Path]) -> "UsageStats":
+        """Statistics saved in ``path``, or empty ones if it can't be read."""
+        stats = UsageStats(path)
+        try:
+            with open(path, "r", encoding="utf-8") as usage_file:
+                data = json.load(usage_file)
+
+            stats.days = float(data.get("days", 0.0))
+            stats.last_day = int(data.get("last_day", -1))
+            stats.voices = {
+                name: VoiceStats.from_dict(voice_data)
+                for name, voice_data in data.get("voices", {}).items()
+            }
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError, AttributeError):
+            _LOGGER.warning("Ignoring unreadable voice usage file: %s", path)
+
+        return stats
+
+    def save(self) -> None:
+        """Write the statistics if they changed since the last save."""
+        if (self.path is None) or (not self._dirty):
+            return
+
+        data = {
+            "days": round(self.days, 4),
+            "last_day": self.last_day,
+            "voices": {
+                # Copy: sizes are set from the thread loading a voice
+                name: stats.to_dict()
+                for name, stats in list(self.voices.items())
+            },
+        }
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(temp_path, "w", encoding="utf-8") as usage_file:
+                json.dump(data, usage_file)
+
+            os.replace(temp_path, self.path)
+            self._dirty = False
+        except OSError:
+            _LOGGER.exception("Failed to save voice usage to %s", self.path)
+
+    def record(self, voice_name: str, timestamp: Optional[float] = None) -> None:
+        """Count a request for a voice."""
+        if timestamp is None:
+            timestamp = time.time()
+
+        day, hour = _local_day_hour(timestamp)
+        self._advance_day(day)
+
+        stats = self.voices.setdefault(voice_name, VoiceStats())
+        stats.uses += 1
+        if stats.last_hour != (day * 24) + hour:
+            # Count each hour once per day
+            stats.hours[hour] += 1
+            stats.last_hour = (day * 24) + hour
+
+        if self._last_use is not None:
+            last_voice, last_timestamp = self._last_use
+            if (last_voice != voice_name) and (
+                timestamp - last_timestamp <= FOLLOW_SECONDS
+            ):
+                last_stats = self.voices[last_voice]
+                last_stats.followed_by[voice_name] = (
+                    last_stats.followed_by.get(voice_name, 0.0) + 1
+                )
+
+        self._last_use = (voice_name, timestamp)
+        self._dirty = True
+
+    def set_size(self, voice_name: str, num_bytes: int) -> None:
+        """Remember the resident size of a loaded voice."""
+        stats = self.voices.setdefault(voice_name, VoiceStats())
+        if num_bytes > 0 and stats.num_bytes != num_bytes:
+            stats.num_bytes = num_bytes
+            self._dirty = True
+
+    def likely_voices(
+        self, timestamp: Optional[float] = None
+    ) -> List[Tuple[str, float]]:
+        """Voices likely to be requested soon, most likely first.
+
+        The score of a voice is the larger of the fraction of days it was used
+        in the current (or upcoming) hour and, right after another voice was
+        used, the fraction of that voice's uses it followed.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        scores: Dict[str, float] = {}
+        if self.days > 0:
+            hours = {
+                _local_day_hour(timestamp)[1],
+                _local_day_hour(timestamp + LOOKAHEAD_SECONDS)[1],
+            }
+            for name, stats in self.voices.items():
+                score = max(stats.hours[hour] for hour in hours) / self.days
+                if score >= HOUR_THRESHOLD:
+                    scores[name] = score
+
+        if self._last_use is not None:
+            last_voice, last_timestamp = self._last_use
+            last_stats = self.voices[last_voice]
+            if (timestamp - last_timestamp <= FOLLOW_SECONDS) and (last_stats.uses > 0):
+                for name, count in last_stats.followed_by.items():
+                    score = count / last_stats.uses
+                    if score >= FOLLOW_THRESHOLD:
+                        scores[name] = max(scores.get(name, 0.0), score)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+    def _advance_day(self, day: int) -> None:
+        if day == self.last_day:
+            return
+
+        if self.last_day >= 0:
+            decay = 0.5 ** (max(0, day - self.last_day) / HALF_LIFE_DAYS)
+            self.days *= decay
+            for stats in self.voices.values():
+                stats.uses *= decay
+                stats.hours = [count * decay for count in stats.hours]
+                stats.followed_by = {
+                    name: count * decay for name, count in stats.followed_by.items()
+                }
+
+        self.days += 1
+        self.last_day = day
+
+
+# Statistics for this process (None: --predictive-preload not given)
+_USAGE_STATS: Optional[UsageStats] = None
+
+
+def set_usage_stats(stats: Optional[UsageStats]) -> None:
+    """Set the statistics that requests are counted in from now on."""
+    global _USAGE_STATS
+    _USAGE_STATS = stats
+
+
+def get_usage_stats() -> Optional[UsageStats]:
+    """Usage statistics for this process, or None if usage is not counted."""
+    return _USAGE_STATS
@@ -0,0 +1,329 @@
+"""Index of the files in the voice data directories.
+
+Finding a voice used to stat ``<name>.onnx`` and ``<name>.onnx.json`` (and
+every other file of the voice) in each ``--data-dir`` on every voice switch.
+The index keeps the names and sizes of the files in each data directory and
+lists a directory again only when its modification time changes, which happens
+whenever a file in it is created, deleted or renamed. A listing taken within a
+couple of seconds of the directory's last change is not trusted, since another
+change in the same timestamp tick would go unnoticed.
+
+Custom voice configs are parsed once per modification time and size.
+
+:meth:`VoiceFileIndex.invalidate` forgets the listings when voices are reloaded
+on request (SIGHUP or the web UI), since a file overwritten in place leaves the
+directory's modification time as it was.
+
+With the Piper backend, the index is saved as JSON to ``voice_files.cache`` in
+the download directory, so a restart doesn't list unchanged directories or
+parse unchanged configs again.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+_LOGGER = logging.getLogger(__name__)
+
+CACHE_FILE = "voice_files.cache"
+
+# Bump when the format of the cache changes
+_CACHE_VERSION = 2
+
+# A directory changed this recently may change again without a new mtime
+_RACY_NS = 2 * 1_000_000_000
+
+# Quantized variant of <voice>.onnx (see script/quantize_piper.py)
+QUANTIZED_SUFFIX = ".int8.onnx"
+
+
+class DirListing:
+    """Files in one data directory."""
+
+    __slots__ = ("mtime_ns", "files", "racy", "voices")
+
+    def __init__(self, mtime_ns: int, files: Dict[str, int], racy: bool) -> None:
+        self.mtime_ns = mtime_ns
+
+        # file name -> size in bytes
+        self.files = files
+
+        # Listed too soon after the last change to be trusted
+        self.racy = racy
+
+        # (voice name, prefer quantized) -> model and config path, if found
+        self.voices: Dict[Tuple[str, bool], Optional[Tuple[Path, Path]]] = {}
+
+    def to_cache(self) -> List[Any]:
+        """Listing for the JSON cache (found voices are looked up again)."""
+        return [self.mtime_ns, self.files, self.racy]
+
+    @staticmethod
+    def from_cache(values: List[Any]) -> "DirListing":
+        mtime_ns, files, racy = values
+        return DirListing(
+            int(mtime_ns),
+            {str(file_name): int(size) for file_name, size in files.items()},
+            bool(racy),
+        )
+
+
+class CustomVoice:
+    """What the Info needs from a custom voice config."""
+
+    __slots__ = ("name", "description", "language")
+
+    def __init__(self, name: str, description: str, language: str) -> None:
+        self.name = name
+        self.description = description
+        self.language = language
+
+    def to_cache(self) -> List[str]:
+        """Fields for the JSON cache, in ``__slots__`` order."""
+        return [self.name, self.description, self.language]
+
+    @staticmethod
+    def from_cache(values: List[Any]) -> "CustomVoice":
+        name, description, language = values
+        return CustomVoice(str(name), str(description), str(language))
+
+    @staticmethod
+    def from_config(onnx_path: Path, config: Dict[str, Any]) -> "CustomVoice":
+        name = config.get("dataset", onnx_path.stem)
+        quality = config.get("audio", {}).get("quality")
+        if quality:
+            description = f"{name} ({quality})"
+        else:
+            description = name
+
+        language = config.get("language", {}).get("code")
+        if not language:
+            language = config.get("espeak", {}).get("voice")
+            if not language:
+                language = onnx_path.stem.split("_")[0]
+
+        return CustomVoice(name, description, language)
+
+
+class VoiceFileIndex:
+    """Names and sizes of the files in data directories."""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None) -> None:
+        self.path = Path(path) if path else None
+        self._dirs: Dict[str, DirListing] = {}
+
+        # config path -> (mtime ns, size, voice)
+        self._custom_voices: Dict[str, Tuple[int, int, CustomVoice]] = {}
+
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    @staticmethod
+    def load(path: Union[str, Path]) -> "VoiceFileIndex":
+        """Index saved in ``path``, or an empty one if it can't be read."""
+        index = VoiceFileIndex(path)
+        try:
+            with open(path, "r", encoding="utf-8") as cache_file:
+                cached = json.load(cache_file)
+
+            if cached["version"] == _CACHE_VERSION:
+                dirs = {
+                    str(key): DirListing.from_cache(values)
+                    for key, values in cached["dirs"].items()
+                }
+                custom_voices: Dict[str, Tuple[int, int, CustomVoice]] = {}
+                for key, (mtime_ns, size, values) in cached["custom_voices"].items():
+                    custom_voices[str(key)] = (
+                        int(mtime_ns),
+                        int(size),
+                        CustomVoice.from_cache(values),
+                    )
+
+                index.restore(dirs, custom_voices)
+        except FileNotFoundError:
+            pass
+        except Exception:  # pylint: disable=broad-exception-caught
+            _LOGGER.warning("Ignoring unreadable voice file index: %s", path)
+
+        return index
+
+    def restore(
+        self,
+        dirs: Dict[str, DirListing],
+        custom_voices: Dict[str, Tuple[int, int, CustomVoice]],
+    ) -> None:
+        """Use saved listings and parsed configs."""
+        with self._lock:
+            self._dirs.update(dirs)
+            self._custom_voices.update(custom_voices)
+
+    def save(self) -> None:
+        """Write the index if it changed since the last save."""
+        if (self.path is None) or (not self._dirty):
+            return
+
+        with self._lock:
+            cached = {
+                "version": _CACHE_VERSION,
+                "dirs": {
+                    key: listing.to_cache() for key, listing in self._dirs.items()
+                },
+                "custom_voices": {
+                    key: [mtime_ns, size, custom_voice.to_cache()]
+                    for key, (mtime_ns, size, custom_voice) in (
+                        self._custom_voices.items()
+                    )
+                },
+            }
+            self._dirty = False
+
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(temp_path, "w", encoding="utf-8") as cache_file:
+                json.dump(cached, cache_file, ensure_ascii=False, separators=(",", ":"))
+
+            os.replace(temp_path, self.path)
+        except OSError as err:
+            _LOGGER.debug("Not saving voice file index to %s: %s", self.path, err)
+
+    def invalidate(self) -> None:
+        """List every directory again on next use.
+
+        Needed when files may have been replaced in place, which doesn't change
+        the directory's modification time.
+        """
+        with self._lock:
+            self._dirs.clear()
+            self._dirty = True
+
+    def files(self, data_dir: Union[str, Path]) -> Dict[str, int]:
+        """File name -> size in a data directory (empty if it doesn't exist).
+
+        The returned dict must not be modified.
+        """
+        listing = self._listing(data_dir)
+        return listing.files if (listing is not None) else {}
+
+    def find_voice(
+        self, data_dir: Union[str, Path], name: str, prefer_quantized: bool = False
+    ) -> Optional[Tuple[Path, Path]]:
+        """Model and config path of a voice in a data directory, or None.
+
+        With prefer_quantized, the quantized model is used if it exists.
+        """
+        listing = self._listing(data_dir)
+        if listing is None:
+            return None
+
+        key = (name, prefer_quantized)
+        try:
+            return listing.voices[key]
+        except KeyError:
+            pass
+
+        onnx_name = f"{name}.onnx"
+        config_name = f"{name}.onnx.json"
+        found: Optional[Tuple[Path, Path]] = None
+        if (onnx_name in listing.files) and (config_name in listing.files):
+            quantized_name = name + QUANTIZED_SUFFIX
+            if prefer_quantized and (quantized_name in listing.files):
+                onnx_name = quantized_name
+
+            found = (Path(data_dir, onnx_name), Path(data_dir, config_name))
+
+        listing.voices[key] = found
+        return found
+
+    def _listing(self, data_dir: Union[str, Path]) -> Optional[DirListing]:
+        key = str(data_dir)
+        try:
+            mtime_ns = os.stat(key).st_mtime_ns
+        except OSError:
+            return None
+
+        listing = self._dirs.get(key)
+        if (listing is None) or (listing.mtime_ns != mtime_ns) or listing.racy:
+            listing = self._list_dir(key, mtime_ns)
+
+        return listing
+
+    def _list_dir(self, key: str, mtime_ns: int) -> DirListing:
+        files: Dict[str, int] = {}
+        try:
+            with os.scandir(key) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            files[entry.name] = entry.stat().st_size
+                    except OSError:
+                        # Deleted while listing
+                        continue
+        except OSError:
+            _LOGGER.debug("Can't list %s", key)
+
+        listing = DirListing(
+            mtime_ns, files, racy=(time.time_ns() - mtime_ns) < _RACY_NS
+        )
+        with self._lock:
+            self._dirs[key] = listing
+            self._dirty = True
+
+        return listing
+
+    def size(self, data_dir: Union[str, Path], file_name: str) -> Optional[int]:
+        """Size of a file in a data directory, or None if it doesn't exist."""
+        size = self.files(data_dir).get(file_name)
+        if size == 0:
+            # May still be downloading: writes don't change the directory mtime
+            try:
+                size = os.stat(os.path.join(data_dir, file_name)).st_size
+            except OSError:
+                size = None
+
+        return size
+
+    def voice_names(self, data_dir: Union[str, Path]) -> List[str]:
+        """Names of the voice models in a data directory (``<name>.onnx``)."""
+        return sorted(
+            file_name[: -len(".onnx")]
+            for file_name in self.files(data_dir)
+            if file_name.endswith(".onnx")
+            and (not file_name.startswith("."))
+            and (not file_name.endswith(QUANTIZED_SUFFIX))
+        )
+
+    def custom_voice(self, onnx_path: Path, config_path: Path) -> CustomVoice:
+        """Name, description and language from a voice config."""
+        key = str(config_path)
+        stat = config_path.stat()
+        cached = self._custom_voices.get(key)
+        if (cached is not None) and (cached[:2] == (stat.st_mtime_ns, stat.st_size)):
+            return cached[2]
+
+        with open(config_path, "r", encoding="utf-8") as config_file:
+            custom_voice = CustomVoice.from_config(onnx_path, json.load(config_file))
+
+        with self._lock:
+            self._custom_voices[key] = (stat.st_mtime_ns, stat.st_size, custom_voice)
+            self._dirty = True
+
+        return custom_voice
+
+
+# Index for this process
+_INDEX = VoiceFileIndex()
+
+
+def set_voice_file_index(index: VoiceFileIndex) -> None:
+    """Set the index used to find voice files from now on."""
+    global _INDEX
+    _INDEX = index
+
+
+def get_voice_file_index() -> VoiceFileIndex:
+    """Index used to find voice files."""
+    return _INDEX
@@ -0,0 +1,406 @@
+"""Loading Piper voices with our own onnxruntime session options.
+
+``PiperVoice.load`` always creates its session with default options, so voices
+are loaded here instead: the config is parsed the same way, but the session is
+created with options derived from the server's settings.
+
+The graph optimized by onnxruntime is also cached next to the voice
+(``<voice>.onnx.<key>.opt``), so later loads skip graph optimization. The key
+covers the onnxruntime version, platform, execution providers and the session
+options that change the optimized graph; a small ``.json`` sidecar records the
+source model's hash so a replaced model triggers a rebuild.
+
+With ``use_mmap``, the cached graph keeps its weights in a separate
+``<voice>.onnx.<key>.opt.data`` file. onnxruntime memory-maps external weights
+when a model is loaded from its path, and with pre-packing disabled it runs
+directly on the mapped pages, so every process serving the same voice shares
+one copy of the weights in the page cache instead of holding a private one.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import platform
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import onnxruntime
+from piper import PiperVoice
+from piper.config import PiperConfig
+
+from .file_hash import get_file_hash
+from .metrics import cache_lookup
+from .threads import get_thread_budget
+
+_LOGGER = logging.getLogger(__name__)
+
+# Tuned session profiles, written to the download dir by --tune
+PROFILES_FILE = "ort_profiles.json"
+
+# Profile used for voices that were not tuned themselves (--tune-default)
+DEFAULT_PROFILE_KEY = "*"
+
+# Smaller initializers stay in the graph file (--mmap-models)
+MMAP_MIN_INITIALIZER_BYTES = 1024
+
+_EXECUTION_MODES = {
+    "sequential": onnxruntime.ExecutionMode.ORT_SEQUENTIAL,
+    "parallel": onnxruntime.ExecutionMode.ORT_PARALLEL,
+}
+
+_OPTIMIZATION_LEVELS = {
+    "disable": onnxruntime.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+
+@dataclass
+class SessionProfile:
+    """onnxruntime session options for a voice (defaults match onnxruntime)."""
+
+    intra_op_num_threads: int = 0
+    inter_op_num_threads: int = 0
+    execution_mode: str = "sequential"
+    graph_optimization_level: str = "all"
+    enable_cpu_mem_arena: bool = True
+
+    def apply(self, sess_options: onnxruntime.SessionOptions) -> None:
+        """Set these options on ``sess_options``."""
+        sess_options.intra_op_num_threads = self.intra_op_num_threads
+        sess_options.inter_op_num_threads = self.inter_op_num_threads
+        sess_options.execution_mode = _EXECUTION_MODES[self.execution_mode]
+        sess_options.graph_optimization_level = _OPTIMIZATION_LEVELS[
+            self.graph_optimization_level
+        ]
+        sess_options.enable_cpu_mem_arena = self.enable_cpu_mem_arena
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @staticmethod
+    def from_dict(profile_dict: Dict[str, Any]) -> "SessionProfile":
+        names = {field.name for field in fields(SessionProfile)}
+        return SessionProfile(
+            **{key: value for key, value in profile_dict.items() if key in names}
+        )
+
+
+def load_profile(
+    profile_dir: Union[str, Path], voice_name: str
+) -> Optional[SessionProfile]:
+    """Load the tuned profile for a voice, falling back to the default one."""
+    profiles_path = Path(profile_dir) / PROFILES_FILE
+    if not profiles_path.is_file():
+        return None
+
+    try:
+        with open(profiles_path, "r", encoding="utf-8") as profiles_file:
+            profiles = json.load(profiles_file)
+
+        profile_dict = profiles.get(voice_name, profiles.get(DEFAULT_PROFILE_KEY))
+        if profile_dict is None:
+            return None
+
+        return SessionProfile.from_dict(profile_dict["options"])
+    except Exception:
+        _LOGGER.exception("Failed to load session profile from %s", profiles_path)
+
+    return None
+
+
+def save_profile(
+    profile_dir: Union[str, Path],
+    voice_name: str,
+    profile: SessionProfile,
+    stats: Dict[str, Any],
+    as_default: bool = False,
+) -> Path:
+    """Save a tuned profile for a voice.
+
+    With ``as_default``, it is also used for voices without their own profile.
+    """
+    profiles_path = Path(profile_dir) / PROFILES_FILE
+    profiles: Dict[str, Any] = {}
+    if profiles_path.is_file():
+        try:
+            with open(profiles_path, "r", encoding="utf-8") as profiles_file:
+                profiles = json.load(profiles_file)
+        except ValueError:
+            _LOGGER.warning("Replacing invalid %s", profiles_path)
+
+    entry = {"options": profile.to_dict(), **stats}
+    profiles[voice_name] = entry
+    if as_default:
+        profiles[DEFAULT_PROFILE_KEY] = entry
+
+    profiles_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(profiles_path, "w", encoding="utf-8") as profiles_file:
+        json.dump(profiles, profiles_file, indent=2, ensure_ascii=False)
+
+    return profiles_path
+
+
+def make_session_options(
+    profile: Optional[SessionProfile] = None,
+) -> onnxruntime.SessionOptions:
+    """Session options for a Piper voice.
+
+    A tuned ``profile`` is applied first; the CPU budget (if any) then limits
+    the thread counts.
+    """
+    sess_options = onnxruntime.SessionOptions()
+    if profile is not None:
+        profile.apply(sess_options)
+
+    budget = get_thread_budget()
+    if budget is not None:
+        intra_op_num_threads = sess_options.intra_op_num_threads
+        budget.configure_session(sess_options)
+        if (not budget.pin_cpus) and (
+            0 < intra_op_num_threads < sess_options.intra_op_num_threads
+        ):
+            # Tuned for fewer threads than the budget allows
+            sess_options.intra_op_num_threads = intra_op_num_threads
+
+    return sess_options
+
+
+def get_providers(use_cuda: bool) -> List[Any]:
+    """Execution providers, matching ``PiperVoice.load``."""
+    if use_cuda:
+        _LOGGER.debug("Using CUDA")
+        return [("CUDAExecutionProvider", {"cudnn_conv_algo_search": "HEURISTIC"})]
+
+    return ["CPUExecutionProvider"]
+
+
+def optimized_model_path(
+    model_path: Union[str, Path],
+    sess_options: onnxruntime.SessionOptions,
+    providers: List[Any],
+    use_mmap: bool = False,
+) -> Path:
+    """Path of the cached optimized graph for these options."""
+    model_path = Path(model_path)
+    key_info = {
+        "onnxruntime": onnxruntime.__version__,
+        "machine": platform.machine(),
+        "providers": providers,
+        "graph_optimization_level": str(sess_options.graph_optimization_level),
+        "execution_mode": str(sess_options.execution_mode),
+    }
+    if use_mmap:
+        key_info["external_initializers"] = True
+
+    key = hashlib.md5(json.dumps(key_info, sort_keys=True).encode("utf-8")).hexdigest()[
+        :16
+    ]
+
+    return model_path.with_name(f"{model_path.name}.{key}.opt")
+
+
+def _source_info(model_path: Path) -> Dict[str, Any]:
+    stat = model_path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _is_cache_valid(model_path: Path, cache_path: Path) -> bool:
+    """True if the cached graph was built from the current source model."""
+    meta_path = cache_path.with_name(cache_path.name + ".json")
+    if not (cache_path.is_file() and meta_path.is_file()):
+        return False
+
+    try:
+        with open(meta_path, "r", encoding="utf-8") as meta_file:
+            meta = json.load(meta_file)
+    except ValueError:
+        return False
+
+    source_info = _source_info(model_path)
+    if all(meta.get(key) == value for key, value in source_info.items()):
+        return True
+
+    # Touched or replaced: only the content hash decides
+    if meta.get("md5") != get_file_hash(model_path):
+        return False
+
+    meta.update(source_info)
+    with open(meta_path, "w", encoding="utf-8") as meta_file:
+        json.dump(meta, meta_file)
+
+    return True
+
+
+def disable_prepacking(sess_options: onnxruntime.SessionOptions) -> None:
+    """Run on (memory-mapped) weights as stored instead of private copies."""
+    sess_options.add_session_config_entry("session.disable_prepacking", "1")
+
+
+def remove_optimized_models(
+    model_path: Union[str, Path], keep: Optional[Path] = None
+) -> None:
+    """Delete cached graphs for a model (except ``keep`` and its sidecars)."""
+    model_path = Path(model_path)
+    for cache_path in model_path.parent.glob(f"{model_path.name}.*.opt*"):
+        if (keep is not None) and cache_path.name.startswith(keep.name):
+            continue
+
+        try:
+            cache_path.unlink()
+            _LOGGER.debug("Removed stale optimized model: %s", cache_path)
+        except OSError:
+            pass
+
+
+def _load_optimized(
+    cache_path: Path,
+    sess_options: onnxruntime.SessionOptions,
+    providers: List[Any],
+    use_mmap: bool,
+) -> Optional[onnxruntime.InferenceSession]:
+    """Load a cached graph, or None if it fails."""
+    if use_mmap:
+        disable_prepacking(sess_options)
+
+    # Already optimized, so don't optimize again
+    graph_optimization_level = sess_options.graph_optimization_level
+    sess_options.graph_optimization_level = (
+        onnxruntime.GraphOptimizationLevel.ORT_DISABLE_ALL
+    )
+    try:
+        session = onnxruntime.InferenceSession(
+            str(cache_path), sess_options=sess_options, providers=providers
+        )
+        _LOGGER.debug("Loaded optimized model: %s", cache_path)
+        return session
+    except Exception:
+        _LOGGER.exception("Failed to load optimized model: %s", cache_path)
+    finally:
+        sess_options.graph_optimization_level = graph_optimization_level
+
+    return None
+
+
+def create_session(
+    model_path: Union[str, Path],
+    sess_options: onnxruntime.SessionOptions,
+    providers: List[Any],
+    use_cache: bool = True,
+    use_mmap: bool = False,
+) -> onnxruntime.InferenceSession:
+    """Create a session, loading from or writing the optimized graph cache.
+
+    With ``use_mmap``, the weights are memory-mapped from the cache (see the
+    module docstring); this needs the cache, so it is ignored without it.
+    """
+    model_path = Path(model_path)
+    if not use_cache:
+        if use_mmap:
+            _LOGGER.warning("Memory-mapped models need the optimized model cache")
+
+        return onnxruntime.InferenceSession(
+            str(model_path), sess_options=sess_options, providers=providers
+        )
+
+    cache_path = optimized_model_path(
+        model_path, sess_options, providers, use_mmap=use_mmap
+    )
+    if _is_cache_valid(model_path, cache_path):
+        session = _load_optimized(cache_path, sess_options, providers, use_mmap)
+        if session is not None:
+            cache_lookup("optimized_model", hit=True)
+            return session
+
+    cache_lookup("optimized_model", hit=False)
+
+    if not os.access(model_path.parent, os.W_OK):
+        return onnxruntime.InferenceSession(
+            str(model_path), sess_options=sess_options, providers=providers
+        )
+
+    # Rebuild: optimize the source model and save the result
+    remove_optimized_models(model_path)
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    sess_options.optimized_model_filepath = str(tmp_path)
+    if use_mmap:
+        # Relative to the saved graph, which is renamed next to it
+        sess_options.add_session_config_entry(
+            "session.optimized_model_external_initializers_file_name",
+            cache_path.name + ".data",
+        )
+        sess_options.add_session_config_entry(
+            "session.optimized_model_external_initializers_min_size_in_bytes",
+            str(MMAP_MIN_INITIALIZER_BYTES),
+        )
+
+    session = onnxruntime.InferenceSession(
+        str(model_path), sess_options=sess_options, providers=providers
+    )
+
+    try:
+        tmp_path.replace(cache_path)
+        with open(
+            cache_path.with_name(cache_path.name + ".json"), "w", encoding="utf-8"
+        ) as meta_file:
+            json.dump(
+                {"md5": get_file_hash(model_path), **_source_info(model_path)},
+                meta_file,
+            )
+
+        _LOGGER.debug("Saved optimized model: %s", cache_path)
+    except OSError:
+        _LOGGER.exception("Failed to save optimized model: %s", cache_path)
+        remove_optimized_models(model_path)
+        return session
+
+    if use_mmap:
+        # This session holds a private copy; swap it for the mapped one
+        sess_options.optimized_model_filepath = ""
+        mapped_session = _load_optimized(cache_path, sess_options, providers, use_mmap)
+        if mapped_session is not None:
+            return mapped_session
+
+    return session
+
+
+def create_profiling_session(
+    model_path: Union[str, Path],
+    profile_prefix: str,
+    use_cuda: bool = False,
+    profile: Optional[SessionProfile] = None,
+) -> onnxruntime.InferenceSession:
+    """Session that writes an onnxruntime profile (see ``end_profiling``)."""
+    sess_options = make_session_options(profile)
+    sess_options.enable_profiling = True
+    sess_options.profile_file_prefix = profile_prefix
+
+    return onnxruntime.InferenceSession(
+        str(model_path), sess_options=sess_options, providers=get_providers(use_cuda)
+    )
+
+
+def load_piper_voice(
+    model_path: Union[str, Path],
+    config_path: Union[str, Path],
+    use_cuda: bool = False,
+    profile: Optional[SessionProfile] = None,
+    use_cache: bool = True,
+    use_mmap: bool = False,
+) -> PiperVoice:
+    """Load a Piper voice from its ONNX model and JSON config."""
+    with open(config_path, "r", encoding="utf-8") as config_file:
+        config_dict = json.load(config_file)
+
+    session = create_session(
+        model_path,
+        make_session_options(profile),
+        get_providers(use_cuda),
+        use_cache=use_cache,
+        use_mmap=use_mmap,
+    )
+
+    return PiperVoice(config=PiperConfig.from_dict(config_dict), session=session)
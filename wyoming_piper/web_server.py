@@ -11,13 +11,13 @@ UI (designed to work as a Home Assistant add-on behind ingress) for:
   and deleting whole voice directories.
 
 The web UI always functions; each section shows a warning when its backend is
-not the one the Wyoming server was started with. File changes take effect for
-the Wyoming server only after the Piper integration is reloaded (or Home
-Assistant is restarted), so every mutation returns a reminder to that effect.
+not the one the Wyoming server was started with. After every change the
+Wyoming server reloads its voices; Home Assistant only lists them after the
+Piper integration is reloaded, so every mutation returns a reminder to that
+effect.
 """
 
 import argparse
-import importlib.util
 import json
 import logging
 import re
@@ -33,10 +33,11 @@ from werkzeug.middleware.proxy_fix import ProxyFix
 
 _LOGGER = logging.getLogger(__name__)
 
-# Reminder shown after any change so the user knows it is not live yet.
+# Reminder shown after any change: the server reloads its voices, but Home
+# Assistant keeps its voice list until the integration is reloaded.
 RELOAD_MESSAGE = (
-    "Changes saved. Reload the Piper integration or restart Home Assistant "
-    "for them to take effect."
+    "Changes saved and loaded by the server. Reload the Piper integration or "
+    "restart Home Assistant to see them in the voice list."
 )
 
 # Safe voice / language / directory names: no path separators, no surprises.
@@ -46,6 +47,13 @@ _SAFE_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
 _MAX_CONTENT_LENGTH = 1024 * 1024 * 1024  # 1 GiB
 
 
+def _voices_changed() -> None:
+    """Have the Wyoming server reload its voices."""
+    from .handler import request_voice_reload
+
+    request_voice_reload()
+
+
 def _valid_name(name: Optional[str]) -> bool:
     """True if ``name`` is safe to use as a single path component."""
     if not name or name in (".", ".."):
@@ -136,23 +144,13 @@ def _list_omnivoice_voices(ref_dir: Optional[Path]) -> List[Dict[str, Any]]:
 def _omnivoice_lang_ids() -> List[str]:
     """OmniVoice's language IDs, loaded cheaply (no torch import).
 
-    ``import omnivoice.utils.lang_map`` runs the ``omnivoice`` package
-    ``__init__``, which pulls in torch/transformers (~6 s). These are only
-    free-text suggestions for the voice-language field, so load ``lang_map.py``
-    as a standalone module by file path instead, skipping the package init.
+    These are only free-text suggestions for the voice-language field.
     Returns an empty list if OmniVoice isn't installed.
     """
     try:
-        spec = importlib.util.find_spec("omnivoice")
-        if spec is None or not spec.submodule_search_locations:
-            return []
-        lang_path = Path(spec.submodule_search_locations[0]) / "utils" / "lang_map.py"
-        mod_spec = importlib.util.spec_from_file_location("_ov_lang_map", lang_path)
-        if mod_spec is None or mod_spec.loader is None:
-            return []
-        module = importlib.util.module_from_spec(mod_spec)
-        mod_spec.loader.exec_module(module)
-        return sorted(module.LANG_IDS)
+        from .omnivoice import load_lang_map
+
+        return sorted(load_lang_map().LANG_IDS)
     except Exception:  # noqa: BLE001 - suggestions are optional; never fail here
         return []
 
@@ -194,9 +192,9 @@ def make_web_server(cli_args: argparse.Namespace) -> Flask:
     def _builtin_voice_names() -> set:
         """Names of known built-in Piper voices (for labeling only)."""
         try:
-            from .download import get_voices
+            from .download import get_voice_catalog
 
-            return set(get_voices(download_dir).keys())
+            return set(get_voice_catalog(download_dir).voices)
         except Exception:  # noqa: BLE001 - listing must not fail on this
             return set()
 
@@ -208,8 +206,16 @@ def make_web_server(cli_args: argparse.Namespace) -> Flask:
     def health():  # type: ignore[no-untyped-def]
         return {"status": "ok"}, 200
 
+    @flask_app.route("/metrics", methods=["GET"])
+    def prometheus_metrics():  # type: ignore[no-untyped-def]
+        from .metrics import CONTENT_TYPE, render
+
+        return render(), 200, {"Content-Type": CONTENT_TYPE}
+
     @flask_app.route("/api/status", methods=["GET"])
     def status():  # type: ignore[no-untyped-def]
+        from .handler import get_load_status, get_memory_status
+
         return jsonify(
             {
                 "backend": backend,
@@ -220,6 +226,8 @@ def make_web_server(cli_args: argparse.Namespace) -> Flask:
                 "omnivoice_languages": _omnivoice_languages(
                     cli_args.omnivoice_language
                 ),
+                "loading": get_load_status(),
+                "memory": get_memory_status(cli_args),
             }
         )
 
@@ -282,6 +290,7 @@ def make_web_server(cli_args: argparse.Namespace) -> Flask:
         onnx_file.save(onnx_path)
         config_path.write_bytes(config_bytes)
         _LOGGER.info("Uploaded custom Piper voice: %s", base)
+        _voices_changed()
 
         return jsonify({"ok": True, "name": base, "message": RELOAD_MESSAGE})
 
@@ -296,8 +305,11 @@ def make_web_server(cli_args: argparse.Namespace) -> Flask:
         if not onnx_path.is_file() and not config_path.is_file():
             return jsonify({"ok": False, "error": f"Voice not found: {name}"}), 404
 
+        from .download import quantized_model_path
+
+        quantized_path = quantized_model_path(onnx_path)
         removed = []
-        for path in (onnx_path, config_path):
+        for path in (onnx_path, quantized_path, config_path):
             try:
                 if path.is_file():
                     path.unlink()
@@ -308,7 +320,16 @@ def make_web_server(cli_args: argparse.Namespace) -> Flask:
                     500,
                 )
 
+        try:
+            from .voice_loader import remove_optimized_models
+
+            remove_optimized_models(onnx_path)
+            remove_optimized_models(quantized_path)
+        except ImportError:
+            pass
+
         _LOGGER.info("Deleted custom Piper voice: %s (%s)", name, ", ".join(removed))
+        _voices_changed()
         return jsonify({"ok": True, "message": RELOAD_MESSAGE})
 
     # --- OmniVoice ---------------------------------------------------------
@@ -388,6 +409,7 @@ def make_web_server(cli_args: argparse.Namespace) -> Flask:
         (voice_dir / "ref.wav").write_bytes(wav_bytes)
         (voice_dir / "ref.txt").write_text(transcript, encoding="utf-8")
         _LOGGER.info("Created OmniVoice cloning voice: %s/%s", language, name)
+        _voices_changed()
 
         return jsonify({"ok": True, "name": name, "message": RELOAD_MESSAGE})
 
@@ -413,6 +435,7 @@ def make_web_server(cli_args: argparse.Namespace) -> Flask:
             return jsonify({"ok": False, "error": f"Could not delete: {err}"}), 500
 
         _LOGGER.info("Deleted OmniVoice voice: %s/%s", language, name)
+        _voices_changed()
         return jsonify({"ok": True, "message": RELOAD_MESSAGE})
 
     return flask_app